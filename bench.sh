@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+
+cd "$(dirname "$0")/src" && python3 -m benchmarks "$@"
@@ -1,3 +1,3 @@
 #!/usr/bin/env bash
 
-python3 src/main.py
+python3 "$(dirname "$0")/src/main.py" "$@"
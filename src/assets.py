@@ -0,0 +1,242 @@
+import errno
+import json
+import os
+import shutil
+import sys
+
+from manifest import file_hash
+
+ASSET_MANIFEST_NAME = ".asset-manifest.json"
+
+# "auto" hardlinks outputs to their sources where it can; "copy" always makes
+# an independent file (a reflink still counts: it is copy-on-write).  Either
+# way outputs are only ever replaced, never written in place.
+MODES = ("auto", "copy")
+
+_COPY_CHUNK = 1 << 20
+_FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+
+class AssetReport:
+    def __init__(self):
+        self.files = 0
+        self.skipped = 0
+        self.deduped = 0
+        self.pruned = 0
+        self.bytes_copied = 0
+        self.methods = {}  # placement method → file count
+
+    def __repr__(self):
+        return (
+            f"AssetReport(files={self.files}, skipped={self.skipped}, "
+            f"deduped={self.deduped}, pruned={self.pruned}, "
+            f"bytes_copied={self.bytes_copied}, methods={self.methods})"
+        )
+
+
+def _hardlink(src: str, dst: str) -> bool:
+    try:
+        os.link(src, dst)
+    except OSError as exc:
+        if exc.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            return False
+        raise
+    return True
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src_fd, dst_fd, size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        if copied:  # part-way failure: let the caller start over
+            os.lseek(src_fd, 0, os.SEEK_SET)
+            os.ftruncate(dst_fd, 0)
+            os.lseek(dst_fd, 0, os.SEEK_SET)
+        return False
+    return True
+
+
+def place_file(src: str, dst: str, mode: str = "auto") -> str:
+    """
+    Put a copy of *src* at *dst* through a temp file and os.replace, trying
+    a hardlink (mode "auto" only), then a reflink, then copy_file_range,
+    then a chunked copy.  Returns the method used.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown asset mode: {mode!r}")
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        if mode != "copy" and _hardlink(src, tmp):
+            method = "link"
+        else:
+            method = copy_file(src, tmp)
+            shutil.copystat(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        raise
+    return method
+
+
+def copy_file(src: str, dst: str) -> str:
+    """
+    Copy *src* to *dst* without reading it into memory: a reflink, then
+    copy_file_range, then a chunked copy.  Returns the method used.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if _reflink(fsrc.fileno(), fdst.fileno()):
+            return "reflink"
+        if _copy_file_range(fsrc.fileno(), fdst.fileno(), size):
+            return "copy_file_range"
+        shutil.copyfileobj(fsrc, fdst, _COPY_CHUNK)
+        return "chunked"
+
+
+def _walk(static_dir: str) -> list:
+    found = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            found.append(os.path.relpath(os.path.join(root, name), static_dir))
+    return found
+
+
+def load_asset_index(output_dir: str) -> dict:
+    """
+    Return the asset index of *output_dir*: relative path → [size, mtime_ns,
+    sha256] for every mirrored asset.
+    """
+    return _load_index(os.path.join(output_dir, ASSET_MANIFEST_NAME))
+
+
+def _load_index(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def mirror_assets(static_dir: str, output_dir: str, mode: str = "auto") -> AssetReport:
+    """
+    Mirror every file under *static_dir* into *output_dir*.
+
+    A file is skipped when its size and mtime match the last run (or, if
+    only the mtime moved, its content hash does).  Files with the same
+    content hash are placed once and hardlinked to each other, but only to
+    an output that owns its inode: one hardlinked to its own source would
+    change whenever that source is edited in place.  Outputs of deleted
+    assets are removed.  The per-file (size, mtime, hash) index is
+    kept in *output_dir*/.asset-manifest.json.
+    """
+    report = AssetReport()
+    index_path = os.path.join(output_dir, ASSET_MANIFEST_NAME)
+    old_index = _load_index(index_path)
+    index = {}
+    by_hash = {}  # content hash → asset whose output owns an inode with it
+    made_dirs = set()
+
+    for rel in _walk(static_dir):
+        report.files += 1
+        src = os.path.join(static_dir, rel)
+        dst = os.path.join(output_dir, rel)
+        st = os.stat(src)
+        entry = old_index.get(rel)
+        out_ok, owned = _check_output(dst, st, entry)
+
+        # 1. Unchanged since the last run: no hashing at all
+        if entry and entry[:2] == [st.st_size, st.st_mtime_ns] and out_ok:
+            index[rel] = entry
+            if owned:
+                by_hash.setdefault(entry[2], rel)
+            report.skipped += 1
+            continue
+
+        digest = file_hash(src)
+        if entry and entry[2] == digest and out_ok:
+            index[rel] = [st.st_size, st.st_mtime_ns, digest]  # touched only
+            if owned:
+                by_hash.setdefault(digest, rel)
+            report.skipped += 1
+            continue
+
+        directory = os.path.dirname(dst)
+        if directory not in made_dirs:
+            os.makedirs(directory or ".", exist_ok=True)
+            made_dirs.add(directory)
+
+        # 2. Same bytes already in the output: link to them
+        twin = by_hash.get(digest)
+        if twin is not None and _link_twin(os.path.join(output_dir, twin), dst):
+            report.deduped += 1
+        else:
+            method = place_file(src, dst, mode)
+            report.methods[method] = report.methods.get(method, 0) + 1
+            # A hardlink shares the source's inode: no twin may link to it
+            if method != "link":
+                report.bytes_copied += st.st_size
+                by_hash.setdefault(digest, rel)
+        index[rel] = [st.st_size, st.st_mtime_ns, digest]
+
+    for rel in old_index:
+        if rel not in index:
+            try:
+                os.remove(os.path.join(output_dir, rel))
+            except FileNotFoundError:
+                pass
+            report.pruned += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_path, index_path)
+    return report
+
+
+def _check_output(dst: str, st: os.stat_result, entry: list) -> tuple:
+    # (whether the output at *dst* still holds the content of the source
+    # with stat *st*, whether it owns its inode rather than sharing the
+    # source's).  A stat vouches for an output that is the source itself or
+    # has no other links; a deduplicated one, sharing its inode with other
+    # outputs, is compared by content.
+    try:
+        out = os.stat(dst)
+    except FileNotFoundError:
+        return False, False
+    if (out.st_dev, out.st_ino) == (st.st_dev, st.st_ino):
+        return True, False
+    if out.st_size != st.st_size:
+        return False, True
+    if out.st_nlink > 1:
+        return bool(entry) and file_hash(dst) == entry[2], True
+    return True, True
+
+
+def _link_twin(twin: str, dst: str) -> bool:
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    if not _hardlink(twin, tmp):
+        return False
+    os.replace(tmp, dst)
+    return True
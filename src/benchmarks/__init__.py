@@ -0,0 +1,5 @@
+"""
+Micro- and macro-benchmarks for the generator.
+
+Run from the repository root with ``./bench.sh <name> [args...]``.
+"""
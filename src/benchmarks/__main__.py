@@ -0,0 +1,31 @@
+import importlib
+import sys
+
+# benchmark name → module exposing main(argv)
+BENCHMARKS = {
+    "inline": "benchmarks.inline",
+    "inline_cache": "benchmarks.inline_cache",
+    "daemon": "benchmarks.daemon",
+    "escape": "benchmarks.escape",
+    "fragment_cache": "benchmarks.fragment_cache",
+    "fused": "benchmarks.fused",
+    "highlight": "benchmarks.highlight",
+    "memory": "benchmarks.memory",
+    "outline": "benchmarks.outline",
+    "pathological": "benchmarks.pathological",
+    "pipeline": "benchmarks.pipeline",
+    "suite": "benchmarks.suite",
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in BENCHMARKS:
+        print(f"usage: bench.sh {{{','.join(BENCHMARKS)}}} [args...]")
+        return 1
+    module = importlib.import_module(BENCHMARKS[argv[0]])
+    return module.main(argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
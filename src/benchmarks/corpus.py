@@ -0,0 +1,129 @@
+"""
+Deterministic synthetic markdown corpus.
+
+The same seed and knobs always give byte-identical pages, so timings from
+different runs and machines are comparable.
+"""
+
+import os
+import random
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+CODE_LINES = (
+    "def handler(event):",
+    "    value = compute(event)",
+    "",
+    "    return {'status': value}",
+    "for item in items:",
+    "    print(item)",
+)
+
+
+class CorpusConfig:
+    """
+    Knobs for the generator.
+
+    pages             number of pages
+    paragraph_words   words per paragraph
+    markup_density    chance that a word carries inline markup (0..1)
+    list_depth        nesting depth of generated lists (0 = no lists)
+    code_share        chance that a block is a fenced code block (0..1)
+    blocks_per_page   blocks per page
+    seed              RNG seed
+    """
+
+    def __init__(
+        self,
+        pages: int = 200,
+        paragraph_words: int = 80,
+        markup_density: float = 0.1,
+        list_depth: int = 2,
+        code_share: float = 0.1,
+        blocks_per_page: int = 12,
+        seed: int = 0,
+    ):
+        self.pages = pages
+        self.paragraph_words = paragraph_words
+        self.markup_density = markup_density
+        self.list_depth = list_depth
+        self.code_share = code_share
+        self.blocks_per_page = blocks_per_page
+        self.seed = seed
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def _word(rng: random.Random, density: float) -> str:
+    word = rng.choice(WORDS)
+    if rng.random() >= density:
+        return word
+    style = rng.randrange(5)
+    if style == 0:
+        return f"**{word}**"
+    if style == 1:
+        return f"_{word}_"
+    if style == 2:
+        return f"`{word}`"
+    if style == 3:
+        return f"[{word}](/{word}.html)"
+    return f"![{word}](/img/{word}.png)"
+
+
+def _sentence(rng: random.Random, words: int, density: float) -> str:
+    return " ".join(_word(rng, density) for _ in range(max(1, words)))
+
+
+def _list(rng: random.Random, config: CorpusConfig, depth: int = 0) -> list:
+    lines = []
+    for _ in range(rng.randint(2, 4)):
+        words = _sentence(rng, 6, config.markup_density)
+        lines.append("  " * depth + "- " + words)
+        if depth + 1 < config.list_depth and rng.random() < 0.5:
+            lines.extend(_list(rng, config, depth + 1))
+    return lines
+
+
+def generate_page(rng: random.Random, config: CorpusConfig, index: int) -> str:
+    blocks = [f"# Page {index}: {_sentence(rng, 4, 0)}"]
+    for _ in range(config.blocks_per_page - 1):
+        roll = rng.random()
+        if roll < config.code_share:
+            body = "\n".join(rng.choice(CODE_LINES) for _ in range(rng.randint(3, 8)))
+            blocks.append(f"```python\n{body}\n```")
+        elif config.list_depth and roll < config.code_share + 0.2:
+            blocks.append("\n".join(_list(rng, config)))
+        elif roll < config.code_share + 0.3:
+            blocks.append(f"## {_sentence(rng, 5, config.markup_density)}")
+        else:
+            blocks.append(_sentence(rng, config.paragraph_words, config.markup_density))
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(config: CorpusConfig) -> list:
+    """
+    Return the corpus as a list of markdown page strings.
+    """
+    rng = random.Random(config.seed)
+    return [generate_page(rng, config, i) for i in range(config.pages)]
+
+
+def write_corpus(config: CorpusConfig, content_dir: str, per_dir: int = 100) -> list:
+    """
+    Write the corpus under *content_dir*, *per_dir* pages per subdirectory.
+    Returns the written paths.
+    """
+    paths = []
+    for i, page in enumerate(generate_corpus(config)):
+        directory = os.path.join(content_dir, f"section-{i // per_dir:04d}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"page-{i:06d}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(page)
+        paths.append(path)
+    return paths
@@ -0,0 +1,101 @@
+"""
+Per-request latency of the build daemon against a cold start.
+
+Times the same client.py commands with no daemon running, so each one
+starts an interpreter, imports the generator and renders in-process, and
+with a daemon serving them from warm state.  Also times bare socket
+requests from an already running process, which is the latency an editor
+plugin or API server holding a connection-ready client would see.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import client
+from benchmarks.corpus import CorpusConfig, write_corpus
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CLIENT = os.path.join(_SRC_DIR, "client.py")
+_MAIN = os.path.join(_SRC_DIR, "main.py")
+
+
+def _median_ms(function, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1e3
+
+
+def _run(*args):
+    subprocess.run(
+        [sys.executable, _CLIENT, *args], check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh daemon")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="bench-daemon-")
+    socket_path = os.path.join(root, "daemon.sock")
+    daemon = None
+    try:
+        content = os.path.join(root, "content")
+        output = os.path.join(root, "public")
+        page = write_corpus(CorpusConfig(pages=args.pages), content)[0]
+
+        def edit():
+            with open(page, "a", encoding="utf-8") as f:
+                f.write("\nOne more line.\n")
+
+        def build(socket):
+            edit()
+            _run("--socket", socket, "build", content, output)
+
+        nowhere = os.path.join(root, "nowhere.sock")
+        _run("--socket", nowhere, "build", content, output)
+        cold_render = _median_ms(
+            lambda: _run("--socket", nowhere, "render", page), args.runs
+        )
+        cold_build = _median_ms(lambda: build(nowhere), args.runs)
+
+        daemon = subprocess.Popen(
+            [sys.executable, _MAIN, "daemon", "--socket", socket_path],
+            stdout=subprocess.DEVNULL,
+        )
+        while client.request({"op": "ping"}, socket_path) is None:
+            time.sleep(0.01)
+        client.build(content, output, socket_path=socket_path)  # load site state
+        warm_render = _median_ms(
+            lambda: _run("--socket", socket_path, "render", page), args.runs
+        )
+        warm_build = _median_ms(lambda: build(socket_path), args.runs)
+        request_render = _median_ms(
+            lambda: client.render(page, socket_path=socket_path), args.runs
+        )
+        client.request({"op": "shutdown"}, socket_path)
+        daemon.wait()
+    finally:
+        if daemon is not None and daemon.poll() is None:
+            daemon.kill()
+        shutil.rmtree(root)
+
+    print(f"{args.pages} pages, median of {args.runs} runs")
+    print(f"{'':>22} {'cold':>9} {'daemon':>9} {'speedup':>8}")
+    for label, cold, warm in (
+        ("render one page", cold_render, warm_render),
+        ("build, one page edited", cold_build, warm_build),
+    ):
+        print(f"{label:>22} {cold:7.1f}ms {warm:7.1f}ms {cold / warm:7.1f}x")
+    print(f"{'render, bare request':>22} {'':>9} {request_render:7.1f}ms")
+    return 0
@@ -0,0 +1,110 @@
+"""
+Rendering cost of HTML escaping.
+
+Converts and renders the same pages with escaping as shipped, and with
+escape_text / escape_attr swapped for functions that return their input
+(the parser's once-per-paragraph check included), and reports the
+overhead against the 5% budget.  Everything else, the attribute cache
+included, is the same in both runs.  Each run converts the pages afresh,
+as a build renders every tree once.
+"""
+
+import argparse
+import gc
+import io
+import statistics
+import time
+from unittest import mock
+
+import htmlnode
+import leafnode
+import nodes
+import textnode
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from render import markdown_to_html_node
+
+BUDGET = 0.05
+
+
+def _unescaped(text: str) -> str:
+    return text
+
+
+def _convert(pages: list) -> list:
+    return [markdown_to_html_node(io.StringIO(page)) for page in pages]
+
+
+def _time(pages: list) -> tuple:
+    # (convert + render, render) seconds on freshly converted trees, as a
+    # build renders every tree once
+    started = time.perf_counter()
+    trees = _convert(pages)
+    converted = time.perf_counter()
+    for tree in trees:
+        tree.to_html()
+    done = time.perf_counter()
+    return done - started, done - converted
+
+
+def _time_unescaped(pages: list) -> tuple:
+    patches = _unescaped_patches()
+    for patch in patches:
+        patch.start()
+    try:
+        return _time(pages)
+    finally:
+        for patch in reversed(patches):
+            patch.stop()
+
+
+def _unescaped_patches() -> list:
+    patches = [
+        mock.patch.object(module, name, _unescaped)
+        for module, name in (
+            (leafnode, "escape_text"),
+            (textnode, "escape_text"),
+            (textnode, "escape_attr"),
+            (htmlnode, "escape_attr"),
+            (nodes, "escape_attr"),
+        )
+    ]
+    # Start from an empty attribute cache so it fills with unescaped values
+    patches.append(mock.patch.dict(htmlnode._ATTR_CACHE, clear=True))
+    return patches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh escape")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--markup-density", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=21)
+    args = parser.parse_args(argv)
+
+    config = CorpusConfig(pages=args.pages, markup_density=args.markup_density)
+    pages = generate_corpus(config)
+    # Alternate the two so drift in machine load hits both runs of a pair,
+    # and judge by the median ratio of the pairs
+    pairs = []
+    gc.disable()  # collections would land in either run at random
+    try:
+        for _ in range(args.repeat):
+            pairs.append((_time_unescaped(pages), _time(pages)))
+    finally:
+        gc.enable()
+
+    print(f"{args.pages} pages, markup density {args.markup_density}")
+    print(f"{'':>17} {'unescaped':>10} {'escaped':>10} {'overhead':>9}")
+    over = []
+    for i, label in enumerate(("convert + render", "render")):
+        plain = min(unescaped[i] for unescaped, _ in pairs)
+        with_escaping = min(escaped[i] for _, escaped in pairs)
+        overhead = statistics.median(e[i] / u[i] for u, e in pairs) - 1
+        if overhead > BUDGET:
+            over.append(label)
+        print(
+            f"{label:>17} {plain * 1e3:8.2f}ms {with_escaping * 1e3:8.2f}ms "
+            f"{overhead:8.1%}"
+        )
+    verdict = f"OVER BUDGET: {', '.join(over)}" if over else "ok"
+    print(f"budget {BUDGET:.0%} (median of {args.repeat} paired runs): {verdict}")
+    return 1 if over else 0
@@ -0,0 +1,69 @@
+"""
+Rendering with and without the FragmentCache on corpus pages that share a
+callout, a sitemap list and a footer, as pages from one layout usually do.
+"""
+
+import argparse
+import io
+import timeit
+
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from fragment_cache import FragmentCache
+from render import markdown_to_html_node
+
+BOILERPLATE = (
+    "> **Note:** this site is generated; see the [guide](/guide.html) "
+    "and the [changelog](/changelog.html) before editing.\n\n"
+    + "".join(
+        f"- [Section {i}](/sections/{i}.html): _what is new_ in **part {i}**\n"
+        for i in range(20)
+    )
+    + "\nCopyright **Example Corp**, all rights reserved.\n"
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh fragment_cache")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--blocks-per-page", type=int, default=6)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    config = CorpusConfig(pages=args.pages, blocks_per_page=args.blocks_per_page)
+    pages = generate_corpus(config)
+    trees = [
+        markdown_to_html_node(io.StringIO(page + "\n\n" + BOILERPLATE))
+        for page in pages
+    ]
+
+    expected = [tree.to_html() for tree in trees]
+    caches = []
+
+    def render_cached():
+        # A fresh cache per run: a build renders every page once
+        caches.append(FragmentCache(args.cache_size))
+        return [caches[-1].to_html(tree) for tree in trees]
+
+    assert render_cached() == expected
+    uncached = min(
+        timeit.repeat(
+            lambda: [tree.to_html() for tree in trees], repeat=args.repeat, number=1
+        )
+    )
+    cached = min(timeit.repeat(render_cached, repeat=args.repeat, number=1))
+    cache = caches[-1]
+
+    stats = cache.stats()
+    print(
+        f"{args.pages} pages of {args.blocks_per_page} blocks plus shared "
+        f"boilerplate, cache size {args.cache_size}"
+    )
+    print(f"  uncached: {uncached * 1e3:8.2f} ms")
+    print(f"    cached: {cached * 1e3:8.2f} ms  ({uncached / cached:.2f}x)")
+    print(
+        f"     stats: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['evictions']} evictions, {stats['hit_rate']:.1%} hit rate, "
+        f"{stats['bytes_reused']} bytes reused"
+    )
+    return 0
@@ -0,0 +1,93 @@
+"""
+TextNodes rendered in place vs. converted to LeafNodes first.
+
+The shipped converter puts TextNodes straight into the tree, where they
+render from TextNode._HTML_MAP.  The previous path built a LeafNode (and a
+props dict for links and images) per TextNode and rendered that.  Both
+give byte-identical pages; reported are the conversion and render time of
+each and the memory their trees hold.
+"""
+
+import argparse
+import io
+import timeit
+import tracemalloc
+from unittest import mock
+
+import render
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from render import markdown_to_html_node
+
+_fused_children = render.text_to_children
+
+
+def _leaf_children(text, page=None):
+    # The previous text_to_children: one LeafNode per TextNode
+    return [node.to_leaf() for node in _fused_children(text, page)]
+
+
+def _convert(pages: list) -> list:
+    return [markdown_to_html_node(io.StringIO(page)) for page in pages]
+
+
+def _render(trees: list) -> None:
+    for tree in trees:
+        tree.to_html()
+
+
+def _retained(pages: list) -> int:
+    tracemalloc.start()
+    try:
+        trees = _convert(pages)
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del trees
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh fused")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--markup-density", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    config = CorpusConfig(pages=args.pages, markup_density=args.markup_density)
+    pages = generate_corpus(config)
+
+    def best(function, *args_) -> float:
+        runs = timeit.repeat(
+            lambda: function(*args_), repeat=args.repeat, number=args.number
+        )
+        return min(runs) / args.number
+
+    results = {}
+    for label, children in (("leaves", _leaf_children), ("fused", _fused_children)):
+        with mock.patch.object(render, "text_to_children", children):
+            trees = _convert(pages)
+            html = [tree.to_html() for tree in trees]
+            results[label] = (
+                best(_convert, pages),
+                best(_render, trees),
+                _retained(pages),
+                html,
+            )
+    if results["leaves"][3] != results["fused"][3]:
+        print("fused rendering differs from to_leaf().to_html()")
+        return 1
+
+    print(f"{args.pages} pages, markup density {args.markup_density}")
+    print(f"{'':>8} {'convert':>10} {'render':>10} {'total':>10} {'tree memory':>12}")
+    for label, (convert, render_, memory, _) in results.items():
+        print(
+            f"{label:>8} {convert * 1e3:8.2f}ms {render_ * 1e3:8.2f}ms "
+            f"{(convert + render_) * 1e3:8.2f}ms {memory / 1e6:10.2f}MB"
+        )
+    leaves, fused = results["leaves"], results["fused"]
+    print(
+        f"  saving: {1 - sum(fused[:2]) / sum(leaves[:2]):.1%} time, "
+        f"{1 - fused[2] / leaves[2]:.1%} tree memory"
+    )
+    return 0
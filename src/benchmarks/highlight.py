@@ -0,0 +1,61 @@
+"""
+Code highlighting with and without the on-disk HighlightCache.
+
+Builds the same code-heavy corpus into two output directories, as two
+shards, two versions of the docs or two CI runs would, once tokenizing
+every block and once sharing a cache directory.  Reported are the build
+times, the time spent highlighting and the cache hit rate; the second
+cached build should tokenize nothing.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks.corpus import CorpusConfig, write_corpus
+from build import build_site
+
+
+def _build(content: str, output: str, cache: str) -> tuple:
+    report = build_site(
+        content, output, workers=1, force=True, profile=True, highlight_cache=cache
+    )
+    stage = report.profile.stages["highlight"]
+    return report.seconds, stage.seconds, report.highlight_cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh highlight")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--code-share", type=float, default=0.4)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="bench-highlight-")
+    try:
+        content = os.path.join(root, "content")
+        pages = write_corpus(
+            CorpusConfig(pages=args.pages, code_share=args.code_share), content
+        )
+        cache = os.path.join(root, "cache")
+        print(f"{len(pages)} pages, code share {args.code_share}")
+        print(f"{'':>16} {'build':>10} {'highlight':>10} {'hit rate':>9}")
+        for label, cache_dir in (("no cache", None), ("shared cache", cache)):
+            for run in (1, 2):
+                output = os.path.join(root, f"public-{run}")
+                seconds, highlight, stats = _build(content, output, cache_dir)
+                hit_rate = f"{stats['hit_rate']:8.1%}" if stats else f"{'-':>8}"
+                print(
+                    f"{label:>12} #{run} {seconds * 1e3:8.1f}ms "
+                    f"{highlight * 1e3:8.1f}ms {hit_rate}"
+                )
+        files = sum(len(names) for _, _, names in os.walk(cache))
+        size = sum(
+            os.path.getsize(os.path.join(dirpath, name))
+            for dirpath, _, names in os.walk(cache)
+            for name in names
+        )
+        print(f"cache: {files} pack file(s), {size / 1e3:.1f}kB")
+    finally:
+        shutil.rmtree(root)
+    return 0
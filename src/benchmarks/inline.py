@@ -0,0 +1,37 @@
+"""
+Single-pass scanner vs. the legacy five-pass text_to_textnodes pipeline.
+"""
+
+import argparse
+import timeit
+
+from nodes import text_to_textnodes
+
+SENTENCE = (
+    "This is **bold** text with an _italic_ word, some `code`, an "
+    "![image](https://example.com/a.png) and a [link](https://example.com). "
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh inline")
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    text = SENTENCE * args.sentences
+    print(f"paragraph: {len(text)} chars")
+    results = {}
+    for label, legacy in (("legacy", True), ("single-pass", False)):
+        best = min(
+            timeit.repeat(
+                lambda: text_to_textnodes(text, legacy=legacy),
+                repeat=args.repeat,
+                number=args.number,
+            )
+        )
+        results[label] = best / args.number
+        print(f"{label:>12}: {results[label] * 1e3:8.3f} ms/paragraph")
+    print(f"     speedup: {results['legacy'] / results['single-pass']:.2f}x")
+    return 0
@@ -0,0 +1,71 @@
+"""
+Inline parsing with and without the InlineCache on fragments that repeat at
+a configurable rate, as nav labels, footers and "Read more" links do.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.corpus import WORDS
+from inline_cache import InlineCache
+from nodes import text_to_textnodes
+
+BOILERPLATE = [
+    "[Read more](/posts/{i}.html)",
+    "**Note:** this page is part of the _{i}_ series.",
+    "Back to [home](/index.html) | [docs](/docs/{i}.html) | `v{i}`",
+    "![logo](/img/logo-{i}.png) Copyright **Example Corp**",
+]
+
+
+def fragments(count: int, repeat_rate: float, distinct: int, seed: int = 0) -> list:
+    """
+    *count* inline strings; a *repeat_rate* share of them are drawn from
+    *distinct* boilerplate fragments, the rest are unique sentences.
+    """
+    rng = random.Random(seed)
+    pool = [BOILERPLATE[i % len(BOILERPLATE)].format(i=i) for i in range(distinct)]
+    out = []
+    for n in range(count):
+        if rng.random() < repeat_rate:
+            out.append(rng.choice(pool))
+        else:
+            words = " ".join(rng.choice(WORDS) for _ in range(12))
+            out.append(f"{words} **{n}** [link](/{n}.html)")
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh inline_cache")
+    parser.add_argument("--fragments", type=int, default=50_000)
+    parser.add_argument("--repeat-rate", type=float, default=0.6)
+    parser.add_argument("--distinct", type=int, default=500)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    texts = fragments(args.fragments, args.repeat_rate, args.distinct)
+
+    started = time.perf_counter()
+    for text in texts:
+        text_to_textnodes(text)
+    uncached = time.perf_counter() - started
+
+    cache = InlineCache(args.cache_size)
+    started = time.perf_counter()
+    for text in texts:
+        cache.parse(text)
+    cached = time.perf_counter() - started
+
+    stats = cache.stats()
+    print(
+        f"{args.fragments} fragments, {args.repeat_rate:.0%} repeated "
+        f"from {args.distinct} distinct, cache size {args.cache_size}"
+    )
+    print(f"  uncached: {uncached * 1e3:8.2f} ms")
+    print(f"    cached: {cached * 1e3:8.2f} ms  ({uncached / cached:.2f}x)")
+    print(
+        f"     stats: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['evictions']} evictions, {stats['hit_rate']:.1%} hit rate"
+    )
+    return 0
@@ -0,0 +1,65 @@
+"""
+Bytes per node for the __slots__ node classes vs. the previous
+__dict__-based layout.
+"""
+
+import argparse
+import tracemalloc
+
+from leafnode import LeafNode
+from textnode import TextNode, TextType
+
+
+class _DictLeafNode:
+    # The pre-__slots__ LeafNode: per-instance __dict__ and a fresh
+    # children list and props dict for every leaf.
+    def __init__(self, tag=None, value=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.props = props if props is not None else {}
+        self.children = []
+
+
+class _DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+def bytes_per_node(factory, count):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        nodes = [factory(i) for i in range(count)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del nodes
+    return total / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh memory")
+    parser.add_argument("--nodes", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    # Node payloads are shared so only the node objects themselves are counted
+    text = "shared text"
+    rows = [
+        ("LeafNode", lambda i: _DictLeafNode("b", text), lambda i: LeafNode("b", text)),
+        (
+            "TextNode",
+            lambda i: _DictTextNode(text, TextType.BOLD),
+            lambda i: TextNode(text, TextType.BOLD),
+        ),
+    ]
+    print(
+        f"{'class':<10} {'before':>10} {'after':>10}   (bytes/node, {args.nodes} nodes)"
+    )
+    for name, old, new in rows:
+        before = bytes_per_node(old, args.nodes)
+        after = bytes_per_node(new, args.nodes)
+        print(f"{name:<10} {before:>10.1f} {after:>10.1f}")
+    return 0
@@ -0,0 +1,102 @@
+"""
+Heading outline captured during conversion vs. a post-pass over the tree.
+
+The shipped converter records each heading and its id as the heading block
+is converted, from text it has already joined for the title.  The
+alternative walks every finished tree looking for <hN> nodes, re-joins
+their text and assigns ids afterwards; both give the same outline.  Each
+is timed on its own and reported against the cost of conversion.
+"""
+
+import argparse
+import io
+import timeit
+
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from render import Heading, PageContext, markdown_to_html_node, slugify
+
+_HEADING_TAGS = {f"h{level}": level for level in range(1, 7)}
+
+
+def _text(node) -> str:
+    if not node.children:
+        return node.value
+    return "".join(_text(child) for child in node.children)
+
+
+def post_pass_outline(root) -> list:
+    """
+    Collect the outline of a converted tree and set the heading ids.
+    """
+    outline = []
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if not node.children:
+            continue
+        level = _HEADING_TAGS.get(node.tag)
+        if level is None:
+            stack.extend(reversed(node.children))
+            continue
+        text = _text(node)
+        slug = base = slugify(text)
+        n = 0
+        while slug in seen:
+            n += 1
+            slug = f"{base}-{n}"
+        seen.add(slug)
+        node.props = {"id": slug}
+        outline.append(Heading(level, text, slug))
+    return outline
+
+
+def _capture_all(outlines: list) -> None:
+    # The work the converter adds per page: one add_heading per heading
+    for outline in outlines:
+        page = PageContext()
+        for heading in outline:
+            page.add_heading(heading.level, heading.text)
+
+
+def _walk_all(trees: list) -> list:
+    return [post_pass_outline(tree) for tree in trees]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh outline")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks-per-page", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    config = CorpusConfig(pages=args.pages, blocks_per_page=args.blocks_per_page)
+    pages = [io.StringIO(page) for page in generate_corpus(config)]
+    contexts = [PageContext() for _ in pages]
+    trees = [markdown_to_html_node(page, c) for page, c in zip(pages, contexts)]
+    outlines = [context.outline for context in contexts]
+    if _walk_all(trees) != outlines:
+        print("post-pass outline differs from the captured one")
+        return 1
+
+    def best(function, *args_) -> float:
+        runs = timeit.repeat(
+            lambda: function(*args_), repeat=args.repeat, number=args.number
+        )
+        return min(runs) / args.number
+
+    def convert_all():
+        for page in pages:
+            page.seek(0)
+            markdown_to_html_node(page, PageContext())
+
+    convert = best(convert_all)
+    capture = best(_capture_all, outlines)
+    walk = best(_walk_all, trees)
+
+    print(f"{args.pages} pages, {sum(map(len, outlines))} headings")
+    print(f"          convert: {convert * 1e3:8.2f} ms")
+    print(f"  capture in pass: {capture * 1e3:8.2f} ms ({capture / convert:.1%})")
+    print(f"        post-pass: {walk * 1e3:8.2f} ms ({walk / convert:.1%})")
+    return 0
@@ -0,0 +1,123 @@
+"""
+Inline parsing of adversarial paragraphs, with enforced time budgets.
+
+Each generator builds a paragraph of about n characters aimed at a known
+weak spot: unclosed reference openers, runs of delimiters, brackets that
+never close.  Both inline parsers are timed at n and 2n characters; a
+linear parser roughly doubles, a quadratic one quadruples.  A case of the
+shipped single-pass parser whose growth exceeds --max-growth, or whose
+time per character exceeds --budget-us, is reported and the run exits 1,
+so the suite can gate CI.  The legacy pipeline, kept for differential
+tests, is timed and flagged alike but never fails the run.
+
+The default budget is about twice the slowest single-pass case measured
+(open-brackets, 2.0-2.2 us per character).  Growth is the median over
+paired runs, which stays within 1.8-2.2x for every case on a loaded machine.
+"""
+
+import argparse
+import statistics
+import timeit
+
+from nodes import text_to_textnodes
+
+# name → paragraph of about n characters
+GENERATORS = {
+    "open-brackets": lambda n: "[" * n,
+    "open-images": lambda n: "![" * (n // 2),
+    "open-refs": lambda n: "[a](" * (n // 4),
+    "close-brackets": lambda n: "](" * (n // 2),
+    "brackets-then-paren": lambda n: "[" * (n - 3) + "]()",
+    "nested-brackets": lambda n: "[" * (n // 2) + "]" * (n // 2),
+    "refs": lambda n: "[a](b)" * (n // 6),
+    "bold-runs": lambda n: "**" * (n // 2),
+    "italic-runs": lambda n: "_" * n,
+    "code-runs": lambda n: "`" * n,
+    "unclosed-bold": lambda n: "x" * (n - 2) + "**",
+    "plain": lambda n: "word " * (n // 5),
+}
+
+# label → parser
+PARSERS = {
+    "single-pass": lambda text: text_to_textnodes(text),
+    "legacy": lambda text: text_to_textnodes(text, legacy=True),
+}
+# Parsers whose cases fail the run when over budget
+GATED = frozenset(("single-pass",))
+
+
+def _time(parse, text: str) -> float:
+    def run():
+        try:
+            parse(text)
+        except ValueError:  # unclosed delimiters are refused, not slow
+            pass
+
+    return timeit.timeit(run, number=1)
+
+
+def _time_pair(parse, small: str, large: str, repeat: int) -> tuple[float, float]:
+    """Best time at 2n and median growth over paired, alternating runs.
+
+    Timing n and 2n back to back keeps load spikes on a busy machine from
+    landing on one size only, which best-of timings of each size let
+    through as spurious growth.
+    """
+    best, ratios = float("inf"), []
+    for _ in range(repeat):
+        t_small = _time(parse, small)
+        t_large = _time(parse, large)
+        best = min(best, t_large)
+        # Below timer resolution the ratio is noise; a time that small
+        # is within budget anyway.
+        ratios.append(t_large / t_small if t_small > 1e-4 else 1.0)
+    return best, statistics.median(ratios)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh pathological")
+    parser.add_argument("--chars", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=3.0,
+        help="largest allowed time(2n) / time(n) (linear: 2, quadratic: 4)",
+    )
+    parser.add_argument(
+        "--budget-us",
+        type=float,
+        default=4.0,
+        help="largest allowed time per character at 2n, in microseconds",
+    )
+    parser.add_argument("cases", nargs="*", choices=[[], *GENERATORS])
+    args = parser.parse_args(argv)
+
+    n = args.chars
+    print(f"{n} and {2 * n} characters, {args.repeat} paired runs")
+    print(
+        f"{'case':>20} {'parser':>12} {'time(2n)':>10} {'per char':>10} {'growth':>7}"
+    )
+    failures = []
+    for name in args.cases or GENERATORS:
+        small, large = GENERATORS[name](n), GENERATORS[name](2 * n)
+        for label, parse in PARSERS.items():
+            t_large, growth = _time_pair(parse, small, large, args.repeat)
+            per_char = t_large / len(large) * 1e6
+            over = growth > args.max_growth or per_char > args.budget_us
+            if over and label in GATED:
+                failures.append((name, label))
+                flag = "  OVER"
+            else:
+                flag = "  over (not gated)" if over else ""
+            print(
+                f"{name:>20} {label:>12} {t_large * 1e3:8.2f}ms "
+                f"{per_char:8.3f}us {growth:6.2f}x{flag}"
+            )
+    if failures:
+        print(f"{len(failures)} case(s) over budget:")
+        for name, label in failures:
+            print(f"  {name} ({label})")
+        return 1
+    print("all gated cases within budget")
+    return 0
@@ -0,0 +1,68 @@
+"""
+Sequential vs. pipelined builds on a simulated slow filesystem.
+
+Every source read and every output write is delayed by --latency-ms, the
+way an NFS round trip would delay them (sleeping releases the GIL, as
+real I/O does).  The pipelined build overlaps that wait with rendering.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+import build
+from benchmarks.corpus import CorpusConfig, write_corpus
+from pipeline import DEPTH
+from writer import OutputWriter
+
+
+def _slow(function, latency: float):
+    def slowed(*args, **kwargs):
+        time.sleep(latency)
+        return function(*args, **kwargs)
+
+    return slowed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh pipeline")
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--depth", type=int, default=DEPTH)
+    parser.add_argument("-j", "--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    root = tempfile.mkdtemp(prefix="bench-pipeline-")
+    try:
+        content = os.path.join(root, "content")
+        write_corpus(CorpusConfig(pages=args.pages), content)
+        latency = args.latency_ms / 1e3
+        slow_read = _slow(build.read_source, latency)
+        slow_write = _slow(OutputWriter.finish, latency)
+        print(
+            f"{args.pages} pages, {args.latency_ms} ms per read and per write, "
+            f"{args.workers} worker(s)"
+        )
+        results = {}
+        with mock.patch.object(build, "read_source", slow_read):
+            with mock.patch.object(OutputWriter, "finish", slow_write):
+                for label, depth in (("sequential", 0), ("pipelined", args.depth)):
+                    output = os.path.join(root, label)
+                    report = build.build_site(
+                        content,
+                        output,
+                        workers=args.workers,
+                        fsync=False,
+                        pipeline_depth=depth,
+                    )
+                    results[label] = report.seconds
+                    print(f"{label:>11}: {report.seconds * 1e3:9.1f} ms")
+    finally:
+        shutil.rmtree(root)
+    io_floor = 2 * args.pages * latency / args.workers
+    print(f"  I/O alone: {io_floor * 1e3:9.1f} ms")
+    print(f"    speedup: {results['sequential'] / results['pipelined']:.2f}x")
+    return 0
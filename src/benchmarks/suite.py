@@ -0,0 +1,137 @@
+"""
+Per-stage timings over a synthetic corpus, written as JSON and optionally
+compared against a stored baseline.
+
+    ./bench.sh suite --pages 500 --output results.json
+    ./bench.sh suite --baseline results.json --threshold 0.1
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from blocks import BlockType, iter_blocks, markdown_to_blocks
+from nodes import text_to_textnodes
+from render import block_to_html_node, markdown_to_html_node
+
+# Regressions smaller than this fraction of the baseline are noise
+THRESHOLD = 0.10
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_suite(config: CorpusConfig, repeat: int = 3) -> dict:
+    """
+    Time each pipeline stage separately and end to end.
+
+    Every stage gets its input prepared outside the timer.  "tree" is block
+    to node conversion including inline parsing, so "blocks" + "tree" +
+    "render" add up to roughly "total".
+    """
+    pages = generate_corpus(config)
+    lexed = [list(iter_blocks(page.splitlines())) for page in pages]
+    inline_texts = [
+        block
+        for blocks in lexed
+        for kind, block in blocks
+        if kind in (BlockType.PARAGRAPH, BlockType.HEADING)
+    ]
+    trees = [markdown_to_html_node(page) for page in pages]
+
+    stages = {
+        "blocks": lambda: [markdown_to_blocks(page) for page in pages],
+        "inline": lambda: [text_to_textnodes(text) for text in inline_texts],
+        "tree": lambda: [
+            [block_to_html_node(kind, block) for kind, block in blocks]
+            for blocks in lexed
+        ],
+        "render": lambda: [tree.to_html() for tree in trees],
+        "total": lambda: [markdown_to_html_node(page).to_html() for page in pages],
+    }
+
+    total_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    results = {}
+    for name, fn in stages.items():
+        seconds = _best_of(repeat, fn)
+        results[name] = {
+            "seconds": seconds,
+            "us_per_page": seconds / len(pages) * 1e6,
+            "mb_per_s": total_bytes / seconds / 1e6,
+        }
+    return {
+        "config": config.as_dict(),
+        "python": platform.python_version(),
+        "corpus_bytes": total_bytes,
+        "stages": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> list:
+    """
+    Return (stage, baseline_seconds, seconds, change) for every stage that got
+    slower than the baseline by more than *threshold*.
+    """
+    regressions = []
+    for stage, current in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before is None:
+            continue
+        change = current["seconds"] / before["seconds"] - 1
+        if change > threshold:
+            regressions.append((stage, before["seconds"], current["seconds"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.sh suite")
+    defaults = CorpusConfig()
+    for knob, value in defaults.as_dict().items():
+        parser.add_argument(
+            "--" + knob.replace("_", "-"), type=type(value), default=value
+        )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    config = CorpusConfig(**{knob: getattr(args, knob) for knob in defaults.as_dict()})
+    results = run_suite(config, args.repeat)
+
+    print(f"corpus: {config.pages} pages, {results['corpus_bytes']} bytes")
+    for stage, timing in results["stages"].items():
+        print(
+            f"{stage:>8}: {timing['seconds'] * 1e3:9.2f} ms "
+            f"{timing['us_per_page']:9.1f} us/page {timing['mb_per_s']:7.2f} MB/s"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("warning: baseline was run with a different corpus config")
+        regressions = compare(results, baseline, args.threshold)
+        for stage, before, after, change in regressions:
+            print(
+                f"REGRESSION {stage}: {before * 1e3:.2f} ms -> {after * 1e3:.2f} ms "
+                f"(+{change:.0%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+        print(f"no stage regressed by more than {args.threshold:.0%}")
+    return 0
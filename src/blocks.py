@@ -1,4 +1,8 @@
+import io
 from enum import Enum
+from typing import Iterable, Iterator, Tuple
+
+FENCE = "```"
 
 
 class BlockType(Enum):
@@ -17,26 +21,74 @@ class BlockType(Enum):
 def markdown_to_blocks(markdown: str) -> list:
     """
     Convert a string to a list of blocks.
-    The separator is \n\n.
+    The separator is a blank line; fenced code blocks are kept whole.
     """
-    # Split the text into blocks
-    blocks = markdown.split("\n\n")
-    update_blocks = []
+    return [text for _, text in iter_blocks(io.StringIO(markdown))]
 
-    # Loop through each block and assign to a list of strings
-    for block in blocks:
-        normalized_block = "\n".join(
-            line.lstrip() for line in block.splitlines()
-        ).strip()
-        update_blocks.append(normalized_block)
-        # If the block is empty, remove it from the list
-        if not normalized_block:
-            update_blocks.pop()
 
-    # Convert each block to a list of TextNode instances
-    # blocks = [text_to_textnodes(block) for block in blocks]
+def iter_blocks(lines: Iterable[str]) -> Iterator[Tuple[BlockType, str]]:
+    """
+    Lex markdown *lines* into already-classified (BlockType, text) blocks.
 
-    return update_blocks
+    Accepts any line iterator, e.g. an open file, and makes a single pass
+    holding only the current block in memory.  Lines are left-stripped as in
+    markdown_to_blocks, except inside a ``` fence, where blank lines are kept
+    and only the fence's own indentation is removed.
+    """
+    buf: list = []
+    block_type = None
+    fence_indent = None  # indentation of the open fence, None outside fences
+
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        stripped = line.lstrip()
+
+        # 1. Inside a fence: keep everything until the closing fence
+        if fence_indent is not None:
+            indent = len(line) - len(stripped)
+            buf.append(line[min(indent, fence_indent) :])
+            if _is_closing_fence(stripped):
+                buf[-1] = stripped.rstrip()
+                yield BlockType.CODE, "\n".join(buf)
+                buf, fence_indent = [], None
+            continue
+
+        # 2. A blank line ends the current block
+        if not stripped:
+            if buf:
+                yield block_type, "\n".join(buf).rstrip()
+                buf = []
+            continue
+
+        # 3. An opening fence ends the current block and starts a code block
+        if stripped.startswith(FENCE):
+            if buf:
+                yield block_type, "\n".join(buf).rstrip()
+                buf = []
+            stripped = stripped.rstrip()
+            if len(stripped) >= 2 * len(FENCE) and stripped.endswith(FENCE):
+                yield BlockType.CODE, stripped  # ```one-liner```
+                continue
+            buf.append(stripped)
+            fence_indent = len(line) - len(line.lstrip())
+            continue
+
+        # 4. Any other line: the first one decides the block type
+        if not buf:
+            block_type = block_to_block_type(stripped)
+        buf.append(stripped)
+
+    # An unterminated fence runs to the end of input
+    if buf:
+        text = "\n".join(buf).rstrip()
+        if fence_indent is not None:
+            block_type = block_to_block_type(text)
+        yield block_type, text
+
+
+def _is_closing_fence(stripped: str) -> bool:
+    fence = stripped.rstrip()
+    return len(fence) >= len(FENCE) and not fence.strip("`")
 
 
 def block_to_block_type(md: str):
@@ -60,11 +112,12 @@ def block_to_block_type(md: str):
         return BlockType.QUOTE
 
     # Check if the block is an unordered list
-    if md.startswith("-") or md.startswith("*") or md.startswith("+"):
+    # (the marker must be followed by a space, so "**bold** text" is not one)
+    if md[:2] in ("- ", "* ", "+ "):
         return BlockType.UNORDERED_LIST
 
     # Check if the block is an ordered list
-    if md[0].isdigit() and md[1] == ".":
+    if md[0].isdigit() and md[1:2] == ".":
         return BlockType.ORDERED_LIST
 
     # If none of the above, return paragraph
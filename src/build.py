@@ -0,0 +1,532 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import htmlnode
+import profiling
+import render
+from assets import load_asset_index, mirror_assets
+from fragment_cache import FragmentCache
+from highlight import HighlightCache
+from htmlnode import escape_text
+from inline_cache import InlineCache
+from linkgraph import LINKGRAPH_NAME, LinkGraph
+from manifest import MANIFEST_NAME, Manifest, file_hash, generator_version
+from pipeline import pipelined
+from render import PageContext, markdown_to_html_node, outline_to_html_node
+from search import SearchIndex
+from shard import shard_of, write_shard_info
+from template import load_template
+from writer import HashingSink, OutputWriter, StagedOutput, WriteReport
+
+MARKDOWN_SUFFIX = ".md"
+HTML_SUFFIX = ".html"
+
+# Upper bound on pages per worker task; small sites get smaller batches so
+# every worker still has something to do.
+CHUNK_SIZE = 64
+
+
+class BuildReport:
+    def __init__(self, pages: int = 0, workers: int = 1):
+        self.pages = pages
+        self.workers = workers
+        self.rebuilt = 0
+        self.skipped = 0
+        self.pruned = 0
+        self.bytes_out = 0  # rendered bytes, written or not
+        self.writes = WriteReport()
+        self.seconds = 0.0
+        self.profile = None  # profiling.Profiler when built with profile=True
+        # InlineCache / FragmentCache stats when enabled: counters summed
+        # over workers, "size" the largest of any one worker's cache
+        self.inline_cache = None
+        self.fragment_cache = None
+        self.highlight_cache = None  # summed HighlightCache stats when enabled
+        self.assets = None  # assets.AssetReport when a static dir is given
+        self.broken_links = None  # [linkgraph.BrokenLink] with check_links=True
+
+    def __repr__(self):
+        return (
+            f"BuildReport(pages={self.pages}, workers={self.workers}, "
+            f"rebuilt={self.rebuilt}, skipped={self.skipped}, "
+            f"pruned={self.pruned}, bytes_out={self.bytes_out}, "
+            f"bytes_written={self.writes.bytes_written}, "
+            f"bytes_skipped={self.writes.bytes_skipped}, "
+            f"seconds={self.seconds:.3f})"
+        )
+
+
+def find_pages(content_dir: str) -> list:
+    """
+    Return the markdown files under *content_dir* as sorted relative paths.
+    """
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        for name in files:
+            if name.endswith(MARKDOWN_SUFFIX):
+                pages.append(os.path.relpath(os.path.join(root, name), content_dir))
+    pages.sort()
+    return pages
+
+
+def output_path_for(page: str) -> str:
+    """
+    Map a relative markdown path to its relative HTML output path.
+    """
+    return page[: -len(MARKDOWN_SUFFIX)] + HTML_SUFFIX
+
+
+def url_path_for(page: str) -> str:
+    """
+    Map a relative markdown path to its site path, as used in links.
+    """
+    return output_path_for(page).replace(os.sep, "/")
+
+
+def render_page(
+    source_path: str,
+    output_path: str,
+    template: str = None,
+    writer: OutputWriter = None,
+    index_terms: bool = False,
+) -> tuple:
+    """
+    Render one markdown file to HTML, wrapped in the layout at *template*
+    if given, and stage it in *writer*; without one the page is written
+    straight away.  *index_terms* is passed on to stream_markdown.
+
+    Returns (output_hash, output_size, PageContext).
+    """
+    if writer is None:
+        with OutputWriter() as writer:
+            return render_page(source_path, output_path, template, writer, index_terms)
+
+    profiler = profiling.active
+    if profiler is None:
+        text = read_source(source_path)
+        staged = writer.open(output_path)
+        page = stream_markdown(text, source_path, staged, template, index_terms)
+        finish_output(writer, staged)
+    else:
+        with profiler.page(source_path):
+            text = read_source(source_path)
+            staged = writer.open(output_path)
+            page = stream_markdown(text, source_path, staged, template, index_terms)
+            finish_output(writer, staged)
+    return staged.hexdigest(), staged.size, page
+
+
+def read_source(source_path: str) -> str:
+    """
+    Read one markdown file; the "read" stage when profiling.
+    """
+    profiler = profiling.active
+    if profiler is None:
+        with open(source_path, encoding="utf-8") as source:
+            return source.read()
+    with profiler.stage("read") as stage:
+        with open(source_path, encoding="utf-8") as source:
+            text = source.read()
+        stage.bytes_in = len(text)
+    return text
+
+
+def render_markdown(
+    text: str, source_path: str, template: str = None, index_terms: bool = False
+) -> tuple:
+    """
+    Convert the markdown of *source_path* to the bytes of its HTML page, as
+    stream_markdown would write them.
+
+    Returns (html_bytes, sha256_hexdigest, PageContext).
+    """
+    sink = HashingSink(io.BytesIO())
+    page = stream_markdown(text, source_path, sink, template, index_terms)
+    return sink.raw.getvalue(), sink.hexdigest(), page
+
+
+def stream_markdown(
+    text: str,
+    source_path: str,
+    sink: HashingSink,
+    template: str = None,
+    index_terms: bool = False,
+) -> PageContext:
+    """
+    Convert the markdown of *source_path* to HTML, wrapped in the layout at
+    *template* if given, streaming it into *sink* piece by piece.  With
+    *index_terms* the PageContext also collects the page's search terms.
+
+    Returns the PageContext.
+    """
+    page = PageContext(index_terms)
+    html_node = markdown_to_html_node(text, page)
+    profiler = profiling.active
+    if profiler is None:
+        _serialize(html_node, page, source_path, template, sink)
+    else:
+        # The other stages are timed in render.py; rendering streams to the
+        # temp file, so this one includes its writes
+        with profiler.stage("render") as stage:
+            _serialize(html_node, page, source_path, template, sink)
+            stage.bytes_out = sink.size
+    return page
+
+
+def _serialize(
+    html_node, page: PageContext, source_path: str, template: str, sink
+) -> None:
+    if template is None:
+        html_node.render_to(sink)
+        return
+    name = os.path.basename(source_path)[: -len(MARKDOWN_SUFFIX)]
+    title = escape_text(page.title or name)
+    layout = load_template(template)
+    context = {"title": title, "content": html_node}
+    if "toc" in layout.slots:
+        context["toc"] = outline_to_html_node(page.outline)
+    layout.render_to(sink, context)
+
+
+def finish_output(writer: OutputWriter, staged: StagedOutput) -> None:
+    """
+    Compare a streamed page with its old output and stage it for commit, or
+    drop it if unchanged; the "write" stage when profiling.
+    """
+    profiler = profiling.active
+    if profiler is None:
+        writer.finish(staged)
+    else:
+        with profiler.stage("write") as stage:
+            writer.finish(staged)
+            stage.bytes_out = staged.size
+
+
+# Worker settings beyond the render state, set by _init_worker: whether
+# outputs are fsynced, the queue depth of pipelined batches (0: off) and
+# whether pages collect search terms
+_fsync = True
+_pipeline_depth = 0
+_index_terms = False
+
+
+def _init_worker(
+    profile: bool,
+    trace: bool,
+    inline_cache_size: int,
+    fragment_cache_size: int,
+    fsync: bool,
+    pipeline_depth: int,
+    index_terms: bool,
+    inline_limit: int,
+    highlight_cache_dir: str,
+) -> None:
+    # Per-process render state: the pool initializer, or called in-process
+    # when rendering with a single worker.
+    global _fsync, _pipeline_depth, _index_terms
+    _fsync = fsync
+    _pipeline_depth = pipeline_depth
+    _index_terms = index_terms
+    render.set_inline_limit(inline_limit)
+    if profile:
+        profiling.enable(trace)
+    if inline_cache_size:
+        render.set_inline_cache(InlineCache(inline_cache_size))
+    if fragment_cache_size:
+        htmlnode.set_fragment_cache(FragmentCache(fragment_cache_size))
+    if highlight_cache_dir:
+        render.set_highlight_cache(HighlightCache(highlight_cache_dir))
+
+
+def _reset_worker() -> None:
+    global _fsync, _pipeline_depth, _index_terms
+    _fsync = True
+    _pipeline_depth = 0
+    _index_terms = False
+    profiling.disable()
+    render.set_inline_cache(None)
+    render.set_inline_limit(render.MAX_INLINE_CHARS)
+    render.set_highlight_cache(None)
+    htmlnode.set_fragment_cache(None)
+
+
+def _render_batch(batch: list) -> tuple:
+    # Worker entry point: one pickled task per batch, not per page.  Returns
+    # the page results, the batch's WriteReport and its profile / cache
+    # stats, if enabled.  Outputs are committed, and fsynced, per batch.
+    with OutputWriter(_fsync) as writer:
+        if _pipeline_depth:
+            results = _render_pipelined(batch, writer, _pipeline_depth)
+        else:
+            results = [
+                (page, *render_page(source, output, template, writer, _index_terms))
+                for page, source, output, template in batch
+            ]
+    extras = {"writes": writer.report}
+    if profiling.active is not None:
+        extras["profile"] = profiling.active.drain()
+    if render.inline_cache is not None:
+        extras["inline_cache"] = render.inline_cache.drain_stats()
+    if htmlnode.fragment_cache is not None:
+        extras["fragment_cache"] = htmlnode.fragment_cache.drain_stats()
+    if render.highlight_cache is not None:
+        render.highlight_cache.flush()
+        extras["highlight_cache"] = render.highlight_cache.drain_stats()
+    return results, extras
+
+
+def _render_pipelined(batch: list, writer: OutputWriter, depth: int) -> list:
+    # render_page split over pipeline stages: sources are read, and streamed
+    # outputs compared with the old ones, on their own threads while this
+    # one converts markdown into temp files.
+    index = _index_terms
+
+    def convert(task, text):
+        page, source, output, template = task
+        staged = writer.open(output)
+        profiler = profiling.active
+        if profiler is None:
+            facts = stream_markdown(text, source, staged, template, index)
+        else:
+            with profiler.page(source):
+                facts = stream_markdown(text, source, staged, template, index)
+        return page, staged, facts
+
+    def write(converted):
+        page, staged, facts = converted
+        finish_output(writer, staged)
+        return page, staged.hexdigest(), staged.size, facts
+
+    return pipelined(batch, lambda task: read_source(task[1]), convert, write, depth)
+
+
+def _add_cache_stats(total: dict, stats: dict) -> dict:
+    # Counters add up; "size" is one worker's entry count, so the largest
+    # seen is kept rather than a sum over batches and workers
+    if total is None:
+        total = dict.fromkeys((key for key in stats if key != "hit_rate"), 0)
+    for key in total:
+        if key == "size":
+            total[key] = max(total[key], stats[key])
+        else:
+            total[key] += stats[key]
+    lookups = total["hits"] + total["misses"]
+    total["hit_rate"] = total["hits"] / lookups if lookups else 0.0
+    return total
+
+
+def _batches(tasks: list, workers: int, chunk_size: int) -> list:
+    size = max(1, min(chunk_size, -(-len(tasks) // (workers * 4))))
+    return [tasks[i : i + size] for i in range(0, len(tasks), size)]
+
+
+def prune_page(output_dir: str, page: str) -> None:
+    """
+    Remove a deleted page's output and any directories it leaves empty.
+    """
+    path = os.path.join(output_dir, output_path_for(page))
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    while os.path.abspath(directory) != os.path.abspath(output_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def build_site(
+    content_dir: str,
+    output_dir: str,
+    workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+    force: bool = False,
+    profile: bool = False,
+    trace: bool = False,
+    inline_cache_size: int = 0,
+    fragment_cache_size: int = 0,
+    template: str = None,
+    static_dir: str = None,
+    asset_mode: str = "auto",
+    check_links: bool = False,
+    fsync: bool = True,
+    pipeline_depth: int = 0,
+    search_index: bool = False,
+    shard: tuple = None,
+    max_inline_chars: int = render.MAX_INLINE_CHARS,
+    highlight_cache: str = None,
+) -> BuildReport:
+    """
+    Render the markdown pages under *content_dir* into a mirrored HTML tree
+    under *output_dir*, spreading batches of pages over a process pool.
+
+    Only pages whose source or generator version changed since the last
+    build are rendered (all of them with ``force=True``); outputs of deleted
+    sources are pruned.  *workers* defaults to the CPU count; ``workers=1``
+    renders in-process.
+
+    Rendered pages whose bytes did not change are not rewritten; the others
+    are replaced atomically, and fsynced unless *fsync* is false.  A non-zero
+    *pipeline_depth* has each worker read sources and write outputs on
+    threads of their own, joined to the rendering thread by queues of that
+    many pages, so I/O latency overlaps with rendering.
+
+    With *profile* (or *trace*, which also records Chrome trace events) the
+    report carries a profiling.Profiler merged from every worker.  A non-zero
+    *inline_cache_size* gives each worker an InlineCache of that many entries,
+    and a non-zero *fragment_cache_size* a FragmentCache.
+
+    *template* is a layout file with {{ title }} and {{ content }} slots,
+    and optionally {{ toc }} for the page's table of contents;
+    changing it rebuilds every page.
+
+    Files under *static_dir* are mirrored into *output_dir* by
+    assets.mirror_assets with *asset_mode*.
+
+    Links, images and heading anchors of every rendered page go into the
+    site's LinkGraph, kept next to the manifest; *check_links* validates it
+    afterwards.
+
+    With *search_index* the words of every rendered page go into the
+    incremental search.SearchIndex under *output_dir*/search.
+
+    *shard* = (i, N) renders only the pages shard.shard_of puts in shard i
+    of N, for merge.merge_shards to combine; links are checked after the
+    merge, so *check_links* is refused.
+
+    A paragraph, heading or list item longer than *max_inline_chars*
+    characters fails the build with ValueError (0: no limit).
+
+    Code blocks whose fence names a known language are highlighted; with
+    *highlight_cache*, a directory that may be shared between builds and
+    shards, each distinct snippet is tokenized only once.
+    """
+    started = time.perf_counter()
+    if shard is not None and check_links:
+        raise ValueError("Check links after merging the shards, not per shard")
+    if template is not None:
+        template = os.path.abspath(template)
+        load_template(template)  # fail early on a missing layout
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    layout_hash = file_hash(template) if template is not None else ""
+    manifest = Manifest.load(manifest_path, generator_version(layout_hash))
+    graph_path = os.path.join(output_dir, LINKGRAPH_NAME)
+    graph = LinkGraph.load(graph_path)
+    index = SearchIndex.load(output_dir) if search_index else None
+    pages = find_pages(content_dir)
+    if shard is not None:
+        pages = [page for page in pages if shard_of(page, shard[1]) == shard[0]]
+    report = BuildReport(len(pages))
+
+    tasks, source_hashes = [], {}
+    for page in pages:
+        source = os.path.join(content_dir, page)
+        output = os.path.join(output_dir, output_path_for(page))
+        source_hashes[page] = file_hash(source)
+        if (
+            not force
+            and manifest.is_fresh(page, source_hashes[page], output)
+            and url_path_for(page) in graph
+            and (
+                index is None
+                or index.is_current(url_path_for(page), source_hashes[page])
+            )
+        ):
+            report.skipped += 1
+        else:
+            tasks.append((page, source, output, template))
+
+    current = set(pages)
+    for page in [page for page in manifest.pages if page not in current]:
+        prune_page(output_dir, page)
+        manifest.forget(page)
+        graph.remove_page(url_path_for(page))
+        if index is not None:
+            index.remove_page(url_path_for(page))
+        report.pruned += 1
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    report.workers = workers
+    batches = _batches(tasks, workers, chunk_size)
+    profile = profile or trace
+    if profile:
+        report.profile = profiling.Profiler(trace)
+    worker_args = (
+        profile,
+        trace,
+        inline_cache_size,
+        fragment_cache_size,
+        fsync,
+        pipeline_depth,
+        search_index,
+        max_inline_chars,
+        highlight_cache,
+    )
+    if workers == 1:
+        _init_worker(*worker_args)
+        results = map(_render_batch, batches)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=worker_args
+        )
+        results = executor.map(_render_batch, batches)
+
+    try:
+        for batch, extras in results:
+            for page, output_hash, size, facts in batch:
+                manifest.record(page, source_hashes[page], output_hash)
+                graph.set_page(
+                    url_path_for(page),
+                    facts.links,
+                    facts.images,
+                    [heading.slug for heading in facts.outline],
+                )
+                if index is not None:
+                    index.set_page(
+                        url_path_for(page),
+                        facts.title,
+                        facts.terms,
+                        source_hashes[page],
+                    )
+                report.rebuilt += 1
+                report.bytes_out += size
+            report.writes.merge(extras["writes"])
+            if "profile" in extras:
+                report.profile.merge(extras["profile"])
+            if "inline_cache" in extras:
+                report.inline_cache = _add_cache_stats(
+                    report.inline_cache, extras["inline_cache"]
+                )
+            if "fragment_cache" in extras:
+                report.fragment_cache = _add_cache_stats(
+                    report.fragment_cache, extras["fragment_cache"]
+                )
+            if "highlight_cache" in extras:
+                report.highlight_cache = _add_cache_stats(
+                    report.highlight_cache, extras["highlight_cache"]
+                )
+    finally:
+        if workers > 1:
+            executor.shutdown()
+        else:
+            _reset_worker()
+
+    if static_dir is not None:
+        report.assets = mirror_assets(static_dir, output_dir, asset_mode)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest.save(manifest_path)
+    graph.save(graph_path)
+    if index is not None:
+        index.save()
+    write_shard_info(output_dir, shard, manifest.generator)
+    if check_links:
+        report.broken_links = graph.check(load_asset_index(output_dir))
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,191 @@
+"""
+Thin client for the build daemon (daemon.py).
+
+Only the standard library is imported up front, so a request to a running
+daemon costs little more than interpreter start-up.  With no daemon
+listening, render() and build() run in-process instead, importing the
+generator on demand.
+"""
+
+import argparse
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+
+SOCKET_NAME = "bdd-ssg.sock"
+
+
+def default_socket_path() -> str:
+    """
+    $XDG_RUNTIME_DIR/bdd-ssg.sock, or bdd-ssg.sock in a per-user directory
+    of the temp dir that only its owner can access, created if missing.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    directory = os.path.join(tempfile.gettempdir(), f"bdd-ssg-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    # Another user may have made it first, to serve or read our requests
+    info = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        raise PermissionError(f"{directory} is not a private directory of this user")
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def check_socket_owner(socket_path: str) -> None:
+    """
+    Raise PermissionError if the file at *socket_path* belongs to another
+    user; a missing file is fine.
+    """
+    try:
+        info = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if info.st_uid != os.getuid():
+        raise PermissionError(
+            f"{socket_path} belongs to another user (uid {info.st_uid})"
+        )
+
+
+def request(payload: dict, socket_path: str = None) -> dict:
+    """
+    Send one request to the daemon and return its response, or None if no
+    daemon is listening on *socket_path*.  A socket another user owns
+    raises PermissionError instead of being connected to.
+    """
+    socket_path = socket_path or default_socket_path()
+    check_socket_owner(socket_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    with sock, sock.makefile("rb") as reply:
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        line = reply.readline()
+    if not line:
+        raise RuntimeError("The build daemon closed the connection")
+    return json.loads(line)
+
+
+def _checked(response: dict) -> dict:
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response
+
+
+def render(source: str, template: str = None, socket_path: str = None) -> dict:
+    """
+    Render the markdown file *source* to HTML, without writing it.  Returns
+    {"html", "title", "daemon": bool}.
+    """
+    source = os.path.abspath(source)
+    template = os.path.abspath(template) if template is not None else None
+    payload = {"op": "render", "source": source, "template": template}
+    response = request(payload, socket_path)
+    if response is not None:
+        return {**_checked(response), "daemon": True}
+    from build import read_source, render_markdown
+
+    data, _, page = render_markdown(read_source(source), source, template)
+    return {"html": data.decode("utf-8"), "title": page.title, "daemon": False}
+
+
+def build(
+    content: str,
+    output: str,
+    template: str = None,
+    force: bool = False,
+    socket_path: str = None,
+) -> dict:
+    """
+    Bring *output* up to date with *content*.  Returns {"rebuilt",
+    "skipped", "pruned", "failed", "seconds", "daemon": bool}, where
+    "failed" maps the pages that could not be rendered to the error.
+    """
+    content, output = os.path.abspath(content), os.path.abspath(output)
+    template = os.path.abspath(template) if template is not None else None
+    payload = {
+        "op": "build",
+        "content": content,
+        "output": output,
+        "template": template,
+        "force": force,
+    }
+    response = request(payload, socket_path)
+    if response is not None:
+        return {**_checked(response), "daemon": True}
+    from build import build_site
+
+    report = build_site(content, output, template=template, force=force)
+    return {
+        "rebuilt": report.rebuilt,
+        "skipped": report.skipped,
+        "pruned": report.pruned,
+        "failed": {},
+        "seconds": report.seconds,
+        "daemon": False,
+    }
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="client.sh")
+    parser.add_argument("--socket", help="daemon socket (default: per user)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render_ = commands.add_parser("render", help="print one page's HTML")
+    render_.add_argument("source")
+    render_.add_argument("--template")
+
+    build_ = commands.add_parser("build", help="build a site")
+    build_.add_argument("content", nargs="?", default="content")
+    build_.add_argument("output", nargs="?", default="public")
+    build_.add_argument("--template")
+    build_.add_argument("--force", action="store_true")
+
+    commands.add_parser("ping", help="check that a daemon is running")
+    commands.add_parser("stop", help="shut the daemon down")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = make_parser().parse_args(argv)
+    if args.command == "render":
+        result = render(args.source, args.template, args.socket)
+        sys.stdout.write(result["html"])
+        return 0
+    if args.command == "build":
+        result = build(
+            args.content, args.output, args.template, args.force, args.socket
+        )
+        where = "daemon" if result["daemon"] else "in-process"
+        print(
+            f"Built in {result['seconds']:.3f}s ({where}): {result['rebuilt']} "
+            f"rebuilt, {result['skipped']} skipped, {result['pruned']} pruned"
+        )
+        for page, error in result["failed"].items():
+            print(f"Failed to render {page}: {error}", file=sys.stderr)
+        return 1 if result["failed"] else 0
+    op = "ping" if args.command == "ping" else "shutdown"
+    response = request({"op": op}, args.socket)
+    if response is None:
+        print("No build daemon running", file=sys.stderr)
+        return 1
+    if op == "ping":
+        print(f"Build daemon {response['pid']}: {response['requests']} requests served")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Long-running build server, so on-demand renders skip interpreter start-up,
+imports and cache warm-up.
+
+Requests arrive on a Unix domain socket as one JSON object per connection
+and get one JSON object back; see client.py.  The daemon keeps an
+InlineCache, the parsed templates and, per (content, output, template)
+site, a watch.Watcher holding the manifest, link graph and last scan, so
+a repeated build only re-renders what changed since the previous one.
+Requests are served one at a time.
+"""
+
+import json
+import os
+import socketserver
+import threading
+
+import render
+from build import build_site, read_source, render_markdown
+from client import check_socket_owner, default_socket_path, request
+from inline_cache import InlineCache
+from manifest import generator_version
+from watch import Watcher
+
+# Entries of the daemon's InlineCache; it lives as long as the daemon
+INLINE_CACHE_SIZE = 65536
+
+
+class BuildDaemon:
+    """
+    The state kept between requests, and the request handlers.
+    """
+
+    def __init__(self, inline_cache_size: int = INLINE_CACHE_SIZE):
+        self.inline_cache = (
+            InlineCache(inline_cache_size) if inline_cache_size else None
+        )
+        render.set_inline_cache(self.inline_cache)
+        self._sites = {}  # (content, output, template) → Watcher
+        # Version of the code this process imported
+        self.generator = generator_version()
+        self.requests = 0
+
+    def handle(self, request: dict) -> dict:
+        """
+        Answer one request; failures come back as {"ok": False, "error"}.
+        """
+        self.requests += 1
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            return {"ok": False, "error": f"Unknown op {op!r}"}
+        args = {key: value for key, value in request.items() if key != "op"}
+        try:
+            return {"ok": True, **handler(**args)}
+        except Exception as exc:
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+    def op_ping(self) -> dict:
+        return {"pid": os.getpid(), "requests": self.requests}
+
+    def op_render(self, source: str, template: str = None) -> dict:
+        """
+        Render one markdown file to HTML without writing anything.
+        """
+        data, _, page = render_markdown(read_source(source), source, template)
+        return {"html": data.decode("utf-8"), "title": page.title}
+
+    def op_build(
+        self, content: str, output: str, template: str = None, force: bool = False
+    ) -> dict:
+        """
+        Bring *output* up to date.  The first build of a site (and every
+        forced one) is a full build_site, and so is one after its layout or
+        manifest changed; later ones re-render only the pages whose files
+        changed since, from the site's in-memory state.  Pages that fail to
+        render are reported in "failed" and retried by the next request.
+        """
+        if generator_version() != self.generator:
+            raise RuntimeError(
+                "The generator changed since the daemon started; restart it"
+            )
+        key = (content, output, template)
+        watcher = self._sites.get(key)
+        if watcher is None or force or watcher.outdated():
+            report = build_site(content, output, template=template, force=force)
+            # An in-process build_site resets the render state it set up
+            render.set_inline_cache(self.inline_cache)
+            self._sites[key] = Watcher(content, output, template=template)
+            return {
+                "rebuilt": report.rebuilt,
+                "skipped": report.skipped,
+                "pruned": report.pruned,
+                "failed": {},
+                "seconds": report.seconds,
+            }
+        changed, deleted = watcher.poll()
+        report = watcher.rebuild(changed, deleted)
+        watcher.flush()
+        skipped = len(watcher.last_scan) - len(report.rebuilt) - len(report.failed)
+        for page in report.failed:
+            watcher.last_scan.pop(page, None)
+        return {
+            "rebuilt": len(report.rebuilt),
+            "skipped": skipped,
+            "pruned": len(report.pruned),
+            "failed": report.failed,
+            "seconds": report.seconds,
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError as exc:
+            response = {"ok": False, "error": f"Bad request: {exc}"}
+        else:
+            if request.get("op") == "shutdown":
+                response = {"ok": True}
+                # shutdown() waits for serve_forever, which waits for us
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                response = self.server.daemon.handle(request)
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    Unix socket server for a BuildDaemon, readable and writable by its
+    owner only.  A socket file left behind by a dead daemon is replaced;
+    one a daemon still answers on raises RuntimeError, and one another user
+    owns PermissionError.
+    """
+
+    def __init__(self, socket_path: str = None, daemon: BuildDaemon = None):
+        self.socket_path = socket_path or default_socket_path()
+        # Never serve on, or remove, a socket another user put there
+        check_socket_owner(self.socket_path)
+        if os.path.exists(self.socket_path):
+            if request({"op": "ping"}, self.socket_path) is not None:
+                raise RuntimeError(f"A build daemon is already on {self.socket_path}")
+            os.remove(self.socket_path)
+        self.daemon = daemon or BuildDaemon()
+        umask = os.umask(0o077)
+        try:
+            super().__init__(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(
+    socket_path: str = None, inline_cache_size: int = INLINE_CACHE_SIZE, log=print
+):
+    """
+    Serve build requests on *socket_path* until a shutdown request.
+    """
+    with DaemonServer(socket_path, BuildDaemon(inline_cache_size)) as server:
+        log(f"Build daemon {os.getpid()} listening on {server.socket_path}")
+        server.serve_forever()
@@ -1,4 +1,152 @@
 import re
+from enum import Enum
+from typing import Iterator, NamedTuple
+
+# The reference syntax.  Its lazy groups make a scan quadratic on input such
+# as thousands of unclosed "[", so the parsers use ReferenceMatcher, which
+# gives the same matches in linear time; the pattern stays as the spec.
+# Images take precedence: the text of a link may not run across an image,
+# as in "[ see ![icon](i.png)", which is an image after literal text.
+REFERENCE_RE = re.compile(r"(!?)\[(.*?)\]\((.*?)\)")
+
+
+class RefKind(Enum):
+    IMAGE = "RefKind.IMAGE"
+    LINK = "RefKind.LINK"
+
+
+class MarkdownRef(NamedTuple):
+    kind: RefKind
+    text: str
+    url: str
+    start: int
+    end: int
+
+
+def ref_from_match(match: re.Match) -> MarkdownRef:
+    """
+    Build a MarkdownRef from a REFERENCE_RE match.
+    """
+    bang, text, url = match.groups()
+    kind = RefKind.IMAGE if bang else RefKind.LINK
+    return MarkdownRef(kind, text, url, match.start(), match.end())
+
+
+class ReferenceMatcher:
+    """
+    Matches REFERENCE_RE at given positions of one text, remembering where
+    the next "](", ")" and newline are, and the next image.  As long as the
+    positions tried do not go backwards, all matching over the text costs
+    linear time.
+    """
+
+    __slots__ = ("text", "_found", "_image_found", "_image")
+
+    def __init__(self, text: str):
+        self.text = text
+        # needle → (searched from, first index at or after it, or -1); the
+        # image look-ahead keeps its own, as it runs ahead of the links
+        self._found = self._new_found()
+        self._image_found = self._new_found()
+        # (searched from, first image starting at or after it, or None),
+        # or None before the first look-ahead
+        self._image = None
+
+    def _new_found(self) -> dict:
+        return {needle: (0, self.text.find(needle)) for needle in ("](", ")", "\n")}
+
+    def _find(self, found: dict, needle: str, start: int) -> int:
+        searched_from, index = found[needle]
+        if start >= searched_from and (index == -1 or index >= start):
+            return index
+        index = self.text.find(needle, start)
+        found[needle] = (start, index)
+        return index
+
+    def _match(self, found: dict, start: int) -> MarkdownRef:
+        # REFERENCE_RE.match at *start*, images not taking precedence
+        text = self.text
+        bang = text.startswith("!", start)
+        opener = start + 1 if bang else start
+        if not text.startswith("[", opener):
+            return None
+        body = opener + 1
+        # Lazy groups: the text runs to the first "](", the URL to the
+        # first ")" after it, and neither may cross a line break.
+        close = self._find(found, "](", body)
+        if close == -1:
+            return None
+        end = self._find(found, ")", close + 2)
+        if end == -1:
+            return None
+        newline = self._find(found, "\n", body)
+        if newline != -1 and newline < end:
+            return None
+        kind = RefKind.IMAGE if bang else RefKind.LINK
+        return MarkdownRef(
+            kind, text[body:close], text[close + 2 : end], start, end + 1
+        )
+
+    def _next_image(self, start: int) -> MarkdownRef:
+        # The first image starting at or after *start*, or None
+        if self._image is not None:
+            searched_from, image = self._image
+            if start >= searched_from and (image is None or image.start >= start):
+                return image
+        bang = self.text.find("![", start)
+        while bang != -1:
+            image = self._match(self._image_found, bang)
+            if image is not None:
+                break
+            bang = self.text.find("![", bang + 1)
+        else:
+            image = None
+        self._image = (start, image)
+        return image
+
+    def match(self, start: int) -> MarkdownRef:
+        """
+        The reference starting at *start* (at its "!" or "["), as
+        REFERENCE_RE.match would find it, or None.  A link an image starts
+        inside of is not a match.
+        """
+        ref = self._match(self._found, start)
+        if ref is None or ref.kind is RefKind.IMAGE:
+            return ref
+        image = self._next_image(start)
+        if image is not None and image.start < ref.end:
+            return None
+        return ref
+
+
+def iter_markdown_refs(markdown_text: str) -> Iterator[MarkdownRef]:
+    """
+    Yields every image and link in markdown text, left to right.
+
+    Args:
+        markdown_text (str): The markdown text to scan.
+
+    Returns:
+        Iterator[MarkdownRef]: kind, text, url and the [start, end) span of
+        each reference in *markdown_text*, as REFERENCE_RE.finditer would
+        find them with images taking precedence, in linear time.
+    """
+    matcher = ReferenceMatcher(markdown_text)
+    find = markdown_text.find
+    pos = 0
+    while True:
+        opener = find("[", pos)
+        if opener == -1:
+            return
+        start = (
+            opener - 1 if opener > pos and markdown_text[opener - 1] == "!" else opener
+        )
+        ref = matcher.match(start)
+        if ref is None:
+            pos = opener + 1
+        else:
+            yield ref
+            pos = ref.end
 
 
 def extract_markdown_images(markdown_text):
@@ -9,26 +157,27 @@ def extract_markdown_images(markdown_text):
         markdown_text (str): The markdown text to extract images from.
 
     Returns:
-        list: A list of image URLs.
+        list: A list of (alt, url) tuples.
     """
-    # Regular expression to match markdown image syntax
-    pattern = r"!\[(.*?)\]\((.*?)\)"
-    # pattern = r'!\[.*?\]\((.*?)\)'
-    matches = re.findall(pattern, markdown_text)
-    return matches
+    return [
+        (ref.text, ref.url)
+        for ref in iter_markdown_refs(markdown_text)
+        if ref.kind is RefKind.IMAGE
+    ]
 
 
 def extract_markdown_links(markdown_text):
     """
-    Extracts links from markdown text.
+    Extracts links from markdown text.  Images are not links.
 
     Args:
         markdown_text (str): The markdown text to extract links from.
 
     Returns:
-        list: A list of links.
+        list: A list of (text, url) tuples.
     """
-    # Regular expression to match markdown link syntax
-    pattern = r"\[(.*?)\]\((.*?)\)"
-    matches = re.findall(pattern, markdown_text)
-    return matches
+    return [
+        (ref.text, ref.url)
+        for ref in iter_markdown_refs(markdown_text)
+        if ref.kind is RefKind.LINK
+    ]
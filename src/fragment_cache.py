@@ -0,0 +1,214 @@
+from collections import OrderedDict
+
+from textnode import TextNode
+
+DEFAULT_SIZE = 4096
+
+# Deeper subtrees get no key and are rendered uncached
+MAX_KEY_DEPTH = 64
+
+
+def structural_key(node, depth: int = MAX_KEY_DEPTH):
+    """
+    Return a key built from the type, tag, value and props of *node* and of
+    everything below it, so two subtrees with equal keys render to the same
+    HTML; None if the subtree is more than *depth* levels deep.  TextNodes
+    are keyed by their type, text and url, which determine all three.
+
+    Keys of subtrees with unhashable prop values are unhashable too.
+    """
+    try:
+        return _key(node, depth)
+    except _TooDeep:
+        return None
+
+
+class _TooDeep(Exception):
+    pass
+
+
+def _key(node, depth: int) -> tuple:
+    # Recursion is several times faster than an explicit stack here; depth
+    # is bounded so it cannot hit the recursion limit.
+    if not depth:
+        raise _TooDeep
+    props = node.props
+    return (
+        type(node),
+        node.tag,
+        node.value,
+        tuple(props.items()) if props else None,
+        tuple(
+            [
+                (
+                    _key(child, depth - 1)
+                    if child.children
+                    # Reading a TextNode's props would build a LeafNode
+                    else (
+                        (TextNode, child.text_type, child.text, child.url)
+                        if type(child) is TextNode
+                        else (
+                            type(child),
+                            child.tag,
+                            child.value,
+                            tuple(child.props.items()) if child.props else None,
+                        )
+                    )
+                )
+                for child in node.children
+            ]
+        ),
+    )
+
+
+def _fingerprint(node) -> tuple:
+    # Type, tag, child count and the text of the first and last leaves
+    # below *node*: cheap, and rarely shared by subtrees that differ.
+    first = last = node
+    while first.children:
+        first = first.children[0]
+    while last.children:
+        last = last.children[-1]
+    return (type(node), node.tag, len(node.children), first.value, last.value)
+
+
+class _Capture:
+    # Stack marker popped after a missed subtree's closing tag: everything
+    # written since *start* is that subtree's HTML.
+    __slots__ = ("key", "start")
+
+    def __init__(self, key, start: int):
+        self.key = key
+        self.start = start
+
+
+class FragmentCache:
+    """
+    Size-bounded LRU of rendered HTML for subtrees with children, keyed by
+    their structural key, so a subtree repeated across pages (a callout, a
+    footer, a list item) is rendered once and then copied.
+
+    A subtree is only keyed and stored once a subtree with the same cheap
+    fingerprint has been seen, so one-off paragraphs neither pay for a key
+    nor evict shared fragments.  The root being rendered is never cached
+    itself; it is usually a whole page.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"FragmentCache size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_reused = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def render(self, root, write) -> None:
+        """
+        Render *root* through *write* like HTMLNode._render, serving cached
+        subtrees and caching missed ones.
+        """
+        entries = self._entries
+        seen = self._seen
+        max_seen = 4 * self.maxsize
+        # Pieces go straight to *write* unless a missed subtree is being
+        # captured, in which case they are held in *parts* until it closes.
+        parts = []
+        out = write
+        open_captures = 0
+        stack = [root]
+        pop = stack.pop
+        while stack:
+            item = pop()
+            kind = type(item)
+            if kind is str:
+                out(item)
+                continue
+            if kind is _Capture:
+                fragment = "".join(parts[item.start :])
+                self._store(item.key, fragment)
+                open_captures -= 1
+                if open_captures:
+                    parts[item.start :] = [fragment]
+                else:
+                    parts.clear()
+                    out = write
+                    write(fragment)
+                continue
+            if item is root or not item.children:
+                item._emit(out, stack)
+                continue
+
+            # A structural key costs about a third of rendering the subtree,
+            # so only subtrees whose fingerprint was seen before get one.
+            fingerprint = _fingerprint(item)
+            if fingerprint not in seen:
+                if len(seen) >= max_seen:
+                    seen.clear()
+                seen.add(fingerprint)
+                self.misses += 1
+                if item.children[0].children:
+                    item._emit(out, stack)  # look up its subtrees too
+                else:  # a block of inline leaves: render it in one go
+                    item._render_uncached(out)
+                continue
+            key = structural_key(item)
+            try:
+                fragment = entries.get(key) if key is not None else None
+            except TypeError:  # unhashable props
+                key = None
+            if key is None:
+                item._emit(out, stack)
+                continue
+            if fragment is not None:
+                entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_reused += len(fragment)
+                out(fragment)
+            else:
+                self.misses += 1
+                stack.append(_Capture(key, len(parts)))
+                open_captures += 1
+                out = parts.append
+                item._emit(out, stack)
+
+    def to_html(self, root) -> str:
+        parts = []
+        self.render(root, parts.append)
+        return "".join(parts)
+
+    def _store(self, key, fragment: str) -> None:
+        entries = self._entries
+        entries[key] = fragment
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "bytes_reused": self.bytes_reused,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def drain_stats(self) -> dict:
+        """
+        Return the counters and reset them, keeping the cached fragments;
+        used to ship worker stats back to the parent process.
+        """
+        stats = self.stats()
+        self.hits = self.misses = self.evictions = self.bytes_reused = 0
+        return stats
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._seen.clear()
@@ -0,0 +1,335 @@
+"""
+Syntax highlighting of fenced code blocks.
+
+Each language is a table of (token kind, pattern) rules, tried in order at
+every position of a single regex scan; text no rule claims stays plain.
+The fence's info string picks the table (```python, ```js, ...).  Rules
+that could run off the end of a snippet, such as an unclosed string or
+comment, take the rest of it instead of failing, so a scan is linear
+whatever the code.
+
+Tokenizing is the costly part, and code-heavy sites repeat the same
+snippets across pages, versions and shards, so HighlightCache keeps the
+tokens of recent snippets on disk under a hash of their language and code.
+"""
+
+import hashlib
+import json
+import os
+import re
+import uuid
+
+from manifest import file_hash
+
+# Fingerprint of the tables below: editing them invalidates cached tokens
+TABLES_VERSION = file_hash(__file__)
+
+PACK_SUFFIX = ".pack.json"
+
+# Packs a HighlightCache lets pile up before merging them
+MAX_PACKS = 16
+# Snippets a merge keeps beyond those used since the cache was opened
+MAX_ENTRIES = 10000
+
+
+def _words(words: str) -> str:
+    return r"\b(?:" + "|".join(words.split()) + r")\b"
+
+
+# Rules shared by several languages
+_NUMBER = (
+    "number",
+    r"\b0[xXoObB][0-9a-fA-F_]+\b|\b\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?|\.\d+",
+)
+_DQ_STRING = ("string", r'"(?:[^"\\\n]|\\.)*"?')
+_SQ_STRING = ("string", r"'(?:[^'\\\n]|\\.)*'?")
+_C_COMMENT = ("comment", r"//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)")
+_IDENTIFIER = (None, r"[^\W\d]\w*")
+
+_PYTHON_KEYWORDS = (
+    "False None True and as assert async await break class continue def del "
+    "elif else except finally for from global if import in is lambda nonlocal "
+    "not or pass raise return try while with yield"
+)
+_PYTHON_BUILTINS = (
+    "bool bytes dict enumerate float int isinstance len list map max min open "
+    "print range repr self set sorted str sum super tuple type zip"
+)
+_JS_KEYWORDS = (
+    "as async await break case catch class const continue default delete do "
+    "else enum export extends false finally for from function if implements "
+    "import in instanceof interface let new null of return static super switch "
+    "this throw true try type typeof undefined var void while yield"
+)
+_JS_BUILTINS = "Array JSON Map Math Object Promise Set String console document window"
+_BASH_KEYWORDS = (
+    "case do done elif else esac export fi for function if in local return "
+    "then while"
+)
+_BASH_BUILTINS = "cd cp echo exit grep ls mkdir mv printf pwd read rm set source test"
+_SQL_KEYWORDS = (
+    "and as asc by create delete desc distinct drop from group having in index "
+    "insert into is join key left limit not null on or order primary select "
+    "set table union update values where with"
+)
+
+# language → (token kind, pattern) rules, in order of precedence.  Kind
+# None matches text only to skip it, so that a keyword is not found inside
+# a longer name and a failed rule does not rescan the same word.
+RULES = {
+    "python": [
+        ("comment", r"#[^\n]*"),
+        (
+            "string",
+            r"(?:\b[rRbBuUfF]{1,2})?"
+            r"(?:'''[\s\S]*?(?:'''|\Z)|\"\"\"[\s\S]*?(?:\"\"\"|\Z)"
+            r"|'(?:[^'\\\n]|\\.)*'?|\"(?:[^\"\\\n]|\\.)*\"?)",
+        ),
+        ("meta", r"@[^\W\d][\w.]*"),
+        ("keyword", _words(_PYTHON_KEYWORDS)),
+        ("builtin", _words(_PYTHON_BUILTINS)),
+        _NUMBER,
+        _IDENTIFIER,
+    ],
+    "javascript": [
+        _C_COMMENT,
+        _DQ_STRING,
+        _SQ_STRING,
+        ("string", r"`(?:[^`\\]|\\[\s\S])*`?"),
+        ("keyword", _words(_JS_KEYWORDS)),
+        ("builtin", _words(_JS_BUILTINS)),
+        _NUMBER,
+        (None, r"[^\W\d][\w$]*"),
+    ],
+    "json": [
+        ("property", r'"(?:[^"\\\n]|\\.)*"(?=\s*:)'),
+        _DQ_STRING,
+        ("keyword", _words("true false null")),
+        ("number", r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?"),
+    ],
+    "bash": [
+        ("comment", r"(?:^|(?<=\s))#[^\n]*"),
+        ("string", r'"(?:[^"\\]|\\[\s\S])*"?' + r"|'[^']*'?"),
+        ("variable", r"\$(?:\{[^}\n]*\}?|\w+|[@*#?$!-])"),
+        ("keyword", _words(_BASH_KEYWORDS)),
+        ("builtin", _words(_BASH_BUILTINS)),
+        (None, r"[\w-]+"),
+    ],
+    "css": [
+        ("comment", r"/\*[\s\S]*?(?:\*/|\Z)"),
+        _DQ_STRING,
+        _SQ_STRING,
+        ("keyword", r"@[\w-]+|!important\b"),
+        # A name before a colon is a property, unless a "{" follows on its
+        # line as in a:hover {
+        ("property", r"[\w-]+(?=\s*:[^;{}\n]{0,256}[;}\n])"),
+        ("number", r"#[0-9a-fA-F]{3,8}\b|-?(?:\d+\.?\d*|\.\d+)(?:%|[a-zA-Z]+)?"),
+        ("tag", r"[.#][\w-]+"),
+        (None, r"[\w-]+"),
+    ],
+    "html": [
+        ("comment", r"<!--[\s\S]*?(?:-->|\Z)"),
+        ("meta", r"<![^>]*>?"),
+        ("tag", r"</?[A-Za-z][\w:-]*|/?>"),
+        ("attr", r"[A-Za-z_:][\w:.-]*(?==)"),
+        ("string", r"(?<==)(?:\"[^\"]*\"?|'[^']*'?)"),
+        (None, r"[\w:.-]+"),
+    ],
+    "sql": [
+        ("comment", r"--[^\n]*|/\*[\s\S]*?(?:\*/|\Z)"),
+        ("string", r"'(?:[^']|'')*'?"),
+        ("keyword", "(?i:" + _words(_SQL_KEYWORDS) + ")"),
+        _NUMBER,
+        _IDENTIFIER,
+    ],
+}
+
+# Info string word → RULES key
+ALIASES = {
+    "py": "python",
+    "python3": "python",
+    "js": "javascript",
+    "jsx": "javascript",
+    "ts": "javascript",
+    "tsx": "javascript",
+    "typescript": "javascript",
+    "sh": "bash",
+    "shell": "bash",
+    "zsh": "bash",
+    "xml": "html",
+    "svg": "html",
+}
+
+
+def _compile(rules: list) -> tuple:
+    # One alternation with a numbered group per rule; returns the pattern
+    # and the token kind of each group.
+    pattern = "|".join(f"(?P<r{i}>{rule})" for i, (_, rule) in enumerate(rules))
+    kinds = {f"r{i}": kind for i, (kind, _) in enumerate(rules)}
+    return re.compile(pattern, re.MULTILINE), kinds
+
+
+_LEXERS = {language: _compile(rules) for language, rules in RULES.items()}
+
+
+def language_of(info: str) -> str:
+    """
+    The RULES language named by a fence's *info* string, or None.
+    """
+    words = info.split(None, 1)
+    if not words:
+        return None
+    name = words[0].lstrip("{.").rstrip("}").lower()
+    name = ALIASES.get(name, name)
+    return name if name in RULES else None
+
+
+def tokenize(code: str, language: str) -> list:
+    """
+    Split *code* into (kind, text) tokens by the rules of *language*; plain
+    text has kind None.  The texts add up to *code*.
+    """
+    pattern, kinds = _LEXERS[language]
+    tokens = []
+    pos = 0  # start of the plain text not yet emitted
+    for m in pattern.finditer(code):
+        kind = kinds[m.lastgroup]
+        if kind is None:
+            continue
+        start = m.start()
+        if start > pos:
+            tokens.append((None, code[pos:start]))
+        tokens.append((kind, m.group()))
+        pos = m.end()
+    if pos < len(code):
+        tokens.append((None, code[pos:]))
+    return tokens
+
+
+def default_cache_dir() -> str:
+    """
+    $XDG_CACHE_HOME/bdd-ssg/highlight, or ~/.cache/bdd-ssg/highlight.
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(root, "bdd-ssg", "highlight")
+
+
+class HighlightCache:
+    """
+    Tokens of highlighted snippets, keyed by the sha256 of their language
+    and code, kept under *directory* in pack files of
+    {"version": TABLES_VERSION, "tokens": {key: tokens}}.
+
+    Every pack is read on first use, so a lookup never touches the disk;
+    tokens of new snippets are buffered and written as one new pack by
+    flush().  Packs get unique names and are replaced atomically, so builds
+    and shards running at the same time can share a directory.
+
+    Once MAX_PACKS packs have piled up, flush() merges them into one that
+    keeps the snippets looked up through this cache, then the most recent
+    others up to MAX_ENTRIES; the rest, and packs that cannot be read or
+    were made by other tables, are dropped.  So the directory stays bounded
+    however many builds share it.
+
+    Results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # key → tokens of every pack, newest pack first, read on first use
+        self._tokens = None
+        self._packs = []  # pack files read or written by this cache
+        self._new = {}  # key → tokens not yet flushed
+        self._used = set()  # keys looked up through this cache
+        self.hits = 0
+        self.misses = 0
+
+    def tokens(self, code: str, language: str):
+        """
+        Return the tokens of *code*, tokenizing it only if it is new.
+        """
+        if self._tokens is None:
+            self._load()
+        key = hashlib.sha256(f"{language}\0{code}".encode("utf-8")).hexdigest()
+        self._used.add(key)
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            tokens = self._tokens[key] = self._new[key] = tokenize(code, language)
+            self.misses += 1
+        else:
+            self.hits += 1
+        return tokens
+
+    def _load(self) -> None:
+        self._tokens = {}
+        try:
+            entries = [
+                (entry.stat().st_mtime_ns, entry.path)
+                for entry in os.scandir(self.directory)
+                if entry.name.endswith(PACK_SUFFIX)
+            ]
+        except FileNotFoundError:
+            return
+        for _, path in sorted(entries, reverse=True):
+            self._packs.append(path)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    pack = json.load(f)
+                if pack["version"] != TABLES_VERSION:
+                    continue
+                for key, tokens in pack["tokens"].items():
+                    self._tokens.setdefault(key, tokens)
+            except (OSError, ValueError, TypeError, KeyError, AttributeError):
+                continue
+
+    def flush(self) -> None:
+        """
+        Write the tokens found since the last flush as a new pack; past
+        MAX_PACKS, merge the packs read into one, bounded as described above.
+        """
+        compact = len(self._packs) >= MAX_PACKS
+        if not self._new and not compact:
+            return
+        if compact:
+            tokens = {key: self._tokens[key] for key in self._used}
+            for key, value in self._tokens.items():
+                if len(tokens) >= MAX_ENTRIES:
+                    break
+                tokens.setdefault(key, value)
+        else:
+            tokens = self._new
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, uuid.uuid4().hex + PACK_SUFFIX)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            pack = {"version": TABLES_VERSION, "tokens": tokens}
+            json.dump(pack, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+        if compact:
+            # Packs other processes wrote since they were read stay
+            for old in self._packs:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+            self._packs = []
+        self._packs.append(path)
+        self._new = {}
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def drain_stats(self) -> dict:
+        """
+        Return the counters and reset them, keeping the tokens; used to ship
+        worker stats back to the parent process.
+        """
+        stats = self.stats()
+        self.hits = self.misses = 0
+        return stats
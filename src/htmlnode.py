@@ -1,4 +1,55 @@
+import io
+from types import MappingProxyType
+
+# Shared read-only defaults so childless / attribute-less nodes allocate nothing
+NO_CHILDREN = ()
+NO_PROPS = MappingProxyType({})
+
+# Escaping: C-level substring scans decide whether a string needs work at
+# all (several times cheaper than a regex search); only then does a single
+# str.translate pass rewrite it.
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_ATTR_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+# Optional fragment_cache.FragmentCache used by _render; see
+# set_fragment_cache.
+fragment_cache = None
+
+# Serialized attribute strings by props items; cleared when full
+_ATTR_CACHE = {}
+_ATTR_CACHE_SIZE = 4096
+
+
+def escape_text(text: str) -> str:
+    """
+    Escape *text* for use as HTML element content.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.translate(_TEXT_ESCAPES)
+
+
+def escape_attr(value: str) -> str:
+    """
+    Escape *value* for use inside a double-quoted HTML attribute.
+    """
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.translate(_ATTR_ESCAPES)
+
+
+def set_fragment_cache(cache) -> None:
+    """
+    Reuse rendered subtrees through *cache* (a FragmentCache), or stop with
+    None.
+    """
+    global fragment_cache
+    fragment_cache = cache
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(
         self,
         tag: str = None,
@@ -9,15 +60,69 @@ class HTMLNode:
         self.tag = tag
         self.value = value
         self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        self.props = props if props is not None else NO_PROPS
 
     def to_html(self):
+        parts = []
+        self._render(parts.append)
+        return "".join(parts)
+
+    def render_to(self, sink, encoding: str = "utf-8"):
+        """
+        Stream this node's HTML into *sink*, a text or binary file object
+        (e.g. ``io.StringIO``, ``io.BytesIO`` or an open file).
+        """
+        if isinstance(sink, (io.RawIOBase, io.BufferedIOBase)):
+            write = sink.write
+            self._render(lambda piece: write(piece.encode(encoding)))
+        else:
+            self._render(sink.write)
+
+    def _render(self, write):
+        if fragment_cache is not None:
+            fragment_cache.render(self, write)
+        else:
+            self._render_uncached(write)
+
+    def _render_uncached(self, write):
+        # Walk the tree with an explicit stack so depth is bounded by memory,
+        # not the recursion limit.  Items are nodes or literal closing tags.
+        stack = [self]
+        pop = stack.pop
+        while stack:
+            item = pop()
+            if type(item) is str:
+                write(item)
+            else:
+                item._emit(write, stack)
+
+    def _emit(self, write, stack):
         raise NotImplementedError(
             "Child classes will override this method to render themselves as HTML."
         )
 
     def props_to_html(self):
-        return "".join(f' {key}="{value}"' for key, value in self.props.items())
+        props = self.props
+        if not props:
+            return ""
+        key = tuple(props.items())
+        try:
+            return _ATTR_CACHE[key]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable value: serialize without caching
+            return _serialize_props(props)
+        html = _serialize_props(props)
+        if len(_ATTR_CACHE) >= _ATTR_CACHE_SIZE:
+            _ATTR_CACHE.clear()
+        _ATTR_CACHE[key] = html
+        return html
 
     def __repr__(self):
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
+
+
+def _serialize_props(props) -> str:
+    return "".join(
+        f' {key}="{escape_attr(str(value))}"' for key, value in props.items()
+    )
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+from nodes import text_to_textnodes
+
+DEFAULT_SIZE = 4096
+
+
+class InlineCache:
+    """
+    Size-bounded LRU memo of text_to_textnodes, keyed by the input text.
+
+    Results are returned as tuples and shared between callers, so they must
+    not be modified.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"InlineCache size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def parse(self, text: str) -> tuple:
+        """
+        Return the TextNode tuple for *text*, parsing it on a miss.
+        """
+        entries = self._entries
+        nodes = entries.get(text)
+        if nodes is not None:
+            entries.move_to_end(text)
+            self.hits += 1
+            return nodes
+
+        nodes = tuple(text_to_textnodes(text))
+        self.misses += 1
+        entries[text] = nodes
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return nodes
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def drain_stats(self) -> dict:
+        """
+        Return the counters and reset them, keeping the cached entries; used
+        to ship worker stats back to the parent process.
+        """
+        stats = self.stats()
+        self.hits = self.misses = self.evictions = 0
+        return stats
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,23 +1,33 @@
-from htmlnode import HTMLNode
+from htmlnode import NO_CHILDREN, HTMLNode, escape_text
+
+# Elements without content or a closing tag
+VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta source track wbr".split()
+)
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str = None,
         value: str = None,
         props: dict = None,
     ):
-        self.tag = tag
-        self.value = value
-        self.props = props if props is not None else {}
-        super().__init__(tag, value, [], props)
+        super().__init__(tag, value, NO_CHILDREN, props)
 
     def to_html(self):
         if self.value is None:
             raise ValueError("LeafNode must have a value.")
         if self.tag is None:
-            return self.value
-        if self.tag == "a":
-            return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-        return f"<{self.tag}>{self.value}</{self.tag}>"
+            return escape_text(self.value)
+        if self.tag in VOID_ELEMENTS:
+            return f"<{self.tag}{self.props_to_html()}>"
+        return (
+            f"<{self.tag}{self.props_to_html()}>"
+            f"{escape_text(self.value)}</{self.tag}>"
+        )
+
+    def _emit(self, write, stack):
+        write(self.to_html())
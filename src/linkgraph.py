@@ -0,0 +1,143 @@
+import json
+import os
+import posixpath
+import re
+from typing import NamedTuple
+from urllib.parse import unquote, urlsplit
+
+LINKGRAPH_NAME = ".linkgraph.json"
+
+# "https:", "mailto:", … or protocol-relative "//host": not ours to check
+_EXTERNAL_RE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)")
+
+INDEX_PAGE = "index.html"
+
+
+# Fragments browsers resolve without a matching id: the top of the page
+_IMPLICIT_FRAGMENTS = frozenset(("", "top"))
+
+
+class BrokenLink(NamedTuple):
+    page: str
+    url: str
+    kind: str  # "link", "image", or "anchor" for a fragment the target lacks
+
+
+def resolve(page: str, url: str) -> tuple:
+    """
+    Resolve *url* as written on *page* (an output path such as
+    "blog/post.html") to (target_path, fragment).  External URLs give
+    (None, None); a bare "#fragment" targets *page* itself.
+    """
+    if _EXTERNAL_RE.match(url):
+        return None, None
+    parts = urlsplit(url)
+    path = unquote(parts.path)
+    if not path:
+        return page, parts.fragment
+    if path.startswith("/"):
+        target = path.lstrip("/")
+    else:
+        target = posixpath.join(posixpath.dirname(page), path)
+    if not target or target.endswith("/"):
+        target += INDEX_PAGE
+    return posixpath.normpath(target), parts.fragment
+
+
+class LinkGraph:
+    """
+    Site-wide map of each page (by output path) to the link and image URLs
+    it contains and the anchors (heading ids) it defines, fed from the
+    TextNode stream and the outline while pages are parsed.
+    """
+
+    def __init__(self, pages: dict = None):
+        # page → {"links": [url, …], "images": [url, …], "anchors": [id, …]}
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "LinkGraph":
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.pages, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def __contains__(self, page: str) -> bool:
+        return page in self.pages
+
+    def set_page(
+        self, page: str, links: list, images: list, anchors: list = ()
+    ) -> None:
+        self.pages[page] = {
+            "links": list(links),
+            "images": list(images),
+            "anchors": list(anchors),
+        }
+
+    def remove_page(self, page: str) -> None:
+        self.pages.pop(page, None)
+
+    def merge(self, other: "LinkGraph") -> None:
+        self.pages.update(other.pages)
+
+    def outbound(self, page: str) -> dict:
+        return self.pages.get(page, {"links": [], "images": [], "anchors": []})
+
+    def anchors(self, page: str) -> list:
+        """
+        Anchors *page* defines, in document order.
+        """
+        return self.outbound(page).get("anchors", [])
+
+    def inbound(self) -> dict:
+        """
+        Reverse index: internal target path → sorted pages linking to it.
+        """
+        index = {}
+        for page, refs in self.pages.items():
+            for url in refs["links"] + refs["images"]:
+                target, _ = resolve(page, url)
+                if target is not None:
+                    index.setdefault(target, set()).add(page)
+        return {target: sorted(pages) for target, pages in index.items()}
+
+    def check(self, files=()) -> list:
+        """
+        Return a BrokenLink for every internal link or image whose target is
+        neither a page in the graph nor one of *files* (other output paths,
+        such as mirrored assets), and for every link to a "#fragment" its
+        target page does not define.  One set lookup per reference.
+        """
+        known = set(self.pages)
+        known.update(path.replace(os.sep, "/") for path in files)
+        # Pages recorded before anchors were are not checked for fragments
+        anchors = {
+            page: set(refs["anchors"])
+            for page, refs in self.pages.items()
+            if "anchors" in refs
+        }
+        broken = []
+        for page in sorted(self.pages):
+            refs = self.pages[page]
+            for kind, urls in (("link", refs["links"]), ("image", refs["images"])):
+                for url in urls:
+                    target, fragment = resolve(page, url)
+                    if target is None:
+                        continue
+                    if target not in known:
+                        broken.append(BrokenLink(page, url, kind))
+                    elif (
+                        kind == "link"
+                        and target in anchors
+                        and unquote(fragment) not in _IMPLICIT_FRAGMENTS
+                        and unquote(fragment) not in anchors[target]
+                    ):
+                        broken.append(BrokenLink(page, url, "anchor"))
+        return broken
@@ -1,13 +1,335 @@
-from textnode import TextNode, TextType
+import argparse
+import os
+import sys
 
+from assets import MODES as ASSET_MODES, load_asset_index
+from build import CHUNK_SIZE, build_site
+from daemon import INLINE_CACHE_SIZE, serve
+from highlight import default_cache_dir
+from linkgraph import LINKGRAPH_NAME, LinkGraph
+from merge import merge_shards
+from pipeline import DEPTH as PIPELINE_DEPTH
+from render import MAX_INLINE_CHARS
+from search import SearchIndex
+from shard import parse_shard
+from watch import DEBOUNCE, POLL_INTERVAL, watch
 
-def main():
-    my_link_text_node = TextNode(
-        "This is some anchor text", TextType.LINK, "https://www.cnn.com"
+
+def print_asset_report(assets) -> None:
+    methods = ", ".join(f"{n} {m}" for m, n in sorted(assets.methods.items()))
+    print(
+        f"Assets: {assets.files} files, {assets.skipped} unchanged, "
+        f"{assets.deduped} deduplicated, {assets.pruned} pruned, "
+        f"{assets.bytes_copied} bytes copied ({methods or 'nothing placed'})"
+    )
+
+
+def build_command(args) -> int:
+    report = build_site(
+        args.content,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        force=args.force,
+        profile=args.profile,
+        trace=args.trace is not None,
+        inline_cache_size=args.inline_cache,
+        fragment_cache_size=args.fragment_cache,
+        template=args.template,
+        static_dir=args.static,
+        asset_mode=args.asset_mode,
+        check_links=args.check_links,
+        fsync=args.fsync,
+        pipeline_depth=args.pipeline,
+        search_index=args.search_index,
+        shard=args.shard,
+        max_inline_chars=args.max_paragraph,
+        highlight_cache=args.highlight_cache,
+    )
+    writes = report.writes
+    print(
+        f"Built {report.pages} pages in {report.seconds:.2f}s "
+        f"with {report.workers} worker(s): {report.rebuilt} rebuilt, "
+        f"{report.skipped} skipped, {report.pruned} pruned"
+    )
+    print(
+        f"Output: {writes.written} files written ({writes.bytes_written} bytes), "
+        f"{writes.skipped} unchanged ({writes.bytes_skipped} bytes skipped)"
+    )
+    if report.assets is not None:
+        print_asset_report(report.assets)
+    if report.inline_cache is not None:
+        stats = report.inline_cache
+        print(
+            f"Inline cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions ({stats['hit_rate']:.1%} hit rate)"
+        )
+    if report.fragment_cache is not None:
+        stats = report.fragment_cache
+        print(
+            f"Fragment cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions ({stats['hit_rate']:.1%} hit rate, "
+            f"{stats['bytes_reused']} bytes reused)"
+        )
+    if report.highlight_cache is not None:
+        stats = report.highlight_cache
+        print(
+            f"Highlight cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.1%} hit rate)"
+        )
+    if report.profile is not None:
+        print(report.profile.report())
+        if args.trace:
+            report.profile.write_chrome_trace(args.trace)
+            print(f"Chrome trace written to {args.trace}")
+    if report.broken_links is not None:
+        return print_broken_links(report.broken_links)
+    return 0
+
+
+def shard_arg(spec: str) -> tuple:
+    try:
+        return parse_shard(spec)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def merge_command(args) -> int:
+    report = merge_shards(
+        args.shards,
+        args.output,
+        check_links=args.check_links,
+        fsync=args.fsync,
+        asset_mode=args.asset_mode,
+    )
+    writes = report.writes
+    print(
+        f"Merged {report.shards} shard(s), {report.pages} pages in "
+        f"{report.seconds:.2f}s: {writes.written} files written, "
+        f"{writes.skipped} unchanged, {report.pruned} pruned"
+    )
+    if report.assets.files:
+        print_asset_report(report.assets)
+    if report.unindexed:
+        print(
+            f"{report.unindexed} outdated page(s) dropped from the search index; "
+            "build with --search-index to re-index them"
+        )
+    if report.broken_links is not None:
+        return print_broken_links(report.broken_links)
+    return 0
+
+
+def print_broken_links(broken: list) -> int:
+    for link in broken:
+        print(f"broken {link.kind}: {link.page} -> {link.url}")
+    print(f"{len(broken)} broken internal reference(s)")
+    return 1 if broken else 0
+
+
+def check_command(args) -> int:
+    graph = LinkGraph.load(os.path.join(args.output, LINKGRAPH_NAME))
+    return print_broken_links(graph.check(load_asset_index(args.output)))
+
+
+def search_command(args) -> int:
+    urls = SearchIndex.load(args.output).search(args.query)
+    for url in urls:
+        print(url)
+    return 0 if urls else 1
+
+
+def daemon_command(args) -> int:
+    try:
+        serve(args.socket, args.inline_cache)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def watch_command(args) -> int:
+    try:
+        watch(
+            args.content,
+            args.output,
+            workers=args.workers,
+            interval=args.interval,
+            debounce=args.debounce,
+            template=args.template,
+            search_index=args.search_index,
+        )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.sh")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="render a content tree to HTML")
+    build.add_argument("content", nargs="?", default="content")
+    build.add_argument("output", nargs="?", default="public")
+    build.add_argument(
+        "-j", "--workers", type=int, default=None, help="default: CPU count"
+    )
+    build.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    build.add_argument(
+        "--force", action="store_true", help="ignore the manifest, rebuild all"
+    )
+    build.add_argument(
+        "--profile", action="store_true", help="print slowest pages and stages"
+    )
+    build.add_argument(
+        "--trace", metavar="FILE", help="also write a Chrome trace-event JSON"
+    )
+    build.add_argument(
+        "--template",
+        help="layout with {{ title }}, {{ content }} and optional {{ toc }} slots",
     )
+    build.add_argument(
+        "--check-links", action="store_true", help="report broken internal links"
+    )
+    build.add_argument(
+        "--no-fsync",
+        dest="fsync",
+        action="store_false",
+        help="skip fsyncing written outputs (faster, less crash-safe)",
+    )
+    build.add_argument(
+        "--pipeline",
+        type=int,
+        nargs="?",
+        const=PIPELINE_DEPTH,
+        default=0,
+        metavar="DEPTH",
+        help="read and write on their own threads, DEPTH pages ahead "
+        f"(default {PIPELINE_DEPTH})",
+    )
+    build.add_argument(
+        "--search-index",
+        action="store_true",
+        help="update the full-text index under OUTPUT/search/",
+    )
+    build.add_argument(
+        "--shard",
+        type=shard_arg,
+        metavar="i/N",
+        help="render only shard i of N (1-based) for a later merge",
+    )
+    build.add_argument(
+        "--max-paragraph",
+        type=int,
+        default=MAX_INLINE_CHARS,
+        metavar="CHARS",
+        help="fail on longer paragraphs, headings or list items (0: no limit; "
+        f"default {MAX_INLINE_CHARS})",
+    )
+    build.add_argument("--static", help="directory of assets to mirror")
+    build.add_argument("--asset-mode", choices=ASSET_MODES, default="auto")
+    build.add_argument(
+        "--inline-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help="memoize inline parsing in an N-entry LRU per worker (0: off)",
+    )
+    build.add_argument(
+        "--fragment-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help="reuse rendered subtrees from an N-entry LRU per worker (0: off)",
+    )
+    build.add_argument(
+        "--highlight-cache",
+        default=default_cache_dir(),
+        metavar="DIR",
+        help="keep highlighted code tokens in DIR, shared by builds and shards "
+        "(default: %(default)s)",
+    )
+    build.add_argument(
+        "--no-highlight-cache",
+        dest="highlight_cache",
+        action="store_const",
+        const=None,
+        help="tokenize every code block afresh",
+    )
+    build.set_defaults(func=build_command)
+
+    check = commands.add_parser(
+        "check", help="check internal links of a built site, without rebuilding"
+    )
+    check.add_argument("output", nargs="?", default="public")
+    check.set_defaults(func=check_command)
+
+    merge = commands.add_parser(
+        "merge", help="combine the outputs of sharded builds, without rendering"
+    )
+    merge.add_argument("output")
+    merge.add_argument("shards", nargs="+", metavar="SHARD_OUTPUT")
+    merge.add_argument(
+        "--check-links", action="store_true", help="report broken internal links"
+    )
+    merge.add_argument("--asset-mode", choices=ASSET_MODES, default="auto")
+    merge.add_argument(
+        "--no-fsync",
+        dest="fsync",
+        action="store_false",
+        help="skip fsyncing written outputs (faster, less crash-safe)",
+    )
+    merge.set_defaults(func=merge_command)
+
+    search = commands.add_parser(
+        "search", help="query the search index of a built site"
+    )
+    search.add_argument("query")
+    search.add_argument("output", nargs="?", default="public")
+    search.set_defaults(func=search_command)
+
+    watcher = commands.add_parser("watch", help="rebuild pages as they change")
+    watcher.add_argument("content", nargs="?", default="content")
+    watcher.add_argument("output", nargs="?", default="public")
+    watcher.add_argument(
+        "-j", "--workers", type=int, default=None, help="for the initial build"
+    )
+    watcher.add_argument(
+        "--interval", type=float, default=POLL_INTERVAL, help="seconds between polls"
+    )
+    watcher.add_argument(
+        "--debounce", type=float, default=DEBOUNCE, help="quiet period in seconds"
+    )
+    watcher.add_argument(
+        "--template",
+        help="layout with {{ title }}, {{ content }} and optional {{ toc }} slots",
+    )
+    watcher.add_argument(
+        "--search-index",
+        action="store_true",
+        help="create and update the full-text index",
+    )
+    watcher.set_defaults(func=watch_command)
+
+    daemon = commands.add_parser(
+        "daemon", help="serve render and build requests from client.sh"
+    )
+    daemon.add_argument("--socket", help="Unix socket path (default: per user)")
+    daemon.add_argument(
+        "--inline-cache",
+        type=int,
+        default=INLINE_CACHE_SIZE,
+        metavar="N",
+        help=f"entries of the shared InlineCache (default {INLINE_CACHE_SIZE}, 0: off)",
+    )
+    daemon.set_defaults(func=daemon_command)
+
+    return parser
+
 
-    print(my_link_text_node)
+def main(argv=None) -> int:
+    args = make_parser().parse_args(argv)
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import functools
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build-manifest.json"
+
+# Modules whose source decides what a page renders to; editing any of them
+# invalidates every recorded page.
+GENERATOR_MODULES = (
+    "blocks",
+    "build",
+    "extraction",
+    "fragment_cache",
+    "highlight",
+    "htmlnode",
+    "leafnode",
+    "nodes",
+    "parentnode",
+    "render",
+    "template",
+    "textnode",
+)
+
+_HASH_CHUNK = 1 << 16
+
+
+def file_hash(path: str) -> str:
+    """
+    Return the hex SHA-256 of the file at *path*.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def generator_version(extra: str = "") -> str:
+    """
+    Fingerprint of the generator code, plus any *extra* build settings that
+    change the rendered output.
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for module in GENERATOR_MODULES:
+        digest.update(file_hash(os.path.join(src_dir, module + ".py")).encode())
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Per-page record of the last build: source hash and output hash, keyed by
+    the page's path relative to the content directory.
+    """
+
+    def __init__(self, generator: str, pages: dict = None, built_by: str = None):
+        self.generator = generator
+        self.pages = pages if pages is not None else {}
+        # Generator version that produced the recorded pages
+        self.built_by = built_by if built_by is not None else generator
+
+    @classmethod
+    def load(cls, path: str, generator: str) -> "Manifest":
+        """
+        Read the manifest at *path*.  A missing or unreadable manifest loads
+        empty; one written by a different generator version keeps its pages
+        (so deleted sources can still be pruned) but none of them are fresh.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(generator)
+        return cls(generator, data.get("pages", {}), data.get("generator"))
+
+    def save(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"generator": self.generator, "pages": self.pages},
+                f,
+                separators=(",", ":"),
+                sort_keys=True,
+            )
+        os.replace(tmp_path, path)
+
+    def is_fresh(self, page: str, source_hash: str, output_path: str) -> bool:
+        """
+        True when *page* was last built from the same source and its output
+        is still in place.
+        """
+        entry = self.pages.get(page)
+        return (
+            self.built_by == self.generator
+            and entry is not None
+            and entry["source"] == source_hash
+            and os.path.exists(output_path)
+        )
+
+    def record(self, page: str, source_hash: str, output_hash: str) -> None:
+        self.pages[page] = {"source": source_hash, "output": output_hash}
+
+    def forget(self, page: str) -> None:
+        self.pages.pop(page, None)
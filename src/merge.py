@@ -0,0 +1,233 @@
+"""
+Combine the outputs of sharded builds without rendering anything.
+
+Files are copied, assets placed as assets.mirror_assets places them,
+manifests, link graphs, asset indexes and search indexes are unioned, and
+pages no shard produced any more are pruned, so the merged directory is what
+a single-machine build would have written.
+"""
+
+import json
+import os
+import time
+
+from assets import ASSET_MANIFEST_NAME, AssetReport, load_asset_index, place_file
+from build import output_path_for, prune_page, url_path_for
+from linkgraph import LINKGRAPH_NAME, LinkGraph
+from manifest import MANIFEST_NAME, Manifest, file_hash
+from search import INDEX_NAME, SEARCH_DIR, SearchIndex
+from shard import SHARD_NAME, load_shard_info, write_shard_info
+from writer import OutputWriter, WriteReport
+
+# Build state kept beside the pages; merged rather than copied
+STATE_FILES = frozenset(
+    (MANIFEST_NAME, LINKGRAPH_NAME, ASSET_MANIFEST_NAME, SHARD_NAME)
+)
+
+
+class MergeReport:
+    def __init__(self, shards: int = 0):
+        self.shards = shards
+        self.pages = 0
+        self.pruned = 0
+        self.unindexed = 0  # outdated pages dropped from the search index
+        self.writes = WriteReport()
+        self.assets = AssetReport()
+        self.seconds = 0.0
+        self.broken_links = None  # [linkgraph.BrokenLink] with check_links=True
+
+    def __repr__(self):
+        return (
+            f"MergeReport(shards={self.shards}, pages={self.pages}, "
+            f"pruned={self.pruned}, written={self.writes.written}, "
+            f"skipped={self.writes.skipped}, seconds={self.seconds:.3f})"
+        )
+
+
+def _check_complete(shard_dirs: list) -> str:
+    # Every shard of one split, once, built by the same generator
+    infos = [load_shard_info(shard_dir) for shard_dir in shard_dirs]
+    count = infos[0]["count"] if infos else 0
+    indexes = sorted(info["index"] for info in infos)
+    if indexes != list(range(1, count + 1)) or any(
+        info["count"] != count for info in infos
+    ):
+        found = ", ".join(f"{info['index']}/{info['count']}" for info in infos)
+        raise ValueError(f"Expected shards 1/{count} to {count}/{count}, got {found}")
+    generators = {info["generator"] for info in infos}
+    if len(generators) > 1:
+        raise ValueError("Shards were built by different generator versions")
+    return generators.pop()
+
+
+def _copy_outputs(
+    shard_dir: str,
+    output_dir: str,
+    writer: OutputWriter,
+    owners: dict,
+    digests: dict,
+    assets: dict,
+    asset_mode: str,
+    asset_report: AssetReport,
+):
+    # *digests* maps relative paths to the sha256 the shard recorded for
+    # them, so only files it has no record of are hashed; *assets* is its
+    # asset index.
+    for root, dirs, files in os.walk(shard_dir):
+        if root == shard_dir:
+            dirs[:] = [name for name in dirs if name != SEARCH_DIR]
+        dirs.sort()
+        for name in sorted(files):
+            if root == shard_dir and name in STATE_FILES:
+                continue
+            if name.endswith(".tmp"):
+                continue
+            src = os.path.join(root, name)
+            rel = os.path.relpath(src, shard_dir)
+            st = os.stat(src)
+            digest = digests.get(rel) or file_hash(src)
+            owner = owners.setdefault(rel, (shard_dir, st.st_size, digest))
+            if owner[1:] != (st.st_size, digest):
+                raise ValueError(f"{rel} differs between {owner[0]} and {shard_dir}")
+            if owner[0] != shard_dir:
+                continue
+            dst = os.path.join(output_dir, rel)
+            if rel in assets:
+                _place_asset(src, st, dst, digest, asset_mode, asset_report)
+            else:
+                writer.copy(dst, src, digest)
+
+
+def _place_asset(
+    src: str, st: os.stat_result, dst: str, digest: str, mode: str, report: AssetReport
+) -> None:
+    # A merged asset hardlinked to its shard's output is vouched for by its
+    # inode; any other one by size and then content.
+    report.files += 1
+    try:
+        out = os.stat(dst)
+    except FileNotFoundError:
+        out = None
+    if out is not None and out.st_size == st.st_size:
+        if (out.st_dev, out.st_ino) == (st.st_dev, st.st_ino) or (
+            file_hash(dst) == digest
+        ):
+            report.skipped += 1
+            return
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    method = place_file(src, dst, mode)
+    report.methods[method] = report.methods.get(method, 0) + 1
+    if method != "link":
+        report.bytes_copied += st.st_size
+
+
+def merge_shards(
+    shard_dirs: list,
+    output_dir: str,
+    check_links: bool = False,
+    fsync: bool = True,
+    asset_mode: str = "auto",
+) -> MergeReport:
+    """
+    Combine the outputs of a complete set of sharded builds into
+    *output_dir*.  Raises ValueError if a shard is missing or repeated, or
+    the shards disagree.
+
+    Files identical to what *output_dir* already holds are left alone, so
+    merging into the previous merge only writes what changed.  Files are
+    compared by the hashes the shards recorded and copied without being
+    read into memory; assets are placed with *asset_mode*, as
+    assets.mirror_assets does.  The search
+    index is merged if any shard built one, or *output_dir* has one; pages
+    whose indexed source differs from the merged manifest's, as when their
+    shard was built without an index, are dropped from it, for the next
+    indexing build to re-render.
+    """
+    started = time.perf_counter()
+    generator = _check_complete(shard_dirs)
+    report = MergeReport(len(shard_dirs))
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    old_pages = Manifest.load(manifest_path, generator).pages
+    manifest = Manifest(generator)
+    graph = LinkGraph()
+    asset_index = {}
+    shard_indexes = []
+    shard_state = []  # (recorded digests, asset index) per shard
+    for shard_dir in shard_dirs:
+        shard_manifest = Manifest.load(
+            os.path.join(shard_dir, MANIFEST_NAME), generator
+        )
+        if shard_manifest.built_by != generator:
+            raise ValueError(f"{shard_dir} has an outdated or missing manifest")
+        manifest.pages.update(shard_manifest.pages)
+        graph.merge(LinkGraph.load(os.path.join(shard_dir, LINKGRAPH_NAME)))
+        shard_assets = load_asset_index(shard_dir)
+        asset_index.update(shard_assets)
+        digests = {
+            output_path_for(page): entry["output"]
+            for page, entry in shard_manifest.pages.items()
+        }
+        digests.update((rel, entry[2]) for rel, entry in shard_assets.items())
+        shard_state.append((digests, shard_assets))
+        if os.path.exists(os.path.join(shard_dir, SEARCH_DIR, INDEX_NAME)):
+            shard_indexes.append(SearchIndex.load(shard_dir))
+    report.pages = len(manifest.pages)
+
+    owners = {}  # relative path → (shard dir, size, sha256) of its first copy
+    with OutputWriter(fsync) as writer:
+        for shard_dir, (digests, shard_assets) in zip(shard_dirs, shard_state):
+            _copy_outputs(
+                shard_dir,
+                output_dir,
+                writer,
+                owners,
+                digests,
+                shard_assets,
+                asset_mode,
+                report.assets,
+            )
+    report.writes = writer.report
+
+    index = None
+    if shard_indexes or os.path.exists(
+        os.path.join(output_dir, SEARCH_DIR, INDEX_NAME)
+    ):
+        index = SearchIndex.load(output_dir)
+    for page in old_pages:
+        if page not in manifest.pages:
+            prune_page(output_dir, page)
+            if index is not None:
+                index.remove_page(url_path_for(page))
+            report.pruned += 1
+    for rel in load_asset_index(output_dir):
+        if rel not in asset_index and rel not in owners:
+            try:
+                os.remove(os.path.join(output_dir, rel))
+            except FileNotFoundError:
+                pass
+            report.assets.pruned += 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest.save(manifest_path)
+    graph.save(os.path.join(output_dir, LINKGRAPH_NAME))
+    asset_path = os.path.join(output_dir, ASSET_MANIFEST_NAME)
+    if asset_index or os.path.exists(asset_path):
+        tmp_path = asset_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asset_index, f, separators=(",", ":"), sort_keys=True)
+        os.replace(tmp_path, asset_path)
+    if index is not None:
+        for shard_index in shard_indexes:
+            index.merge(shard_index)
+        for page, entry in manifest.pages.items():
+            url = url_path_for(page)
+            if url in index and not index.is_current(url, entry["source"]):
+                index.remove_page(url)
+                report.unindexed += 1
+        index.save()
+    write_shard_info(output_dir, None, generator)
+    if check_links:
+        report.broken_links = graph.check(asset_index)
+    report.seconds = time.perf_counter() - started
+    return report
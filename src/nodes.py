@@ -1,6 +1,8 @@
+import re
 from typing import Iterable, List
 
-from extraction import extract_markdown_images, extract_markdown_links
+from extraction import ReferenceMatcher, RefKind, iter_markdown_refs
+from htmlnode import escape_attr
 from leafnode import LeafNode
 from textnode import TextNode, TextType
 
@@ -58,57 +60,125 @@ def split_nodes_delimiter(nodes: Iterable[TextNode], delimiter: str) -> List[Tex
 
 
 def split_nodes_image(nodes: list[TextNode]) -> list[TextNode]:
-    """Split each TextNode around Markdown images and turn the images into
-    `TextType.IMAGE` nodes.  Nodes without images are returned unchanged."""
+    """Split each NORMAL TextNode around Markdown images and turn the images
+    into `TextType.IMAGE` nodes.  Other nodes are returned unchanged."""
+    return _split_nodes_refs(nodes, RefKind.IMAGE, TextType.IMAGE)
+
+
+def split_nodes_link(nodes: list[TextNode]) -> list[TextNode]:
+    """Split each NORMAL TextNode around Markdown links and turn the links
+    into `TextType.LINK` nodes.  Other nodes are returned unchanged."""
+    return _split_nodes_refs(nodes, RefKind.LINK, TextType.LINK)
+
+
+def _split_nodes_refs(
+    nodes: list[TextNode], kind: RefKind, text_type: TextType
+) -> list[TextNode]:
+    # Cut each text at the spans reported by the extraction scan, so the
+    # matched syntax is never rebuilt or searched for a second time.
     new_nodes: list[TextNode] = []
 
     for node in nodes:
-        matches = extract_markdown_images(node.text)  # → list[(alt, url)]
-        if not matches:  # fast-path: nothing to split
+        if node.text_type is not TextType.NORMAL:
             new_nodes.append(node)
             continue
 
-        remaining_text = node.text
-        for alt, url in matches:
-            before, _, after = remaining_text.partition(f"![{alt}]({url})")
-            new_nodes.append(TextNode(before, TextType.NORMAL))
-            new_nodes.append(TextNode(alt, TextType.IMAGE, url))
-            remaining_text = after  # keep scanning the tail
-
-        if remaining_text:  # whatever is left after last image
-            new_nodes.append(TextNode(remaining_text, TextType.NORMAL))
+        text = node.text
+        pos = 0
+        for ref in iter_markdown_refs(text):
+            if ref.kind is not kind:
+                continue
+            if ref.start > pos:
+                new_nodes.append(TextNode(text[pos : ref.start], TextType.NORMAL))
+            new_nodes.append(TextNode(ref.text, text_type, ref.url))
+            pos = ref.end
+
+        if pos == 0:  # fast-path: nothing to split
+            new_nodes.append(node)
+        elif pos < len(text):  # whatever is left after the last reference
+            new_nodes.append(TextNode(text[pos:], TextType.NORMAL))
 
     return new_nodes
 
 
-def split_nodes_link(nodes: list[TextNode]) -> list[TextNode]:
-    """Split each TextNode around Markdown links and turn the images into
-    `TextType.LINK` nodes.  Nodes without links are returned unchanged."""
-    new_nodes: list[TextNode] = []
+# Openers the single-pass scanner stops at; everything else is literal text.
+# A "[" / "![" opener is confirmed with extraction.ReferenceMatcher.
+_INLINE_OPENER_RE = re.compile(r"\*\*|[_`]|!?\[")
 
-    for node in nodes:
-        matches = extract_markdown_links(node.text)  # → list[(alt, url)]
-        if not matches:  # fast-path: nothing to split
-            new_nodes.append(node)
-            continue
 
-        remaining_text = node.text
-        for alt, url in matches:
-            before, _, after = remaining_text.partition(f"[{alt}]({url})")
-            new_nodes.append(TextNode(before, TextType.NORMAL))
-            new_nodes.append(TextNode(alt, TextType.LINK, url))
-            remaining_text = after  # keep scanning the tail
+def scan_inline(text: str) -> list[TextNode]:
+    """
+    Tokenize *text* into TextNode instances in a single left-to-right sweep.
 
-        if remaining_text:  # whatever is left after last image
-            new_nodes.append(TextNode(remaining_text, TextType.NORMAL))
+    Produces the same stream as the five-pass pipeline for well-formed input,
+    except that adjacent NORMAL runs are merged and empty NORMAL nodes are
+    dropped.  Markup is not nested: the leftmost opener wins and its span is
+    taken verbatim.  Runs in time linear in len(text), whatever the input.
 
-    return new_nodes
+    Raises
+    ------
+    ValueError
+        • Unclosed delimiter sequence
+    """
+    out: list[TextNode] = []
+    pending: list[str] = []  # literal NORMAL pieces waiting to be merged
+    # One check for the whole paragraph spares escaping each node on render
+    escaped = escape_attr(text) is text
+    search = _INLINE_OPENER_RE.search
+    match_ref = ReferenceMatcher(text).match
+    pos = 0
+
+    def flush(upto: int) -> None:
+        pending.append(text[pos:upto])
+        literal = "".join(pending)
+        pending.clear()
+        if literal:
+            out.append(TextNode(literal, TextType.NORMAL, escaped=escaped))
+
+    while True:
+        m = search(text, pos)
+        if m is None:
+            break
+        start, token = m.start(), m.group()
+
+        # 1. "[" / "![" → reference if the full syntax follows, else literal
+        if token[-1] == "[":
+            ref = match_ref(start)
+            if ref is None:  # not a reference: keep the opener as text
+                pending.append(text[pos : m.end()])
+                pos = m.end()
+                continue
+            flush(start)
+            style = TextType.IMAGE if ref.kind is RefKind.IMAGE else TextType.LINK
+            out.append(TextNode(ref.text, style, ref.url, escaped))
+            pos = ref.end
+            continue
+
+        # 2. Delimiter → styled span up to the matching closer
+        close = text.find(token, m.end())
+        if close == -1:
+            raise ValueError(
+                f"Invalid markdown syntax: no closing {token!r} in {text!r}"
+            )
+        flush(start)
+        out.append(
+            TextNode(text[m.end() : close], DELIM_TO_STYLE[token], escaped=escaped)
+        )
+        pos = close + len(token)
+
+    flush(len(text))
+    return out
 
 
-def text_to_textnodes(text: str) -> list[TextNode]:
+def text_to_textnodes(text: str, legacy: bool = False) -> list[TextNode]:
     """
     Convert a string to a list of TextNode instances.
+
+    Uses the single-pass scanner; pass ``legacy=True`` for the original
+    multi-pass pipeline (kept for differential testing and benchmarks).
     """
+    if not legacy:
+        return scan_inline(text)
 
     # Split the text into nodes
     nodes = [TextNode(text, TextType.NORMAL)]
@@ -2,28 +2,24 @@ from htmlnode import HTMLNode
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str,
         children: list,
         props: dict = None,
     ):
-        self.tag = tag
-        self.children = children
-        self.props = props if props is not None else {}
+        super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def _emit(self, write, stack):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag.")
-        if self.children == []:
+        if not self.children:
             raise ValueError("ParentNode must have children.")
 
-        html = f"<{self.tag}{self.props_to_html()}>"
-
-        # Loop through each child and add its HTML
-        for child in self.children:
-            html += child.to_html()
-
-        html += f"</{self.tag}>"
+        write(f"<{self.tag}{self.props_to_html()}>")
 
-        return html
+        # Children are rendered before the closing tag: push it first
+        stack.append(f"</{self.tag}>")
+        stack.extend(reversed(self.children))
@@ -0,0 +1,89 @@
+import queue
+import threading
+
+# Default queue length between stages, in items
+DEPTH = 8
+
+_DONE = object()
+
+
+class _Failed:
+    # Carries an exception from a stage thread to the calling thread
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def pipelined(items, read, process, write, depth: int = DEPTH) -> list:
+    """
+    Run ``read(item)`` on a reader thread, ``process(item, data)`` on the
+    calling thread and ``write(processed)`` on a writer thread, so I/O on
+    either side overlaps with the CPU-bound middle stage.
+
+    The stages are joined by queues of at most *depth* items: a slow stage
+    holds the others back instead of letting work pile up in memory.
+    Returns the results of write() in item order.  The first exception
+    raised by any stage is re-raised once every thread has stopped.
+    """
+    if depth < 1:
+        raise ValueError(f"Pipeline depth must be positive, got {depth}")
+    inbox = queue.Queue(depth)
+    outbox = queue.Queue(depth)
+    stop = threading.Event()
+    results = []
+    errors = []
+
+    def reader():
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                inbox.put((item, read(item)))
+        except BaseException as exc:
+            inbox.put(_Failed(exc))
+        finally:
+            inbox.put(_DONE)
+
+    def writer():
+        # Keeps draining after a failure so the calling thread never blocks
+        while True:
+            processed = outbox.get()
+            if processed is _DONE:
+                return
+            if errors:
+                continue
+            try:
+                results.append(write(processed))
+            except BaseException as exc:
+                errors.append(exc)
+                stop.set()
+
+    threads = [threading.Thread(target=reader), threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    try:
+        while not stop.is_set():
+            entry = inbox.get()
+            if entry is _DONE:
+                break
+            if type(entry) is _Failed:
+                errors.append(entry.error)
+                break
+            outbox.put(process(*entry))
+    except BaseException as exc:
+        errors.append(exc)
+    finally:
+        stop.set()
+        outbox.put(_DONE)
+        # Unblock the reader if it is waiting on a full queue
+        while threads[0].is_alive():
+            try:
+                inbox.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+    return results
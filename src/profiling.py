@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+
+# The Profiler collecting in this process, or None.  Instrumented code reads
+# this once per page or block, so leaving it unset costs a global lookup.
+active = None
+
+
+class StageStats:
+    __slots__ = ("calls", "nodes", "bytes_in", "bytes_out", "seconds")
+
+    def __init__(self, calls=0, nodes=0, bytes_in=0, bytes_out=0, seconds=0.0):
+        self.calls = calls
+        self.nodes = nodes
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.seconds = seconds
+
+    def as_list(self) -> list:
+        return [self.calls, self.nodes, self.bytes_in, self.bytes_out, self.seconds]
+
+    def __repr__(self):
+        return (
+            f"StageStats(calls={self.calls}, nodes={self.nodes}, "
+            f"bytes_in={self.bytes_in}, bytes_out={self.bytes_out}, "
+            f"seconds={self.seconds:.6f})"
+        )
+
+
+class Span:
+    """
+    Context manager timing one stage call (or one page).  Callers may set
+    nodes / bytes_in / bytes_out before it exits.
+    """
+
+    __slots__ = (
+        "profiler",
+        "name",
+        "is_page",
+        "nodes",
+        "bytes_in",
+        "bytes_out",
+        "started",
+    )
+
+    def __init__(self, profiler, name: str, is_page: bool, bytes_in: int = 0):
+        self.profiler = profiler
+        self.name = name
+        self.is_page = is_page
+        self.nodes = 0
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self, time.perf_counter_ns())
+
+
+class Profiler:
+    """
+    Per-stage counters (calls, nodes created, bytes in/out, wall time), page
+    timings and, with *trace*, Chrome trace events for every span.
+    """
+
+    def __init__(self, trace: bool = False):
+        self.trace = trace
+        self.stages = {}
+        self.pages = []  # (page, seconds)
+        self.events = []
+
+    def stage(self, name: str, bytes_in: int = 0) -> Span:
+        return Span(self, name, False, bytes_in)
+
+    def page(self, name: str) -> Span:
+        return Span(self, name, True)
+
+    def _record(self, span: Span, ended: int) -> None:
+        seconds = (ended - span.started) / 1e9
+        if span.is_page:
+            self.pages.append((span.name, seconds))
+        else:
+            stats = self.stages.get(span.name)
+            if stats is None:
+                stats = self.stages[span.name] = StageStats()
+            stats.calls += 1
+            stats.nodes += span.nodes
+            stats.bytes_in += span.bytes_in
+            stats.bytes_out += span.bytes_out
+            stats.seconds += seconds
+        if self.trace:
+            self.events.append(
+                {
+                    "name": span.name,
+                    "cat": "page" if span.is_page else "stage",
+                    "ph": "X",
+                    "ts": span.started / 1e3,
+                    "dur": (ended - span.started) / 1e3,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def drain(self) -> dict:
+        """
+        Return everything collected so far as plain data and start afresh;
+        used to ship worker profiles back to the parent process.
+        """
+        data = {
+            "stages": {name: s.as_list() for name, s in self.stages.items()},
+            "pages": self.pages,
+            "events": self.events,
+        }
+        self.stages, self.pages, self.events = {}, [], []
+        return data
+
+    def merge(self, data: dict) -> None:
+        for name, values in data["stages"].items():
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            for slot, value in zip(StageStats.__slots__, values):
+                setattr(stats, slot, getattr(stats, slot) + value)
+        self.pages.extend(data["pages"])
+        self.events.extend(data["events"])
+
+    def report(self, top: int = 10) -> str:
+        """
+        Format the hottest stages and the *top* slowest pages.
+        """
+        total = sum(s.seconds for s in self.stages.values()) or 1.0
+        lines = [
+            "Hottest stages:",
+            f"  {'stage':<10} {'calls':>9} {'nodes':>10} {'bytes in':>12} "
+            f"{'bytes out':>12} {'seconds':>9} {'share':>6}",
+        ]
+        ranked = sorted(self.stages.items(), key=lambda kv: -kv[1].seconds)
+        for name, s in ranked:
+            lines.append(
+                f"  {name:<10} {s.calls:>9} {s.nodes:>10} {s.bytes_in:>12} "
+                f"{s.bytes_out:>12} {s.seconds:>9.3f} {s.seconds / total:>6.1%}"
+            )
+        lines.append(f"Slowest pages (of {len(self.pages)}):")
+        for page, seconds in sorted(self.pages, key=lambda p: -p[1])[:top]:
+            lines.append(f"  {seconds * 1e3:9.2f} ms  {page}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Write the collected spans in Chrome trace-event format, for
+        chrome://tracing or Perfetto.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+def enable(trace: bool = False) -> Profiler:
+    """
+    Start collecting in this process; also the process-pool initializer.
+    """
+    global active
+    active = Profiler(trace)
+    return active
+
+
+def disable() -> None:
+    global active
+    active = None
@@ -0,0 +1,278 @@
+import io
+import re
+from typing import Iterable, NamedTuple, Union
+
+import profiling
+from blocks import FENCE, BlockType, iter_blocks
+from highlight import language_of, tokenize
+from leafnode import LeafNode
+from nodes import text_to_textnodes
+from parentnode import ParentNode
+from search import add_terms
+from textnode import TextType
+
+# Optional inline_cache.InlineCache used by text_to_children; see
+# set_inline_cache.
+inline_cache = None
+
+# Optional highlight.HighlightCache for code block tokens; see
+# set_highlight_cache.
+highlight_cache = None
+
+# Longest inline run, in characters, text_to_children parses; longer
+# paragraphs are refused rather than tying a worker up.  0: no limit.  See
+# set_inline_limit.
+MAX_INLINE_CHARS = 1 << 20
+inline_limit = MAX_INLINE_CHARS
+
+_UNORDERED_ITEM_RE = re.compile(r"[-*+]\s+")
+_ORDERED_ITEM_RE = re.compile(r"\d+\.\s*")
+
+_SLUG_DROP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SPACE_RE = re.compile(r"\s+")
+
+# Text types whose words go into the search index
+_INDEXED_TYPES = frozenset((TextType.NORMAL, TextType.BOLD, TextType.ITALIC))
+
+
+class Heading(NamedTuple):
+    level: int
+    text: str  # plain text, unescaped
+    slug: str  # the heading's id, unique within its page
+
+
+def slugify(text: str) -> str:
+    """
+    Turn heading text into an id: lowercased, punctuation dropped and runs
+    of whitespace replaced by a hyphen.
+    """
+    slug = _SLUG_SPACE_RE.sub("-", _SLUG_DROP_RE.sub("", text.lower()).strip())
+    return slug or "section"
+
+
+class PageContext:
+    """
+    Facts about a page collected while it is converted, so nothing has to
+    walk the finished tree a second time.
+    """
+
+    __slots__ = ("title", "links", "images", "outline", "terms", "_position", "_slugs")
+
+    def __init__(self, index_terms: bool = False):
+        self.title = None  # plain text of the first <h1>
+        self.links = []  # link URLs, in document order
+        self.images = []  # image URLs, in document order
+        self.outline = []  # Heading of every heading, in document order
+        # term → positions for the search index, with index_terms=True
+        self.terms = {} if index_terms else None
+        self._position = 0
+        self._slugs = set()
+
+    def collect(self, text_nodes) -> None:
+        """
+        Note the references among a block's TextNodes, and its terms if
+        indexing.
+        """
+        terms = self.terms
+        for node in text_nodes:
+            text_type = node.text_type
+            if text_type is TextType.LINK:
+                self.links.append(node.url)
+            elif text_type is TextType.IMAGE:
+                self.images.append(node.url)
+            elif terms is not None and text_type in _INDEXED_TYPES:
+                self._position = add_terms(terms, node.text, self._position)
+
+    def add_heading(self, level: int, text: str) -> str:
+        """
+        Record a heading in the outline and return its id; a repeated slug
+        gets a "-1", "-2", … suffix.
+        """
+        slug = base = slugify(text)
+        n = 0
+        while slug in self._slugs:
+            n += 1
+            slug = f"{base}-{n}"
+        self._slugs.add(slug)
+        self.outline.append(Heading(level, text, slug))
+        return slug
+
+
+def set_inline_cache(cache) -> None:
+    """
+    Memoize inline parsing through *cache* (an InlineCache), or stop with None.
+    """
+    global inline_cache
+    inline_cache = cache
+
+
+def set_highlight_cache(cache) -> None:
+    """
+    Reuse code block tokens through *cache* (a HighlightCache), or stop with
+    None.
+    """
+    global highlight_cache
+    highlight_cache = cache
+
+
+def set_inline_limit(limit: int) -> None:
+    """
+    Refuse inline runs longer than *limit* characters (0: no limit).
+    """
+    global inline_limit
+    inline_limit = limit
+
+
+def text_to_children(text: str, page: PageContext = None) -> list:
+    """
+    Convert inline markdown to a list of TextNode children, noting its links
+    and images in *page* if given.
+
+    Raises ValueError for text longer than the inline_limit.
+    """
+    if inline_limit and len(text) > inline_limit:
+        raise ValueError(
+            f"Paragraph of {len(text)} characters exceeds the limit of "
+            f"{inline_limit}"
+        )
+    parse = text_to_textnodes if inline_cache is None else inline_cache.parse
+    profiler = profiling.active
+    if profiler is None:
+        text_nodes = parse(text)
+    else:
+        # Inline parsing includes reference extraction, which the
+        # single-pass scanner does in the same sweep.
+        with profiler.stage("inline", len(text)) as stage:
+            text_nodes = parse(text)
+            stage.nodes = len(text_nodes)
+    if page is not None:
+        page.collect(text_nodes)
+    # TextNodes render themselves, so they go into the tree as they are.
+    # ParentNode refuses to render without children.
+    return text_nodes or [LeafNode(None, "")]
+
+
+def highlight_code(code: str, language: str) -> ParentNode:
+    """
+    Highlight *code* as a <code> element with a <span class="tok-KIND"> per
+    token, through the highlight_cache if one is set.
+    """
+    profiler = profiling.active
+    if profiler is None:
+        tokens = _tokens(code, language)
+    else:
+        with profiler.stage("highlight", len(code)) as stage:
+            tokens = _tokens(code, language)
+            stage.nodes = len(tokens)
+    children = [
+        (
+            LeafNode("span", text, {"class": f"tok-{kind}"})
+            if kind
+            else LeafNode(None, text)
+        )
+        for kind, text in tokens
+    ]
+    return ParentNode("code", children, {"class": f"language-{language}"})
+
+
+def _tokens(code: str, language: str):
+    if highlight_cache is None:
+        return tokenize(code, language)
+    return highlight_cache.tokens(code, language)
+
+
+def block_to_html_node(
+    block_type: BlockType, block: str, page: PageContext = None
+) -> ParentNode:
+    """
+    Convert one classified block to its HTML node, noting page facts such as
+    the title in *page* if given.
+    """
+    if block_type is BlockType.HEADING:
+        title = block.lstrip("#")
+        level = min(len(block) - len(title), 6)
+        children = text_to_children(title.strip(), page)
+        text = "".join(child.value for child in children)
+        if page is None:
+            return ParentNode(f"h{level}", children, {"id": slugify(text)})
+        if level == 1 and page.title is None:
+            page.title = text
+        return ParentNode(f"h{level}", children, {"id": page.add_heading(level, text)})
+
+    if block_type is BlockType.CODE:
+        code = block[len(FENCE) : -len(FENCE)]
+        if "\n" not in code:
+            return ParentNode("pre", [LeafNode("code", code)])
+        info, code = code.split("\n", 1)
+        code = code.rstrip("\n")
+        language = language_of(info)
+        if language is None or not code:
+            return ParentNode("pre", [LeafNode("code", code)])
+        return ParentNode("pre", [highlight_code(code, language)])
+
+    if block_type is BlockType.QUOTE:
+        lines = (line[1:].strip() for line in block.splitlines())
+        return ParentNode("blockquote", text_to_children(" ".join(lines), page))
+
+    if block_type is BlockType.UNORDERED_LIST:
+        items = (_UNORDERED_ITEM_RE.sub("", line, 1) for line in block.splitlines())
+        return ParentNode(
+            "ul", [ParentNode("li", text_to_children(i, page)) for i in items]
+        )
+
+    if block_type is BlockType.ORDERED_LIST:
+        items = (_ORDERED_ITEM_RE.sub("", line, 1) for line in block.splitlines())
+        return ParentNode(
+            "ol", [ParentNode("li", text_to_children(i, page)) for i in items]
+        )
+
+    return ParentNode("p", text_to_children(" ".join(block.splitlines()), page))
+
+
+def markdown_to_html_node(
+    markdown: Union[str, Iterable[str]], page: PageContext = None
+) -> ParentNode:
+    """
+    Convert a markdown document, given as a string or any line iterator such
+    as an open file, to a single <div> ParentNode.  Page facts are collected
+    into *page* if given.
+    """
+    if isinstance(markdown, str):
+        markdown = io.StringIO(markdown)
+    if page is None:
+        page = PageContext()  # heading ids are still unique per page
+    blocks = iter_blocks(markdown)
+    profiler = profiling.active
+    if profiler is not None:
+        with profiler.stage("blocks") as stage:
+            blocks = list(blocks)
+            stage.nodes = len(blocks)
+    children = [block_to_html_node(kind, block, page) for kind, block in blocks]
+    return ParentNode("div", children or [LeafNode(None, "")])
+
+
+def outline_to_html_node(outline: list) -> ParentNode:
+    """
+    Render a page outline as nested <ul> lists of links to the headings.
+    A heading nests under the closest preceding one of a lower level.
+    """
+    if not outline:
+        return ParentNode("ul", [LeafNode(None, "")])
+    root = []
+    stack = [(outline[0].level, root)]  # (level of the list, its items)
+    for heading in outline:
+        while len(stack) > 1 and stack[-1][0] > heading.level:
+            stack.pop()
+        level, items = stack[-1]
+        if heading.level > level and items:
+            parent = items[-1].children
+            if parent[-1].tag == "ul":  # back up from a deeper heading
+                nested = parent[-1].children
+            else:
+                nested = []
+                parent.append(ParentNode("ul", nested))
+            stack.append((heading.level, nested))
+            items = nested
+        link = LeafNode("a", heading.text, {"href": f"#{heading.slug}"})
+        items.append(ParentNode("li", [link]))
+    return ParentNode("ul", root)
@@ -0,0 +1,310 @@
+"""
+Incremental full-text search index, built from the TextNodes of each page.
+
+Layout, under ``<output>/search/``:
+
+``index.json``
+    ``{"version", "chunks", "docs", "segments"}``.  ``docs[id]`` is
+    ``[url, title, source hash]``, or null once the page was removed or
+    reindexed; the hash tells a build whether the entry is still current.  Each
+    segment is ``{"name", "docs": [ids], "chunks": [chunk numbers]}``.
+
+``<segment>-<chunk as 2 hex digits>.json``
+    The postings of every term whose chunk is ``crc32(utf-8 term) % chunks``,
+    as ``{term: [[doc id, first position, position deltas...], ...]}``.
+
+A client hashes each query term, fetches that one chunk of every segment
+listing it and drops postings of null docs.  Terms are lowercased runs of
+word characters from normal, bold and italic text; positions count terms
+from the start of the page.
+
+Each build appends one segment holding only the pages it reindexed and
+nulls their old docs, so its cost follows the size of the change.
+Segments are merged when an older one is no more than twice the size of
+the newer, which keeps their number logarithmic in the site size, and
+everything is renumbered into one segment once dead docs outnumber live
+ones.
+"""
+
+import json
+import os
+import re
+import zlib
+
+SEARCH_DIR = "search"
+INDEX_NAME = "index.json"
+VERSION = 2
+CHUNKS = 64
+
+_TERM_RE = re.compile(r"\w+")
+_SEGMENT_FILE_RE = re.compile(r"s\d+-[0-9a-f]{2}\.json")
+
+
+def add_terms(terms: dict, text: str, position: int) -> int:
+    """
+    Add the terms of *text* to *terms* (term → positions), numbering them
+    from *position*; returns the position after the last one.
+    """
+    for term in _TERM_RE.findall(text.lower()):
+        positions = terms.get(term)
+        if positions is None:
+            terms[term] = [position]
+        else:
+            positions.append(position)
+        position += 1
+    return position
+
+
+def chunk_of(term: str, chunks: int = CHUNKS) -> int:
+    return zlib.crc32(term.encode("utf-8")) % chunks
+
+
+def _encode(doc: int, positions: list) -> list:
+    previous = positions[0]
+    posting = [doc, previous]
+    for position in positions[1:]:
+        posting.append(position - previous)
+        previous = position
+    return posting
+
+
+def _decode(posting: list) -> tuple:
+    positions = posting[1:]
+    for i in range(1, len(positions)):
+        positions[i] += positions[i - 1]
+    return posting[0], positions
+
+
+class SearchIndex:
+    """
+    The on-disk index of one output directory.  Pages are staged with
+    set_page / remove_page and written out by save().
+    """
+
+    def __init__(self, directory: str, chunks: int = CHUNKS):
+        self.directory = directory
+        self.chunks = chunks
+        self.docs = []  # id → [url, title, source hash] or None
+        self.segments = []
+        self._ids = {}  # url → live doc id
+        self._staged = {}  # url → (title, terms, source hash)
+        self._next_segment = 0
+
+    @classmethod
+    def load(cls, output_dir: str) -> "SearchIndex":
+        """
+        Read the index under *output_dir*; a missing, unreadable or
+        outdated one loads empty.
+        """
+        index = cls(os.path.join(output_dir, SEARCH_DIR))
+        try:
+            with open(os.path.join(index.directory, INDEX_NAME), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("version") != VERSION:
+            return index
+        index.chunks = data["chunks"]
+        index.docs = data["docs"]
+        index.segments = data["segments"]
+        index._ids = {doc[0]: i for i, doc in enumerate(index.docs) if doc}
+        index._next_segment = 1 + max(
+            (int(segment["name"][1:]) for segment in index.segments), default=-1
+        )
+        return index
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._ids or url in self._staged
+
+    def is_current(self, url: str, source_hash: str) -> bool:
+        """
+        True when *url* is indexed from the source with *source_hash*.
+        """
+        staged = self._staged.get(url)
+        if staged is not None:
+            return staged[2] == source_hash
+        doc = self._ids.get(url)
+        return doc is not None and self.docs[doc][2] == source_hash
+
+    def set_page(
+        self, url: str, title: str, terms: dict, source_hash: str = ""
+    ) -> None:
+        """
+        Stage the terms (term → positions) of *url*, rendered from the source
+        with *source_hash*, replacing its old ones.
+        """
+        self._staged[url] = (title, terms, source_hash)
+
+    def remove_page(self, url: str) -> None:
+        self._staged.pop(url, None)
+        doc = self._ids.pop(url, None)
+        if doc is not None:
+            self.docs[doc] = None
+
+    def merge(self, other: "SearchIndex") -> None:
+        """
+        Stage every live page of *other*, as with set_page.
+        """
+        pages = {}  # doc id → terms
+        for segment in other.segments:
+            for chunk in segment["chunks"]:
+                for term, entries in other._read_chunk(segment, chunk).items():
+                    for posting in entries:
+                        doc, positions = _decode(posting)
+                        if other.docs[doc] is not None:
+                            pages.setdefault(doc, {})[term] = positions
+        for url, doc in other._ids.items():
+            _, title, source_hash = other.docs[doc]
+            self.set_page(url, title, pages.get(doc, {}), source_hash)
+        for url, staged in other._staged.items():
+            self.set_page(url, *staged)
+
+    def save(self) -> None:
+        """
+        Write the staged pages as a new segment, merge segments as needed
+        and commit the new index.json; unreferenced segment files go last.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if self._staged:
+            postings = {}
+            doc_ids = []
+            for url, (title, terms, source_hash) in sorted(self._staged.items()):
+                old = self._ids.get(url)
+                if old is not None:
+                    self.docs[old] = None
+                doc = self._ids[url] = len(self.docs)
+                self.docs.append([url, title, source_hash])
+                doc_ids.append(doc)
+                for term, positions in terms.items():
+                    postings.setdefault(term, []).append(_encode(doc, positions))
+            self._staged = {}
+            self.segments.append(self._write_segment(doc_ids, postings))
+        self._merge()
+
+        tmp_path = os.path.join(self.directory, INDEX_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": VERSION,
+                    "chunks": self.chunks,
+                    "docs": self.docs,
+                    "segments": self.segments,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, os.path.join(self.directory, INDEX_NAME))
+        self._remove_stale_files()
+
+    def _live(self, segment: dict) -> int:
+        docs = self.docs
+        return sum(1 for doc in segment["docs"] if docs[doc] is not None)
+
+    def _merge(self) -> None:
+        segments = [s for s in self.segments if self._live(s)]
+        # Fold the newest segment into older ones of comparable size
+        while len(segments) > 1 and self._live(segments[-2]) <= 2 * self._live(
+            segments[-1]
+        ):
+            newer = segments.pop()
+            segments[-1] = self._merge_pair(segments[-1], newer)
+        self.segments = segments
+        # Renumber once removed and replaced pages outnumber the live ones,
+        # so docs does not grow with every edit
+        if len(self.docs) - len(self._ids) > len(self._ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        remap = {}
+        docs = []
+        for old, doc in enumerate(self.docs):
+            if doc is not None:
+                remap[old] = len(docs)
+                docs.append(doc)
+        postings = {}
+        for segment in self.segments:
+            for chunk in segment["chunks"]:
+                for term, entries in self._read_chunk(segment, chunk).items():
+                    for entry in entries:
+                        doc = remap.get(entry[0])
+                        if doc is not None:
+                            postings.setdefault(term, []).append([doc, *entry[1:]])
+        self.docs = docs
+        self._ids = {doc[0]: i for i, doc in enumerate(docs)}
+        self.segments = []
+        if docs:
+            self.segments.append(self._write_segment(list(range(len(docs))), postings))
+
+    def _merge_pair(self, older: dict, newer: dict) -> dict:
+        docs = self.docs
+        postings = {}
+        for segment in (older, newer):
+            for chunk in segment["chunks"]:
+                for term, entries in self._read_chunk(segment, chunk).items():
+                    live = [entry for entry in entries if docs[entry[0]] is not None]
+                    if live:
+                        postings.setdefault(term, []).extend(live)
+        doc_ids = [doc for s in (older, newer) for doc in s["docs"] if docs[doc]]
+        return self._write_segment(doc_ids, postings)
+
+    def _write_segment(self, doc_ids: list, postings: dict) -> dict:
+        name = f"s{self._next_segment}"
+        self._next_segment += 1
+        by_chunk = {}
+        for term, entries in postings.items():
+            by_chunk.setdefault(chunk_of(term, self.chunks), {})[term] = entries
+        for chunk, terms in by_chunk.items():
+            with open(self._chunk_path(name, chunk), "w", encoding="utf-8") as f:
+                json.dump(terms, f, separators=(",", ":"), sort_keys=True)
+        return {"name": name, "docs": doc_ids, "chunks": sorted(by_chunk)}
+
+    def _chunk_path(self, name: str, chunk: int) -> str:
+        return os.path.join(self.directory, f"{name}-{chunk:02x}.json")
+
+    def _read_chunk(self, segment: dict, chunk: int) -> dict:
+        with open(self._chunk_path(segment["name"], chunk), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _remove_stale_files(self) -> None:
+        live = {
+            os.path.basename(self._chunk_path(segment["name"], chunk))
+            for segment in self.segments
+            for chunk in segment["chunks"]
+        }
+        for entry in os.scandir(self.directory):
+            if _SEGMENT_FILE_RE.fullmatch(entry.name) and entry.name not in live:
+                os.remove(entry.path)
+
+    def lookup(self, term: str) -> dict:
+        """
+        Return url → positions of *term* over every live page, reading one
+        chunk per segment, as a client would.
+        """
+        term = term.lower()
+        chunk = chunk_of(term, self.chunks)
+        found = {}
+        for segment in self.segments:
+            if chunk not in segment["chunks"]:
+                continue
+            for posting in self._read_chunk(segment, chunk).get(term, ()):
+                doc, positions = _decode(posting)
+                if self.docs[doc] is not None:
+                    found[self.docs[doc][0]] = positions
+        return found
+
+    def search(self, query: str) -> list:
+        """
+        Return the urls of pages containing every term of *query*, the most
+        matches first.
+        """
+        terms = set(_TERM_RE.findall(query.lower()))
+        if not terms:
+            return []
+        hits = None
+        scores = {}
+        for term in terms:
+            found = self.lookup(term)
+            hits = set(found) if hits is None else hits & set(found)
+            for url, positions in found.items():
+                scores[url] = scores.get(url, 0) + len(positions)
+        return sorted(hits, key=lambda url: (-scores[url], url))
@@ -0,0 +1,60 @@
+"""
+Deterministic partitioning of a site for sharded builds.
+
+``build --shard i/N`` renders only the pages whose stable hash puts them in
+shard *i* of *N* (1-based), into its own output directory, and records
+which shard that directory holds in SHARD_NAME next to its manifest, link
+graph and search index.  merge.merge_shards combines the N directories.
+"""
+
+import hashlib
+import json
+import os
+
+SHARD_NAME = ".shard.json"
+
+
+def parse_shard(spec: str) -> tuple:
+    """
+    Parse "i/N" into (i, N), with 1 <= i <= N.
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got {index}")
+    return index, count
+
+
+def shard_of(page: str, count: int) -> int:
+    """
+    The 1-based shard of *page* (a path relative to the content directory)
+    out of *count*.  Depends only on the path, so every machine agrees.
+    """
+    key = page.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big") % count + 1
+
+
+def write_shard_info(output_dir: str, shard: tuple, generator: str) -> None:
+    path = os.path.join(output_dir, SHARD_NAME)
+    if shard is None:
+        # A full build over an old shard's output: it is no longer one
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return
+    index, count = shard
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"index": index, "count": count, "generator": generator}, f)
+    os.replace(tmp_path, path)
+
+
+def load_shard_info(shard_dir: str) -> dict:
+    try:
+        with open(os.path.join(shard_dir, SHARD_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        raise ValueError(f"{shard_dir} is not the output of a sharded build") from None
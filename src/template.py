@@ -0,0 +1,70 @@
+import os
+import re
+
+# {{ name }} slots; everything between them is copied verbatim
+SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """
+    A layout parsed once into alternating static chunks and slot names, so
+    rendering is a single join whatever the template's size.
+
+    Slot values are strings or HTMLNode trees; trees are streamed straight
+    into the sink by render_to.
+    """
+
+    __slots__ = ("parts", "slots")
+
+    def __init__(self, source: str):
+        # re.split with one group: even indexes are static, odd are slots
+        self.parts = SLOT_RE.split(source)
+        self.slots = tuple(self.parts[1::2])
+
+    def _values(self, context: dict) -> list:
+        try:
+            return [context[name] for name in self.slots]
+        except KeyError as exc:
+            raise ValueError(f"Template slot {exc.args[0]!r} has no value") from None
+
+    def render(self, context: dict) -> str:
+        parts = self.parts[:]
+        parts[1::2] = [
+            value if isinstance(value, str) else value.to_html()
+            for value in self._values(context)
+        ]
+        return "".join(parts)
+
+    def render_to(self, sink, context: dict) -> None:
+        """
+        Stream the rendered template into the text sink *sink*.
+        """
+        values = self._values(context)
+        parts = self.parts
+        write = sink.write
+        write(parts[0])
+        for i, value in enumerate(values):
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.render_to(sink)
+            write(parts[2 * i + 2])
+
+
+# path → (mtime_ns, size, Template)
+_cache = {}
+
+
+def load_template(path: str) -> Template:
+    """
+    Return the parsed template at *path*, re-parsing only when the file's
+    mtime or size changed since the last load.
+    """
+    stat = os.stat(path)
+    cached = _cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    with open(path, encoding="utf-8") as f:
+        template = Template(f.read())
+    _cache[path] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
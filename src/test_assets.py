@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from assets import ASSET_MANIFEST_NAME, mirror_assets, place_file
+from build import build_site
+from test_build import BuildTestCase, read, write
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.output = os.path.join(self.tmp.name, "public")
+        write(os.path.join(self.static, "css", "site.css"), "body {}\n")
+        write(os.path.join(self.static, "img", "a.svg"), "<svg/>\n")
+        write(os.path.join(self.static, "img", "copy-of-a.svg"), "<svg/>\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def out(self, *parts):
+        return os.path.join(self.output, *parts)
+
+    def test_mirrors_and_deduplicates(self):
+        report = mirror_assets(self.static, self.output, mode="copy")
+        self.assertEqual((report.files, report.skipped, report.deduped), (3, 0, 1))
+        self.assertEqual(read(self.out("css", "site.css")), "body {}\n")
+        self.assertTrue(
+            os.path.samefile(self.out("img", "a.svg"), self.out("img", "copy-of-a.svg"))
+        )
+        self.assertTrue(os.path.exists(self.out(ASSET_MANIFEST_NAME)))
+
+    def test_twins_never_share_a_source_inode(self):
+        mirror_assets(self.static, self.output)  # may hardlink to the sources
+        a = os.path.join(self.static, "img", "a.svg")
+        with open(a, "r+", encoding="utf-8") as f:
+            f.write("<SVG/>\n")  # same size, edited in place
+        report = mirror_assets(self.static, self.output)
+        self.assertEqual(read(self.out("img", "a.svg")), "<SVG/>\n")
+        self.assertEqual(read(self.out("img", "copy-of-a.svg")), "<svg/>\n")
+        self.assertEqual(report.skipped, 2)
+
+    def test_output_sharing_a_changed_inode_is_replaced(self):
+        # As left by a run that linked a twin to a source-linked output
+        mirror_assets(self.static, self.output)
+        copy = self.out("img", "copy-of-a.svg")
+        os.remove(copy)
+        os.link(os.path.join(self.static, "img", "a.svg"), copy)
+        with open(os.path.join(self.static, "img", "a.svg"), "r+") as f:
+            f.write("<SVG/>\n")
+        report = mirror_assets(self.static, self.output)
+        self.assertEqual(read(copy), "<svg/>\n")
+        self.assertEqual(report.skipped, 1)
+
+    def test_second_run_skips_everything(self):
+        mirror_assets(self.static, self.output)
+        report = mirror_assets(self.static, self.output)
+        self.assertEqual((report.skipped, report.methods), (3, {}))
+
+    def test_touched_file_is_skipped_by_hash(self):
+        mirror_assets(self.static, self.output, mode="copy")
+        os.utime(os.path.join(self.static, "css", "site.css"), ns=(0, 0))
+        report = mirror_assets(self.static, self.output, mode="copy")
+        self.assertEqual(report.skipped, 3)
+
+    def test_changed_file_is_replaced_not_written_in_place(self):
+        mirror_assets(self.static, self.output)  # may hardlink to the source
+        css = os.path.join(self.static, "css", "site.css")
+        os.remove(css)
+        write(css, "body { color: red }\n")
+        report = mirror_assets(self.static, self.output)
+        self.assertEqual(report.skipped, 2)
+        self.assertEqual(read(self.out("css", "site.css")), "body { color: red }\n")
+
+    def test_copy_mode_never_shares_source_inode(self):
+        mirror_assets(self.static, self.output, mode="copy")
+        self.assertFalse(
+            os.path.samefile(
+                os.path.join(self.static, "css", "site.css"),
+                self.out("css", "site.css"),
+            )
+        )
+
+    def test_prunes_deleted_assets(self):
+        mirror_assets(self.static, self.output)
+        os.remove(os.path.join(self.static, "css", "site.css"))
+        report = mirror_assets(self.static, self.output)
+        self.assertEqual(report.pruned, 1)
+        self.assertFalse(os.path.exists(self.out("css", "site.css")))
+
+    def test_place_file(self):
+        src = os.path.join(self.static, "css", "site.css")
+        dst = os.path.join(self.tmp.name, "placed.css")
+        self.assertIn(
+            place_file(src, dst, mode="copy"),
+            ("reflink", "copy_file_range", "chunked"),
+        )
+        self.assertEqual(read(dst), "body {}\n")
+        self.assertEqual(os.stat(dst).st_mtime_ns, os.stat(src).st_mtime_ns)
+        self.assertRaises(ValueError, place_file, src, dst, "bogus")
+
+
+class TestBuildWithAssets(BuildTestCase):
+    def test_build_mirrors_static_dir(self):
+        static = os.path.join(self.tmp.name, "static")
+        write(os.path.join(static, "img", "logo.png"), "png")
+        report = build_site(self.content, self.output, 1, static_dir=static)
+        self.assertBuilt()
+        self.assertEqual(report.assets.files, 1)
+        self.assertEqual(read(os.path.join(self.output, "img", "logo.png")), "png")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from benchmarks.corpus import CorpusConfig, generate_corpus
+from benchmarks.pathological import GENERATORS
+from benchmarks.suite import compare
+
+
+class TestCorpus(unittest.TestCase):
+    def test_deterministic(self):
+        config = CorpusConfig(pages=5, seed=42)
+        self.assertListEqual(generate_corpus(config), generate_corpus(config))
+        self.assertNotEqual(
+            generate_corpus(config), generate_corpus(CorpusConfig(pages=5, seed=43))
+        )
+
+    def test_knobs(self):
+        plain = "".join(
+            generate_corpus(
+                CorpusConfig(pages=5, markup_density=0, list_depth=0, code_share=0)
+            )
+        )
+        self.assertNotIn("```", plain)
+        self.assertNotIn("\n- ", plain)
+        self.assertNotIn("**", plain)
+
+        code = "".join(generate_corpus(CorpusConfig(pages=5, code_share=1)))
+        self.assertEqual(code.count("```python"), 5 * 11)
+
+    def test_list_depth(self):
+        pages = generate_corpus(CorpusConfig(pages=20, list_depth=3))
+        self.assertTrue(any("\n    - " in page for page in pages))
+        self.assertFalse(any("\n      - " in page for page in pages))
+
+
+class TestPathological(unittest.TestCase):
+    def test_generators_scale_with_n(self):
+        for name, generate in GENERATORS.items():
+            with self.subTest(name):
+                self.assertAlmostEqual(len(generate(1000)), 1000, delta=8)
+                self.assertAlmostEqual(len(generate(2000)), 2000, delta=8)
+
+
+class TestCompare(unittest.TestCase):
+    def test_flags_regressions_over_threshold(self):
+        baseline = {"stages": {"inline": {"seconds": 1.0}, "render": {"seconds": 1.0}}}
+        results = {
+            "stages": {
+                "inline": {"seconds": 1.05},
+                "render": {"seconds": 1.5},
+                "new": {"seconds": 9.0},
+            }
+        }
+        self.assertListEqual(
+            compare(results, baseline, threshold=0.1), [("render", 1.0, 1.5, 0.5)]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
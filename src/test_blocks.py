@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from blocks import BlockType, block_to_block_type, markdown_to_blocks
+from blocks import BlockType, block_to_block_type, iter_blocks, markdown_to_blocks
 
 
 class TestBlocks(unittest.TestCase):
@@ -121,6 +122,9 @@ and it may be on two lines.
         blocks = block_to_block_type(md.strip())
         self.assertEqual(blocks, BlockType.UNORDERED_LIST)
 
+    def test_block_to_block_type_with_leading_bold(self):
+        self.assertEqual(block_to_block_type("**Bold** start"), BlockType.PARAGRAPH)
+
     def test_block_to_block_type_with_ordered_list(self):
         md = """
 1. This is a list
@@ -131,6 +135,81 @@ and it may be on two lines.
         blocks = block_to_block_type(md.strip())
         self.assertEqual(blocks, BlockType.ORDERED_LIST)
 
+    def test_block_to_block_type_with_single_digit(self):
+        self.assertEqual(block_to_block_type("7"), BlockType.PARAGRAPH)
+
+
+class TestIterBlocks(unittest.TestCase):
+    def test_classifies_blocks(self):
+        md = io.StringIO(
+            "# Title\n"
+            "\n"
+            "Some **text**\n"
+            "over two lines\n"
+            "\n"
+            "> quoted\n"
+            "\n"
+            "- one\n"
+            "- two\n"
+            "\n"
+            "1. first\n"
+            "2. second\n"
+        )
+        self.assertListEqual(
+            list(iter_blocks(md)),
+            [
+                (BlockType.HEADING, "# Title"),
+                (BlockType.PARAGRAPH, "Some **text**\nover two lines"),
+                (BlockType.QUOTE, "> quoted"),
+                (BlockType.UNORDERED_LIST, "- one\n- two"),
+                (BlockType.ORDERED_LIST, "1. first\n2. second"),
+            ],
+        )
+
+    def test_fenced_code_keeps_blank_lines(self):
+        md = [
+            "Intro\n",
+            "  ```python\n",
+            "  def f():\n",
+            "\n",
+            "      return 1\n",
+            "  ```\n",
+            "Outro\n",
+        ]
+        self.assertListEqual(
+            list(iter_blocks(md)),
+            [
+                (BlockType.PARAGRAPH, "Intro"),
+                (BlockType.CODE, "```python\ndef f():\n\n    return 1\n```"),
+                (BlockType.PARAGRAPH, "Outro"),
+            ],
+        )
+
+    def test_one_line_code_block(self):
+        self.assertListEqual(
+            list(iter_blocks(['```print("Hello World")```'])),
+            [(BlockType.CODE, '```print("Hello World")```')],
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        self.assertListEqual(
+            list(iter_blocks(["```\n", "code\n", "\n", "more\n"])),
+            [(BlockType.PARAGRAPH, "```\ncode\n\nmore")],
+        )
+
+    def test_is_lazy(self):
+        def lines():
+            yield "first\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        blocks = iter_blocks(lines())
+        self.assertEqual(next(blocks), (BlockType.PARAGRAPH, "first"))
+
+    def test_markdown_to_blocks_keeps_fence_whole(self):
+        md = "Text\n\n```\na\n\nb\n```\n"
+        self.assertListEqual(markdown_to_blocks(md), ["Text", "```\na\n\nb\n```"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site, find_pages, output_path_for
+from manifest import MANIFEST_NAME, Manifest, generator_version
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class BuildTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        write(os.path.join(self.content, "index.md"), "# Home\n\nHello **world**\n")
+        write(os.path.join(self.content, "blog", "post.md"), "A [link](/index.html)\n")
+        write(os.path.join(self.content, "static", "notes.txt"), "not a page\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertBuilt(self):
+        self.assertEqual(
+            read(os.path.join(self.output, "index.html")),
+            '<div><h1 id="home">Home</h1><p>Hello <b>world</b></p></div>',
+        )
+        self.assertEqual(
+            read(os.path.join(self.output, "blog", "post.html")),
+            '<div><p>A <a href="/index.html">link</a></p></div>',
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.output, "static")))
+
+
+class TestBuild(BuildTestCase):
+    def test_find_pages(self):
+        self.assertListEqual(
+            find_pages(self.content), [os.path.join("blog", "post.md"), "index.md"]
+        )
+
+    def test_output_path_for(self):
+        self.assertEqual(output_path_for("blog/post.md"), "blog/post.html")
+
+    def test_build_in_process(self):
+        report = build_site(self.content, self.output, workers=1)
+        self.assertEqual(report.pages, 2)
+        self.assertEqual(report.workers, 1)
+        self.assertBuilt()
+
+    def test_build_with_process_pool(self):
+        report = build_site(self.content, self.output, workers=2, chunk_size=1)
+        self.assertEqual(report.workers, 2)
+        self.assertBuilt()
+        self.assertEqual(
+            report.bytes_out,
+            sum(
+                os.path.getsize(os.path.join(self.output, page))
+                for page in ("index.html", os.path.join("blog", "post.html"))
+            ),
+        )
+
+
+class TestIncrementalBuild(BuildTestCase):
+    def test_second_build_skips_everything(self):
+        build_site(self.content, self.output, workers=1)
+        report = build_site(self.content, self.output, workers=1)
+        self.assertEqual((report.rebuilt, report.skipped), (0, 2))
+        self.assertBuilt()
+
+    def test_rebuilds_only_changed_page(self):
+        build_site(self.content, self.output, workers=1)
+        write(os.path.join(self.content, "index.md"), "# Home\n\nChanged\n")
+        report = build_site(self.content, self.output, workers=1)
+        self.assertEqual((report.rebuilt, report.skipped), (1, 1))
+        self.assertEqual(
+            read(os.path.join(self.output, "index.html")),
+            '<div><h1 id="home">Home</h1><p>Changed</p></div>',
+        )
+
+    def test_rebuilds_missing_output(self):
+        build_site(self.content, self.output, workers=1)
+        os.remove(os.path.join(self.output, "index.html"))
+        report = build_site(self.content, self.output, workers=1)
+        self.assertEqual((report.rebuilt, report.skipped), (1, 1))
+        self.assertBuilt()
+
+    def test_force_rebuilds_everything(self):
+        build_site(self.content, self.output, workers=1)
+        report = build_site(self.content, self.output, workers=1, force=True)
+        self.assertEqual((report.rebuilt, report.skipped), (2, 0))
+
+    def test_generator_change_rebuilds_everything(self):
+        build_site(self.content, self.output, workers=1)
+        manifest_path = os.path.join(self.output, MANIFEST_NAME)
+        manifest = Manifest.load(manifest_path, generator_version())
+        Manifest("older-generator", manifest.pages).save(manifest_path)
+        report = build_site(self.content, self.output, workers=1)
+        self.assertEqual((report.rebuilt, report.skipped), (2, 0))
+
+    def test_prunes_deleted_sources(self):
+        build_site(self.content, self.output, workers=1)
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        report = build_site(self.content, self.output, workers=1)
+        self.assertEqual((report.rebuilt, report.skipped, report.pruned), (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog")))
+        manifest = Manifest.load(
+            os.path.join(self.output, MANIFEST_NAME), generator_version()
+        )
+        self.assertListEqual(list(manifest.pages), ["index.md"])
+
+    def test_max_inline_chars(self):
+        write(os.path.join(self.content, "long.md"), "word " * 100 + "\n")
+        self.assertRaisesRegex(
+            ValueError,
+            "exceeds the limit of 200",
+            build_site,
+            self.content,
+            self.output,
+            workers=1,
+            max_inline_chars=200,
+        )
+        report = build_site(self.content, self.output, workers=1, max_inline_chars=0)
+        self.assertEqual(report.rebuilt, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import client
+import render
+from daemon import BuildDaemon, DaemonServer
+from manifest import MANIFEST_NAME
+from test_build import BuildTestCase, read, write
+
+
+class TestDaemon(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.socket = os.path.join(self.tmp.name, "daemon.sock")
+        self.index = os.path.join(self.content, "index.md")
+        # The daemon installs its InlineCache process-wide
+        self.addCleanup(render.set_inline_cache, None)
+
+    def start(self):
+        server = DaemonServer(self.socket, BuildDaemon(inline_cache_size=64))
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+        self.addCleanup(stop)
+        return server
+
+    def test_render(self):
+        self.start()
+        result = client.render(self.index, socket_path=self.socket)
+        self.assertTrue(result["daemon"])
+        self.assertEqual(result["title"], "Home")
+        self.assertEqual(
+            result["html"], client.render(self.index, socket_path="nowhere")["html"]
+        )
+        self.assertEqual(client.request({"op": "ping"}, self.socket)["requests"], 2)
+
+    def test_build_reuses_site_state(self):
+        server = self.start()
+        first = client.build(self.content, self.output, socket_path=self.socket)
+        self.assertEqual((first["rebuilt"], first["daemon"]), (2, True))
+        self.assertBuilt()
+
+        write(self.index, "# Home\n\nFrom the daemon\n")
+        second = client.build(self.content, self.output, socket_path=self.socket)
+        self.assertEqual((second["rebuilt"], second["skipped"]), (1, 1))
+        self.assertIn("From the daemon", read(os.path.join(self.output, "index.html")))
+        self.assertGreater(server.daemon.inline_cache.stats()["misses"], 0)
+
+    def test_layout_or_manifest_change_rebuilds_everything(self):
+        daemon = BuildDaemon(inline_cache_size=0)
+        layout = os.path.join(self.tmp.name, "layout.html")
+        write(layout, "<main>{{ content }}</main>")
+        daemon.op_build(self.content, self.output, layout)
+        self.assertEqual(
+            daemon.op_build(self.content, self.output, layout)["rebuilt"], 0
+        )
+
+        write(layout, "<article>{{ content }}</article>")
+        self.assertEqual(
+            daemon.op_build(self.content, self.output, layout)["rebuilt"], 2
+        )
+        html = read(os.path.join(self.output, "blog", "post.html"))
+        self.assertTrue(html.startswith("<article>"))
+
+        os.remove(os.path.join(self.output, MANIFEST_NAME))
+        self.assertEqual(
+            daemon.op_build(self.content, self.output, layout)["rebuilt"], 2
+        )
+
+    def test_failed_pages_are_retried(self):
+        daemon = BuildDaemon(inline_cache_size=0)
+        daemon.op_build(self.content, self.output)
+        write(self.index, "# Home\n\nAn **unclosed bold\n")
+        post = os.path.join(self.content, "blog", "post.md")
+        write(post, "Edited alongside\n")
+        result = daemon.op_build(self.content, self.output)
+        self.assertEqual((result["rebuilt"], list(result["failed"])), (1, ["index.md"]))
+        self.assertIn(
+            "Edited alongside", read(os.path.join(self.output, "blog", "post.html"))
+        )
+
+        # Still broken: reported again, not mistaken for up to date
+        self.assertListEqual(
+            list(daemon.op_build(self.content, self.output)["failed"]), ["index.md"]
+        )
+        write(self.index, "# Home\n\nFixed\n")
+        result = daemon.op_build(self.content, self.output)
+        self.assertEqual((result["rebuilt"], result["failed"]), (1, {}))
+
+    def test_fallback_without_daemon(self):
+        result = client.build(self.content, self.output, socket_path=self.socket)
+        self.assertEqual((result["rebuilt"], result["daemon"]), (2, False))
+        self.assertBuilt()
+
+    def test_errors_are_reported(self):
+        self.start()
+        missing = os.path.join(self.content, "missing.md")
+        with self.assertRaisesRegex(RuntimeError, "FileNotFoundError"):
+            client.render(missing, socket_path=self.socket)
+        response = client.request({"op": "nonsense"}, self.socket)
+        self.assertFalse(response["ok"])
+
+    def test_shutdown_removes_socket(self):
+        server = DaemonServer(self.socket, BuildDaemon(inline_cache_size=0))
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        with self.assertRaises(RuntimeError):
+            DaemonServer(self.socket)  # already served
+        self.assertTrue(client.request({"op": "shutdown"}, self.socket)["ok"])
+        thread.join()
+        server.server_close()
+        self.assertFalse(os.path.exists(self.socket))
+        self.assertIsNone(client.request({"op": "ping"}, self.socket))
+
+    def test_socket_of_another_user_is_refused(self):
+        server = self.start()
+        other_uid = mock.patch.object(os, "getuid", return_value=os.getuid() + 1)
+        with other_uid:
+            with self.assertRaisesRegex(PermissionError, "another user"):
+                client.request({"op": "ping"}, self.socket)
+            with self.assertRaises(PermissionError):
+                DaemonServer(self.socket)
+        self.assertTrue(os.path.exists(server.socket_path))
+
+
+class TestDefaultSocketPath(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        env = {k: v for k, v in os.environ.items() if k != "XDG_RUNTIME_DIR"}
+        for patch in (
+            mock.patch.dict(os.environ, env, clear=True),
+            mock.patch.object(tempfile, "tempdir", self.tmp.name),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.directory = os.path.join(self.tmp.name, f"bdd-ssg-{os.getuid()}")
+
+    def test_runtime_dir(self):
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/7"}):
+            self.assertEqual(client.default_socket_path(), "/run/user/7/bdd-ssg.sock")
+
+    def test_private_directory_in_temp_dir(self):
+        path = client.default_socket_path()
+        self.assertEqual(path, os.path.join(self.directory, client.SOCKET_NAME))
+        self.assertEqual(stat.S_IMODE(os.stat(self.directory).st_mode), 0o700)
+        self.assertEqual(client.default_socket_path(), path)
+
+    def test_shared_directory_is_refused(self):
+        os.mkdir(self.directory, 0o755)
+        os.chmod(self.directory, 0o755)
+        with self.assertRaisesRegex(PermissionError, "not a private directory"):
+            client.default_socket_path()
+        with self.assertRaises(PermissionError):
+            client.request({"op": "ping"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,51 @@
+import itertools
+import re
 import unittest
 
-from extraction import extract_markdown_images, extract_markdown_links
+from extraction import (
+    REFERENCE_RE,
+    MarkdownRef,
+    ReferenceMatcher,
+    RefKind,
+    extract_markdown_images,
+    extract_markdown_links,
+    iter_markdown_refs,
+    ref_from_match,
+)
+
+# The extraction before the linear matcher: images first, then links in the
+# text between them
+IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+LINK_RE = re.compile(r"\[(.*?)\]\((.*?)\)")
+
+
+def regex_ref(match, kind):
+    text, url = match.groups()
+    return MarkdownRef(kind, text, url, match.start(), match.end())
+
+
+def two_pass_refs(text):
+    refs, pos = [], 0
+    images = list(IMAGE_RE.finditer(text)) + [None]
+    for image in images:
+        gap_end = image.start() if image else len(text)
+        for link in LINK_RE.finditer(text, pos, gap_end):
+            refs.append(regex_ref(link, RefKind.LINK))
+        if image:
+            refs.append(regex_ref(image, RefKind.IMAGE))
+            pos = image.end()
+    return sorted(refs, key=lambda ref: ref.start)
+
+
+def two_pass_match(text, start):
+    match = REFERENCE_RE.match(text, start)
+    if match is None:
+        return None
+    ref = ref_from_match(match)
+    image = IMAGE_RE.search(text, start)
+    if ref.kind is RefKind.LINK and image and image.start() < ref.end:
+        return None
+    return ref
 
 
 class Extraction(unittest.TestCase):
@@ -16,6 +61,62 @@ class Extraction(unittest.TestCase):
         )
         self.assertListEqual([("link text", "https://boot.dev")], matches)
 
+    def test_extract_markdown_links_skips_images(self):
+        matches = extract_markdown_links(
+            "An ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://boot.dev)"
+        )
+        self.assertListEqual([("link", "https://boot.dev")], matches)
+
+    def test_iter_markdown_refs(self):
+        text = "See ![alt](a.png) and [docs](https://boot.dev)."
+        refs = list(iter_markdown_refs(text))
+        self.assertListEqual(
+            [
+                MarkdownRef(RefKind.IMAGE, "alt", "a.png", 4, 17),
+                MarkdownRef(RefKind.LINK, "docs", "https://boot.dev", 22, 46),
+            ],
+            refs,
+        )
+        self.assertEqual(text[refs[1].start : refs[1].end], "[docs](https://boot.dev)")
+
+    def test_images_take_precedence(self):
+        text = "Press [ to open the ![menu icon](menu.png) panel"
+        self.assertListEqual(extract_markdown_images(text), [("menu icon", "menu.png")])
+        self.assertListEqual(extract_markdown_links(text), [])
+        self.assertListEqual(
+            extract_markdown_links("[a](b ![c](d) [e](f)"), [("e", "f")]
+        )
+
+    def test_matches_reference_pattern(self):
+        # Every string of up to five of these characters, plus a few longer
+        # ones, against the two regex passes the matcher replaces
+        texts = [
+            "".join(chars)
+            for k in range(6)
+            for chars in itertools.product("![]()\n", repeat=k)
+        ]
+        texts += ["[a](b) ![c](d)", "[a]](b)", "[a\n](b)", "[a](b\n)", "[[a](b)](c)"]
+        texts += ["[ a ![b](c) d", "[a](b ![c](d) [e](f)", "[a ![b](c)](d)"]
+        for text in texts:
+            self.assertListEqual(
+                two_pass_refs(text), list(iter_markdown_refs(text)), text
+            )
+            matcher = ReferenceMatcher(text)
+            for start in range(len(text)):
+                self.assertEqual(
+                    two_pass_match(text, start), matcher.match(start), (text, start)
+                )
+
+    def test_unclosed_openers_scan_in_linear_time(self):
+        # Quadratic under REFERENCE_RE.finditer: minutes, not milliseconds
+        for text in ("[" * 200000, "![" * 100000, "[a](" * 50000):
+            self.assertListEqual([], list(iter_markdown_refs(text)))
+        # Every "[" runs across the image
+        refs = list(iter_markdown_refs("[" * 200000 + "![a](b)"))
+        self.assertListEqual(
+            [(ref.kind, ref.start) for ref in refs], [(RefKind.IMAGE, 200000)]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+from unittest import mock
+
+import htmlnode
+from build import build_site
+from fragment_cache import FragmentCache, structural_key
+from leafnode import LeafNode
+from parentnode import ParentNode
+from render import markdown_to_html_node
+from textnode import TextNode, TextType
+from test_build import BuildTestCase
+
+
+def callout():
+    return ParentNode(
+        "blockquote",
+        [
+            LeafNode("b", "Note:"),
+            LeafNode(None, " read the "),
+            LeafNode("a", "docs", {"href": "/d.html"}),
+        ],
+    )
+
+
+class TestStructuralKey(unittest.TestCase):
+    def test_equal_subtrees_share_a_key(self):
+        self.assertEqual(structural_key(callout()), structural_key(callout()))
+        self.assertEqual(
+            hash(structural_key(callout())), hash(structural_key(callout()))
+        )
+
+    def test_any_difference_changes_the_key(self):
+        base = structural_key(callout())
+        variants = [
+            ParentNode("blockquote", [LeafNode("b", "Note:")]),
+            ParentNode("blockquote", callout().children, {"class": "tip"}),
+            ParentNode("aside", callout().children),
+            ParentNode("blockquote", list(reversed(callout().children))),
+            ParentNode("blockquote", [ParentNode("b", [LeafNode(None, "Note:")])]),
+        ]
+        for variant in variants:
+            self.assertNotEqual(structural_key(variant), base)
+
+    def test_text_nodes_are_keyed_without_leaves(self):
+        def para(url):
+            return ParentNode(
+                "p",
+                [TextNode("see ", TextType.NORMAL), TextNode("x", TextType.LINK, url)],
+            )
+
+        with mock.patch.object(
+            TextNode, "to_leaf", side_effect=AssertionError
+        ):
+            self.assertEqual(
+                structural_key(para("/a.html")), structural_key(para("/a.html"))
+            )
+            self.assertNotEqual(
+                structural_key(para("/a.html")), structural_key(para("/b.html"))
+            )
+
+    def test_too_deep(self):
+        node = LeafNode(None, "x")
+        for _ in range(10):
+            node = ParentNode("div", [node])
+        self.assertIsNone(structural_key(node, depth=5))
+        self.assertIsNotNone(structural_key(node, depth=10))
+
+
+class TestFragmentCache(unittest.TestCase):
+    def test_output_matches_uncached(self):
+        node = markdown_to_html_node(
+            "# Title\n\n- one\n- **two**\n- one\n\n> quote\n\n```\n<code>\n```\n"
+        )
+        cache = FragmentCache()
+        self.assertEqual(cache.to_html(node), node.to_html())
+        self.assertEqual(cache.to_html(node), node.to_html())
+
+    def test_repeated_subtree_renders_once(self):
+        root = ParentNode("div", [callout(), ParentNode("p", [callout()]), callout()])
+        cache = FragmentCache()
+        self.assertEqual(cache.to_html(root), root.to_html())
+        # First callout: new fingerprint.  Second: keyed and stored.  Third: hit.
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 1))
+        self.assertEqual(cache.bytes_reused, len(callout().to_html()))
+
+        self.assertEqual(cache.to_html(root), root.to_html())
+        self.assertEqual((cache.hits, len(cache)), (4, 2))  # now with the <p>
+
+    def test_unhashable_props_render_uncached(self):
+        item = ParentNode("li", [LeafNode(None, "x")], {"data-x": ["a"]})
+        root = ParentNode("ul", [item, item, item])
+        cache = FragmentCache()
+        self.assertEqual(cache.to_html(root), root.to_html())
+        self.assertEqual((cache.hits, len(cache)), (0, 0))
+
+    def test_root_is_not_cached(self):
+        cache = FragmentCache()
+        cache.to_html(ParentNode("div", [LeafNode(None, "x")]))
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = FragmentCache(1)
+        items = [ParentNode("li", [LeafNode(None, str(i))]) for i in range(3)]
+        root = ParentNode("ul", items)
+        cache.to_html(root)
+        cache.to_html(root)
+        self.assertEqual((len(cache), cache.evictions), (1, 2))
+
+    def test_streams_outside_captures(self):
+        cache = FragmentCache()
+        root = ParentNode("div", [callout(), callout()])
+        cache.to_html(root)
+        pieces = []
+        cache.render(root, pieces.append)
+        self.assertListEqual(
+            pieces, ["<div>", callout().to_html(), callout().to_html(), "</div>"]
+        )
+
+    def test_hooks_into_node_rendering(self):
+        root = ParentNode("div", [callout(), callout(), callout()])
+        cache = FragmentCache()
+        htmlnode.set_fragment_cache(cache)
+        try:
+            html = root.to_html()
+        finally:
+            htmlnode.set_fragment_cache(None)
+        self.assertEqual(html, root.to_html())
+        self.assertEqual(cache.hits, 1)
+
+    def test_drain_stats_keeps_entries(self):
+        cache = FragmentCache()
+        cache.to_html(ParentNode("div", [callout(), callout(), callout()]))
+        self.assertEqual(cache.drain_stats()["hit_rate"], 1 / 3)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 1))
+
+    def test_rejects_empty_cache(self):
+        self.assertRaises(ValueError, FragmentCache, 0)
+
+
+class TestCachedBuild(BuildTestCase):
+    def test_build_reports_cache_stats(self):
+        report = build_site(self.content, self.output, 1, fragment_cache_size=8)
+        self.assertBuilt()
+        # h1 and p on the index page, p on the post
+        self.assertEqual(report.fragment_cache["misses"], 3)
+        self.assertIsNone(htmlnode.fragment_cache)
+
+    def test_off_by_default(self):
+        self.assertIsNone(build_site(self.content, self.output, 1).fragment_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import highlight
+from build import build_site
+from highlight import HighlightCache, language_of, tokenize
+from test_build import BuildTestCase, read, write
+
+
+class TestTokenize(unittest.TestCase):
+    def test_language_of(self):
+        self.assertEqual(language_of("python"), "python")
+        self.assertEqual(language_of("JS title=app.js"), "javascript")
+        self.assertEqual(language_of("{.sh}"), "bash")
+        self.assertIsNone(language_of(""))
+        self.assertIsNone(language_of("cobol"))
+
+    def test_python(self):
+        self.assertListEqual(
+            tokenize("def f(x):\n    return len(x)  # n\n", "python"),
+            [
+                ("keyword", "def"),
+                (None, " f(x):\n    "),
+                ("keyword", "return"),
+                (None, " "),
+                ("builtin", "len"),
+                (None, "(x)  "),
+                ("comment", "# n"),
+                (None, "\n"),
+            ],
+        )
+        # Keywords and numbers are not found inside names
+        self.assertListEqual(
+            tokenize("format_if x1", "python"), [(None, "format_if x1")]
+        )
+
+    def test_tokens_cover_the_code(self):
+        code = "a = \"b # c\" '''d\ne''' /* <x y='z'> */ $V -- 1.5e3 `t"
+        for language in highlight.RULES:
+            with self.subTest(language):
+                tokens = tokenize(code, language)
+                self.assertEqual("".join(text for _, text in tokens), code)
+
+    def test_unclosed_constructs_run_to_the_end(self):
+        self.assertListEqual(
+            tokenize('x = """open\n', "python"),
+            [(None, "x = "), ("string", '"""open\n')],
+        )
+        self.assertListEqual(
+            tokenize("a /* open", "css"), [(None, "a "), ("comment", "/* open")]
+        )
+
+    def test_pathological_input(self):
+        # Each would take seconds if a rule rescanned the rest of the text
+        for language in highlight.RULES:
+            for code in ('"' * 50000, "/*" * 25000, "a" * 50000, "<a" * 25000):
+                tokens = tokenize(code, language)
+                self.assertEqual(sum(len(text) for _, text in tokens), len(code))
+
+
+class TestHighlightCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = os.path.join(self.tmp.name, "cache")
+
+    def packs(self):
+        return sorted(os.listdir(self.directory))
+
+    def test_tokens_survive_the_cache(self):
+        cache = HighlightCache(self.directory)
+        tokens = cache.tokens("x = 1", "python")
+        self.assertEqual(tokens, tokenize("x = 1", "python"))
+        self.assertIs(cache.tokens("x = 1", "python"), tokens)
+        cache.tokens("x = 1", "javascript")
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertFalse(os.path.exists(self.directory))  # nothing flushed yet
+
+        cache.flush()
+        cache.flush()  # nothing new: no second pack
+        self.assertEqual(len(self.packs()), 1)
+
+        again = HighlightCache(self.directory)
+        with mock.patch.object(highlight, "tokenize") as tokenize_:
+            self.assertEqual(
+                [tuple(token) for token in again.tokens("x = 1", "python")], tokens
+            )
+            tokenize_.assert_not_called()
+        self.assertEqual(again.drain_stats()["hit_rate"], 1.0)
+        self.assertEqual((again.hits, again.misses), (0, 0))
+
+    def test_other_tables_and_bad_packs_are_ignored(self):
+        os.makedirs(self.directory)
+        stale = os.path.join(self.directory, "stale" + highlight.PACK_SUFFIX)
+        key_cache = HighlightCache(self.directory)
+        key_cache.tokens("x", "python")
+        key = next(iter(key_cache._new))
+        with open(stale, "w") as f:
+            json.dump({"version": "older", "tokens": {key: [["keyword", "x"]]}}, f)
+        write(os.path.join(self.directory, "broken" + highlight.PACK_SUFFIX), "{")
+
+        cache = HighlightCache(self.directory)
+        self.assertEqual(cache.tokens("x", "python"), [(None, "x")])
+        self.assertEqual(cache.misses, 1)
+
+    def test_packs_are_merged(self):
+        cache = HighlightCache(self.directory)
+        for n in range(highlight.MAX_PACKS + 1):
+            cache.tokens(f"x = {n}", "python")
+            cache.flush()
+        self.assertEqual(len(self.packs()), 1)
+        merged = HighlightCache(self.directory)
+        for n in range(highlight.MAX_PACKS + 1):
+            merged.tokens(f"x = {n}", "python")
+        self.assertEqual(merged.misses, 0)
+
+    def test_packs_stay_bounded_across_builds(self):
+        def entries():
+            count = 0
+            for name in self.packs():
+                with open(os.path.join(self.directory, name)) as f:
+                    count += len(json.load(f)["tokens"])
+            return count
+
+        with mock.patch.multiple(highlight, MAX_PACKS=3, MAX_ENTRIES=4):
+            for build in range(40):
+                # Each build shares two snippets and adds two of its own
+                cache = HighlightCache(self.directory)
+                for code in (
+                    "shared = 1",
+                    "shared = 2",
+                    f"a = {build}",
+                    f"b = {build}",
+                ):
+                    cache.tokens(code, "python")
+                cache.flush()
+                self.assertLessEqual(len(self.packs()), 3)
+                self.assertLessEqual(entries(), 4 + 2 * 2)
+            self.assertEqual(cache.misses, 2)  # the shared ones survive merges
+
+            # A build of hits only still merges what piled up
+            cache = HighlightCache(self.directory)
+            cache.tokens("shared = 1", "python")
+            cache.flush()
+            self.assertEqual((len(self.packs()), cache.misses), (1, 0))
+
+
+class TestHighlightedBuild(BuildTestCase):
+    def test_cache_is_shared_between_builds(self):
+        code = "```python\nimport os\n```\n\n```sh\necho $HOME\n```\n"
+        write(os.path.join(self.content, "code.md"), code)
+        cache = os.path.join(self.tmp.name, "highlight")
+        first = build_site(self.content, self.output, 2, highlight_cache=cache)
+        self.assertEqual((first.highlight_cache["misses"], first.rebuilt), (2, 3))
+
+        # Another shard or version of the site: every snippet is a hit
+        other = os.path.join(self.tmp.name, "other")
+        second = build_site(self.content, other, 1, highlight_cache=cache)
+        self.assertEqual(second.highlight_cache["hits"], 2)
+        self.assertEqual(second.highlight_cache["misses"], 0)
+        html = read(os.path.join(other, "code.html"))
+        self.assertEqual(html, read(os.path.join(self.output, "code.html")))
+        self.assertIn('<span class="tok-keyword">import</span> os', html)
+        self.assertIn('<span class="tok-variable">$HOME</span>', html)
+
+        self.assertIsNone(build_site(self.content, other, 1).highlight_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attr, escape_text
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -25,6 +26,27 @@ class TestHTMLNode(unittest.TestCase):
             node.props_to_html(), ' href="www.haplolabs.io" target="_blank"'
         )
 
+    def test_props_are_escaped_and_cached(self):
+        props = {"href": "/search?q=a&b=<c>", "title": 'the "best"'}
+        node = HTMLNode("a", "x", None, props)
+        expected = ' href="/search?q=a&amp;b=&lt;c&gt;" title="the &quot;best&quot;"'
+        self.assertEqual(node.props_to_html(), expected)
+        self.assertIs(
+            HTMLNode("a", "y", None, dict(props)).props_to_html(),
+            node.props_to_html(),
+        )
+
+    def test_props_with_unhashable_value(self):
+        node = HTMLNode("p", None, None, {"data-x": ["a", "b"]})
+        self.assertEqual(node.props_to_html(), " data-x=\"['a', 'b']\"")
+
+    def test_escape_fast_path(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attr(text), text)
+        self.assertEqual(escape_text('a<b & "c"'), 'a&lt;b &amp; "c"')
+        self.assertEqual(escape_attr('a<b & "c"'), "a&lt;b &amp; &quot;c&quot;")
+
     def test_to_html(self):
         node = HTMLNode(
             "p",
@@ -34,6 +56,10 @@ class TestHTMLNode(unittest.TestCase):
         )
         self.assertRaises(NotImplementedError, node.to_html)
 
+    def test_render_to(self):
+        node = HTMLNode("p", "This is a what is in the paragraph")
+        self.assertRaises(NotImplementedError, node.render_to, io.StringIO())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import render
+from build import build_site
+from inline_cache import InlineCache
+from nodes import text_to_textnodes
+from test_build import BuildTestCase
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_hit_returns_same_tuple(self):
+        cache = InlineCache(4)
+        first = cache.parse("[Read more](/a.html)")
+        second = cache.parse("[Read more](/a.html)")
+        self.assertIs(first, second)
+        self.assertIsInstance(first, tuple)
+        self.assertListEqual(list(first), text_to_textnodes("[Read more](/a.html)"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = InlineCache(2)
+        cache.parse("a")
+        cache.parse("b")
+        cache.parse("a")  # "b" is now the oldest
+        cache.parse("c")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(len(cache), 2)
+        cache.parse("a")
+        self.assertEqual(cache.hits, 2)
+        cache.parse("b")
+        self.assertEqual(cache.misses, 4)
+
+    def test_errors_are_not_cached(self):
+        cache = InlineCache(2)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.parse("**unclosed")
+        self.assertEqual(len(cache), 0)
+
+    def test_drain_stats_keeps_entries(self):
+        cache = InlineCache(2)
+        cache.parse("a")
+        cache.parse("a")
+        self.assertEqual(cache.drain_stats()["hit_rate"], 0.5)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 0, 1))
+
+    def test_rejects_empty_cache(self):
+        self.assertRaises(ValueError, InlineCache, 0)
+
+
+class TestCachedBuild(BuildTestCase):
+    def test_build_reports_cache_stats(self):
+        report = build_site(self.content, self.output, 1, inline_cache_size=8)
+        self.assertBuilt()
+        self.assertEqual(report.inline_cache["misses"], 3)
+        self.assertIsNone(render.inline_cache)
+
+    def test_size_is_not_summed_over_batches(self):
+        report = build_site(
+            self.content, self.output, 1, chunk_size=1, inline_cache_size=8
+        )
+        # Two batches drain the same cache; it holds every parsed line once
+        self.assertEqual(report.inline_cache["size"], report.inline_cache["misses"])
+
+    def test_off_by_default(self):
+        self.assertIsNone(build_site(self.content, self.output, 1).inline_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,31 @@ class TestLeafeNode(unittest.TestCase):
         node = LeafNode("a", "Click me!", {"href": "http://haplolabs.io"})
         self.assertEqual(node.to_html(), '<a href="http://haplolabs.io">Click me!</a>')
 
+    def test_leaf_to_html_escapes_value(self):
+        node = LeafNode("code", 'if a < b && c > "d":')
+        self.assertEqual(
+            node.to_html(), '<code>if a &lt; b &amp;&amp; c &gt; "d":</code>'
+        )
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+
+    def test_leaf_to_html_props_on_any_tag(self):
+        node = LeafNode("span", "hi", {"class": "note"})
+        self.assertEqual(node.to_html(), '<span class="note">hi</span>')
+
+    def test_leaf_to_html_img(self):
+        node = LeafNode("img", "", {"src": "/a.png", "alt": 'say "cheese"'})
+        self.assertEqual(
+            node.to_html(), '<img src="/a.png" alt="say &quot;cheese&quot;">'
+        )
+
+    def test_leaf_shares_empty_defaults(self):
+        node = LeafNode("p", "Hello, world!")
+        node2 = LeafNode("b", "Hello, world!")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIs(node.children, node2.children)
+        self.assertIs(node.props, node2.props)
+        self.assertEqual(node.props_to_html(), "")
+
 
 if __name__ == "__main__":
     unittest.main()
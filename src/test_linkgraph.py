@@ -0,0 +1,122 @@
+import os
+import unittest
+
+from build import build_site
+from linkgraph import LINKGRAPH_NAME, BrokenLink, LinkGraph, resolve
+from test_build import BuildTestCase, write
+
+
+class TestResolve(unittest.TestCase):
+    def test_relative_and_absolute(self):
+        self.assertEqual(
+            resolve("blog/post.html", "other.html"), ("blog/other.html", "")
+        )
+        self.assertEqual(resolve("blog/post.html", "../index.html"), ("index.html", ""))
+        self.assertEqual(
+            resolve("blog/post.html", "/about.html#team"), ("about.html", "team")
+        )
+
+    def test_directories_and_fragments(self):
+        self.assertEqual(resolve("blog/post.html", "/docs/"), ("docs/index.html", ""))
+        self.assertEqual(resolve("blog/post.html", "#top"), ("blog/post.html", "top"))
+        self.assertEqual(resolve("a.html", "my%20page.html"), ("my page.html", ""))
+
+    def test_external(self):
+        for url in (
+            "https://boot.dev",
+            "mailto:me@example.com",
+            "//cdn.example.com/x.js",
+        ):
+            self.assertEqual(resolve("a.html", url), (None, None))
+
+
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = LinkGraph()
+        self.graph.set_page("index.html", ["blog/post.html", "https://boot.dev"], [])
+        self.graph.set_page(
+            "blog/post.html", ["/index.html#top", "missing.html"], ["/img/a.png"]
+        )
+
+    def test_inbound(self):
+        self.assertEqual(
+            self.graph.inbound(),
+            {
+                "blog/post.html": ["index.html"],
+                "index.html": ["blog/post.html"],
+                "blog/missing.html": ["blog/post.html"],
+                "img/a.png": ["blog/post.html"],
+            },
+        )
+
+    def test_anchors(self):
+        self.graph.set_page("about.html", [], [], ["team", "contact"])
+        self.assertEqual(self.graph.anchors("about.html"), ["team", "contact"])
+        self.assertEqual(self.graph.anchors("blog/post.html"), [])
+
+    def test_check_fragments(self):
+        self.graph.set_page("about.html", ["#team", "#nobody"], [], ["team"])
+        self.graph.set_page(
+            "index.html", ["/about.html#team", "/about.html#missing"], []
+        )
+        self.assertEqual(
+            [link for link in self.graph.check() if link.kind == "anchor"],
+            [
+                BrokenLink("about.html", "#nobody", "anchor"),
+                BrokenLink("index.html", "/about.html#missing", "anchor"),
+            ],
+        )
+
+    def test_check(self):
+        self.assertEqual(
+            self.graph.check(),
+            [
+                BrokenLink("blog/post.html", "missing.html", "link"),
+                BrokenLink("blog/post.html", "/img/a.png", "image"),
+            ],
+        )
+        self.assertEqual(len(self.graph.check([os.path.join("img", "a.png")])), 1)
+
+
+class TestBuildLinkGraph(BuildTestCase):
+    def test_graph_is_built_and_checked(self):
+        write(os.path.join(self.content, "about.md"), "[nowhere](/gone.html)\n")
+        report = build_site(self.content, self.output, 2, check_links=True)
+        self.assertEqual(
+            report.broken_links, [BrokenLink("about.html", "/gone.html", "link")]
+        )
+
+        graph = LinkGraph.load(os.path.join(self.output, LINKGRAPH_NAME))
+        self.assertEqual(graph.outbound("blog/post.html")["links"], ["/index.html"])
+
+    def test_heading_anchors_are_checked(self):
+        write(
+            os.path.join(self.content, "about.md"),
+            "# About us\n\n[home](/index.html#home) [lost](/index.html#missing)\n",
+        )
+        report = build_site(self.content, self.output, 2, check_links=True)
+        self.assertEqual(
+            report.broken_links,
+            [BrokenLink("about.html", "/index.html#missing", "anchor")],
+        )
+        graph = LinkGraph.load(os.path.join(self.output, LINKGRAPH_NAME))
+        self.assertEqual(graph.anchors("about.html"), ["about-us"])
+
+    def test_graph_updates_incrementally(self):
+        build_site(self.content, self.output, 1)
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        write(os.path.join(self.content, "index.md"), "[gone](/blog/post.html)\n")
+        report = build_site(self.content, self.output, 1, check_links=True)
+        self.assertEqual(report.rebuilt, 1)
+        self.assertEqual(
+            report.broken_links, [BrokenLink("index.html", "/blog/post.html", "link")]
+        )
+
+    def test_missing_graph_rebuilds_pages(self):
+        build_site(self.content, self.output, 1)
+        os.remove(os.path.join(self.output, LINKGRAPH_NAME))
+        self.assertEqual(build_site(self.content, self.output, 1).rebuilt, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 from nodes import (
+    scan_inline,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
@@ -9,6 +10,20 @@ from nodes import (
 from textnode import TextNode, TextType
 
 
+def normalize(nodes):
+    """Merge adjacent NORMAL nodes and drop empty ones, as scan_inline does."""
+    out = []
+    for node in nodes:
+        if node.text_type is TextType.NORMAL:
+            if not node.text:
+                continue
+            if out and out[-1].text_type is TextType.NORMAL:
+                out[-1] = TextNode(out[-1].text + node.text, TextType.NORMAL)
+                continue
+        out.append(node)
+    return out
+
+
 class TestLeafNode(unittest.TestCase):
     def test_split_delimiter_bold(self):
         node = [TextNode("This text has **bold text** in it", TextType.NORMAL)]
@@ -98,6 +113,32 @@ class TestLeafNode(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_images_leaves_links_and_styled_nodes(self):
+        nodes = [
+            TextNode("a [link](https://boot.dev) then ![img](a.png)", TextType.NORMAL),
+            TextNode("![img](a.png)", TextType.CODE),
+        ]
+        self.assertListEqual(
+            [
+                TextNode("a [link](https://boot.dev) then ", TextType.NORMAL),
+                TextNode("img", TextType.IMAGE, "a.png"),
+                TextNode("![img](a.png)", TextType.CODE),
+            ],
+            split_nodes_image(nodes),
+        )
+
+    def test_split_images_inside_a_bracket(self):
+        node = TextNode(
+            "Press [ to open the ![menu icon](menu.png) panel", TextType.NORMAL
+        )
+        expected = [
+            TextNode("Press [ to open the ", TextType.NORMAL),
+            TextNode("menu icon", TextType.IMAGE, "menu.png"),
+            TextNode(" panel", TextType.NORMAL),
+        ]
+        self.assertListEqual(expected, split_nodes_image([node]))
+        self.assertListEqual(expected, split_nodes_link(split_nodes_image([node])))
+
     def test_text_to_textnodes(self):
         node = TextNode(
             "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
@@ -149,5 +190,61 @@ class TestLeafNode(unittest.TestCase):
         )
 
 
+class TestScanInline(unittest.TestCase):
+    CASES = [
+        "plain text only",
+        "**bold** at the start",
+        "ends in **bold**",
+        "**a****b**",
+        "This is **text** with an _italic_ word and a `code block`",
+        "an ![image](https://i.imgur.com/a.png) then a [link](https://boot.dev)",
+        "![one](a.png)![two](b.png)",
+        "[one](a)[two](b) and trailing",
+        "unclosed [bracket and (paren)",
+        "a ![not an image] and [not a link]",
+        "Press [ to open the ![menu icon](menu.png) panel",
+        "multi\nline **bold**\ntext",
+    ]
+
+    def test_matches_legacy_pipeline(self):
+        for text in self.CASES:
+            with self.subTest(text=text):
+                self.assertListEqual(
+                    normalize(text_to_textnodes(text, legacy=True)),
+                    scan_inline(text),
+                )
+
+    def test_merges_and_drops_empty_normal_nodes(self):
+        self.assertListEqual(
+            [
+                TextNode("a", TextType.IMAGE, "u"),
+                TextNode("b", TextType.IMAGE, "v"),
+            ],
+            scan_inline("![a](u)![b](v)"),
+        )
+
+    def test_unclosed_delimiter(self):
+        with self.assertRaises(ValueError) as raises_cm:
+            scan_inline("This text has **bold text in it")
+        self.assertEqual(
+            str(raises_cm.exception),
+            "Invalid markdown syntax: no closing '**' in 'This text has **bold text in it'",
+        )
+
+    def test_empty_text(self):
+        self.assertListEqual([], scan_inline(""))
+
+    def test_pathological_input(self):
+        # Each would take seconds if any step were quadratic
+        n = 100000
+        self.assertListEqual([TextNode("[" * n, TextType.NORMAL)], scan_inline("[" * n))
+        self.assertEqual(
+            scan_inline("[" * n + "](u)"), [TextNode("[" * (n - 1), TextType.LINK, "u")]
+        )
+        self.assertEqual(len(scan_inline("[a](b)" * n)), n)
+        self.assertEqual(len(scan_inline("_" * n)), n // 2)
+        self.assertRaises(ValueError, scan_inline, "**" * n + "_")
+
+
 if __name__ == "__main__":
     unittest.main()
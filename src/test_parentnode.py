@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from leafnode import LeafNode
@@ -48,6 +49,29 @@ class TestParentNode(unittest.TestCase):
         parent_node = ParentNode("div", [])
         self.assertRaises(ValueError, parent_node.to_html)
 
+    def test_render_to_string_sink(self):
+        parent_node = ParentNode(
+            "div", [ParentNode("span", [LeafNode("b", "grandchild")])]
+        )
+        sink = io.StringIO()
+        parent_node.render_to(sink)
+        self.assertEqual(sink.getvalue(), "<div><span><b>grandchild</b></span></div>")
+
+    def test_render_to_bytes_sink(self):
+        parent_node = ParentNode("p", [LeafNode(None, "caf\u00e9")])
+        sink = io.BytesIO()
+        parent_node.render_to(sink)
+        self.assertEqual(sink.getvalue(), "<p>caf\u00e9</p>".encode("utf-8"))
+
+    def test_to_html_deeply_nested(self):
+        depth = 50_000
+        node = LeafNode("b", "leaf")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div>" * depth + "<b>leaf</b>"))
+        self.assertTrue(html.endswith("</div>" * depth))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+import unittest
+
+from build import build_site
+from pipeline import pipelined
+from test_build import BuildTestCase, read
+
+
+class TestPipelined(unittest.TestCase):
+    def test_results_in_order(self):
+        results = pipelined(
+            range(20),
+            lambda n: n * 10,
+            lambda n, data: (n, data + 1),
+            lambda item: item,
+            depth=2,
+        )
+        self.assertListEqual(results, [(n, n * 10 + 1) for n in range(20)])
+
+    def test_stages_run_on_their_own_threads(self):
+        seen = {}
+        pipelined(
+            [1],
+            lambda n: seen.setdefault("read", threading.get_ident()),
+            lambda n, data: seen.setdefault("process", threading.get_ident()),
+            lambda item: seen.setdefault("write", threading.get_ident()),
+        )
+        self.assertEqual(seen["process"], threading.get_ident())
+        self.assertEqual(len(set(seen.values())), 3)
+
+    def test_backpressure_bounds_read_ahead(self):
+        read = []
+        ahead = []
+
+        def process(n, data):
+            ahead.append(len(read) - n)
+            time.sleep(0.001)
+            return n
+
+        pipelined(range(50), read.append, process, lambda n: n, depth=3)
+        # At most depth queued, one being handed over and one being read
+        self.assertLessEqual(max(ahead), 3 + 2)
+
+    def test_errors_propagate_from_every_stage(self):
+        def fail(*args):
+            raise KeyError("boom")
+
+        def ok(*args):
+            return args[-1]
+
+        threads = threading.active_count()
+        for stages in ((fail, ok, ok), (ok, fail, ok), (ok, ok, fail)):
+            with self.assertRaises(KeyError):
+                pipelined(range(100), *stages, depth=1)
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_rejects_empty_queues(self):
+        self.assertRaises(ValueError, pipelined, [], None, None, None, 0)
+
+
+class TestPipelinedBuild(BuildTestCase):
+    def test_same_output_as_sequential(self):
+        build_site(self.content, self.output, 1)
+        expected = read(os.path.join(self.output, "index.html"))
+        report = build_site(self.content, self.output, 2, force=True, pipeline_depth=1)
+        self.assertBuilt()
+        self.assertEqual(read(os.path.join(self.output, "index.html")), expected)
+        self.assertEqual((report.rebuilt, report.writes.skipped), (2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+
+import profiling
+from build import build_site
+from test_build import BuildTestCase
+
+
+class TestProfiler(unittest.TestCase):
+    def test_stage_counters(self):
+        profiler = profiling.Profiler()
+        for _ in range(2):
+            with profiler.stage("inline", bytes_in=10) as stage:
+                stage.nodes = 3
+        stats = profiler.stages["inline"]
+        self.assertEqual((stats.calls, stats.nodes, stats.bytes_in), (2, 6, 20))
+        self.assertGreater(stats.seconds, 0)
+        self.assertListEqual(profiler.events, [])
+
+    def test_drain_and_merge(self):
+        worker = profiling.Profiler()
+        with worker.page("a.md"):
+            with worker.stage("render") as stage:
+                stage.bytes_out = 5
+        data = worker.drain()
+        self.assertEqual(worker.stages, {})
+
+        parent = profiling.Profiler()
+        parent.merge(data)
+        parent.merge(data)
+        self.assertEqual(parent.stages["render"].bytes_out, 10)
+        self.assertEqual([page for page, _ in parent.pages], ["a.md", "a.md"])
+
+    def test_report(self):
+        profiler = profiling.Profiler()
+        with profiler.page("slow.md"):
+            with profiler.stage("blocks"):
+                pass
+        report = profiler.report()
+        self.assertIn("blocks", report)
+        self.assertIn("slow.md", report)
+
+    def test_chrome_trace(self):
+        profiler = profiling.Profiler(trace=True)
+        with profiler.page("a.md"):
+            with profiler.stage("read"):
+                pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual([e["name"] for e in events], ["read", "a.md"])
+        self.assertEqual({e["ph"] for e in events}, {"X"})
+
+
+class TestProfiledBuild(BuildTestCase):
+    def assertProfiled(self, report):
+        self.assertBuilt()
+        self.assertEqual(len(report.profile.pages), 2)
+        self.assertEqual(
+            set(report.profile.stages),
+            {"read", "blocks", "inline", "render", "write"},
+        )
+        self.assertEqual(report.profile.stages["render"].bytes_out, report.bytes_out)
+        self.assertIsNone(profiling.active)
+
+    def test_in_process(self):
+        self.assertProfiled(build_site(self.content, self.output, 1, profile=True))
+
+    def test_process_pool(self):
+        report = build_site(self.content, self.output, 2, chunk_size=1, trace=True)
+        self.assertProfiled(report)
+        self.assertTrue(report.profile.events)
+
+    def test_pipelined(self):
+        self.assertProfiled(
+            build_site(self.content, self.output, 1, profile=True, pipeline_depth=1)
+        )
+
+    def test_off_by_default(self):
+        self.assertIsNone(build_site(self.content, self.output, 1).profile)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+import render
+from blocks import BlockType
+from render import (
+    Heading,
+    PageContext,
+    block_to_html_node,
+    markdown_to_html_node,
+    outline_to_html_node,
+    slugify,
+)
+
+
+class TestRender(unittest.TestCase):
+    def test_heading(self):
+        node = block_to_html_node(BlockType.HEADING, "### A **bold** title")
+        self.assertEqual(
+            node.to_html(), '<h3 id="a-bold-title">A <b>bold</b> title</h3>'
+        )
+
+    def test_code_block(self):
+        node = block_to_html_node(BlockType.CODE, "```\nx = 1\n\ny = 2\n```")
+        self.assertEqual(node.to_html(), "<pre><code>x = 1\n\ny = 2</code></pre>")
+
+    def test_highlighted_code_block(self):
+        node = block_to_html_node(BlockType.CODE, "```py\nx = 1\n\ny = 2\n```")
+        self.assertEqual(
+            node.to_html(),
+            '<pre><code class="language-python">x = <span class="tok-number">1</span>'
+            '\n\ny = <span class="tok-number">2</span></code></pre>',
+        )
+        node = block_to_html_node(BlockType.CODE, "```cobol\nMOVE 1 TO X\n```")
+        self.assertEqual(node.to_html(), "<pre><code>MOVE 1 TO X</code></pre>")
+
+    def test_one_line_code_block(self):
+        node = block_to_html_node(BlockType.CODE, '```print("hi")```')
+        self.assertEqual(node.to_html(), '<pre><code>print("hi")</code></pre>')
+
+    def test_quote(self):
+        node = block_to_html_node(BlockType.QUOTE, "> first\n>second")
+        self.assertEqual(node.to_html(), "<blockquote>first second</blockquote>")
+
+    def test_lists(self):
+        ul = block_to_html_node(BlockType.UNORDERED_LIST, "- one\n* _two_")
+        ol = block_to_html_node(BlockType.ORDERED_LIST, "1. one\n10. two")
+        self.assertEqual(ul.to_html(), "<ul><li>one</li><li><i>two</i></li></ul>")
+        self.assertEqual(ol.to_html(), "<ol><li>one</li><li>two</li></ol>")
+
+    def test_markdown_to_html_node(self):
+        md = """
+# Title
+
+This is **bolded** paragraph
+text in a p
+tag here
+
+- item
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            '<div><h1 id="title">Title</h1>'
+            "<p>This is <b>bolded</b> paragraph text in a p tag here</p>"
+            "<ul><li>item</li></ul></div>",
+        )
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html_node("").to_html(), "<div></div>")
+
+    def test_inline_limit(self):
+        self.addCleanup(render.set_inline_limit, render.MAX_INLINE_CHARS)
+        render.set_inline_limit(10)
+        self.assertEqual(
+            markdown_to_html_node("ten chars.").to_html(),
+            "<div><p>ten chars.</p></div>",
+        )
+        with self.assertRaisesRegex(ValueError, "11 characters exceeds the limit"):
+            markdown_to_html_node("# eleven char")
+        render.set_inline_limit(0)
+        markdown_to_html_node("x" * (render.MAX_INLINE_CHARS + 1))
+
+
+class TestOutline(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("  Hello, World!  "), "hello-world")
+        self.assertEqual(slugify("Use `x_y` -- fast"), "use-x_y----fast")
+        self.assertEqual(slugify("Café au lait"), "café-au-lait")
+        self.assertEqual(slugify("?!"), "section")
+
+    def test_outline_is_collected_with_unique_ids(self):
+        page = PageContext()
+        html = markdown_to_html_node(
+            "# Guide\n\n## Setup\n\ntext\n\n### _Fast_ path\n\n## Setup\n", page
+        ).to_html()
+        self.assertListEqual(
+            page.outline,
+            [
+                Heading(1, "Guide", "guide"),
+                Heading(2, "Setup", "setup"),
+                Heading(3, "Fast path", "fast-path"),
+                Heading(2, "Setup", "setup-1"),
+            ],
+        )
+        self.assertIn('<h2 id="setup-1">Setup</h2>', html)
+        self.assertEqual(page.title, "Guide")
+
+    def test_outline_to_html_node(self):
+        outline = [
+            Heading(2, "A", "a"),
+            Heading(4, "B", "b"),
+            Heading(3, "C", "c"),
+            Heading(2, "D & E", "d-e"),
+            Heading(1, "F", "f"),
+        ]
+        self.assertEqual(
+            outline_to_html_node(outline).to_html(),
+            '<ul><li><a href="#a">A</a><ul><li><a href="#b">B</a></li>'
+            '<li><a href="#c">C</a></li></ul></li>'
+            '<li><a href="#d-e">D &amp; E</a></li>'
+            '<li><a href="#f">F</a></li></ul>',
+        )
+        self.assertEqual(outline_to_html_node([]).to_html(), "<ul></ul>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from build import build_site
+from search import SEARCH_DIR, SearchIndex, _decode, _encode, add_terms
+from test_build import BuildTestCase, write
+
+
+class TestTerms(unittest.TestCase):
+    def test_add_terms(self):
+        terms = {}
+        position = add_terms(terms, "The cat, the hat", 0)
+        position = add_terms(terms, "Cat!", position)
+        self.assertEqual(position, 5)
+        self.assertDictEqual(terms, {"the": [0, 2], "cat": [1, 4], "hat": [3]})
+
+    def test_delta_encoding(self):
+        posting = _encode(7, [3, 10, 11])
+        self.assertListEqual(posting, [7, 3, 7, 1])
+        self.assertEqual(_decode(posting), (7, [3, 10, 11]))
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def stage(self, index, url, text):
+        terms = {}
+        add_terms(terms, text, 0)
+        index.set_page(url, url.title(), terms)
+
+    def files(self):
+        return sorted(os.listdir(os.path.join(self.dir, SEARCH_DIR)))
+
+    def test_round_trip(self):
+        index = SearchIndex.load(self.dir)
+        self.stage(index, "a.html", "red green red")
+        self.stage(index, "b.html", "green blue")
+        index.save()
+
+        index = SearchIndex.load(self.dir)
+        self.assertIn("a.html", index)
+        self.assertDictEqual(index.lookup("RED"), {"a.html": [0, 2]})
+        self.assertListEqual(index.search("green"), ["a.html", "b.html"])
+        self.assertListEqual(index.search("green blue"), ["b.html"])
+        self.assertListEqual(index.search("purple"), [])
+
+    def test_update_writes_only_the_change(self):
+        index = SearchIndex.load(self.dir)
+        for n in range(8):
+            self.stage(index, f"p{n}.html", f"common page{n}")
+        index.save()
+        first = index.segments[0]["name"]
+
+        index = SearchIndex.load(self.dir)
+        self.stage(index, "p3.html", "common rewritten")
+        index.save()
+        # The big segment stays as it is; the edit lands in a new one
+        self.assertEqual([s["name"] for s in index.segments][0], first)
+        self.assertEqual(len(index.segments[-1]["docs"]), 1)
+        self.assertListEqual(index.search("page3"), [])
+        self.assertListEqual(index.search("rewritten"), ["p3.html"])
+        self.assertEqual(len(index.search("common")), 8)
+
+    def test_removal_and_compaction(self):
+        index = SearchIndex.load(self.dir)
+        for n in range(4):
+            self.stage(index, f"p{n}.html", "word")
+        index.save()
+        for n in range(3):
+            index.remove_page(f"p{n}.html")
+        index.save()
+
+        index = SearchIndex.load(self.dir)
+        self.assertListEqual(index.search("word"), ["p3.html"])
+        self.assertListEqual(index.docs, [["p3.html", "P3.Html", ""]])
+        self.assertEqual(len(self.files()), 2)  # index.json and one chunk
+
+    def test_segments_merge(self):
+        index = SearchIndex.load(self.dir)
+        for n in range(6):
+            self.stage(index, f"p{n}.html", f"word{n}")
+            index.save()
+        # Equal-sized segments fold together as they are added
+        self.assertLessEqual(len(index.segments), 3)
+        index = SearchIndex.load(self.dir)
+        self.assertListEqual(index.search("word5"), ["p5.html"])
+        self.assertListEqual(index.search("word0"), ["p0.html"])
+
+
+class TestBuildSearchIndex(BuildTestCase):
+    def test_build_updates_index(self):
+        build_site(self.content, self.output, 2, search_index=True)
+        index = SearchIndex.load(self.output)
+        self.assertListEqual(index.search("world"), ["index.html"])
+        self.assertEqual(index.docs[index._ids["index.html"]][1], "Home")
+
+        write(os.path.join(self.content, "index.md"), "# Home\n\nGoodbye\n")
+        report = build_site(self.content, self.output, 1, search_index=True)
+        self.assertEqual(report.rebuilt, 1)
+        index = SearchIndex.load(self.output)
+        self.assertListEqual(index.search("world"), [])
+        self.assertListEqual(index.search("goodbye"), ["index.html"])
+
+    def test_enabling_index_rebuilds_unindexed_pages(self):
+        build_site(self.content, self.output, 1)
+        report = build_site(self.content, self.output, 1, search_index=True)
+        self.assertEqual(report.rebuilt, 2)
+        self.assertListEqual(
+            SearchIndex.load(self.output).search("a"), ["blog/post.html"]
+        )
+
+    def test_build_without_index_leaves_page_to_reindex(self):
+        build_site(self.content, self.output, 1, search_index=True)
+        write(os.path.join(self.content, "index.md"), "# Home\n\nGoodbye\n")
+        build_site(self.content, self.output, 1)  # index not touched
+        report = build_site(self.content, self.output, 1, search_index=True)
+        self.assertEqual((report.rebuilt, report.skipped), (1, 1))
+        index = SearchIndex.load(self.output)
+        self.assertListEqual(index.search("world"), [])
+        self.assertListEqual(index.search("goodbye"), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
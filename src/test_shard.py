@@ -0,0 +1,182 @@
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+
+from build import build_site, find_pages
+from linkgraph import LINKGRAPH_NAME, LinkGraph
+from manifest import MANIFEST_NAME
+from merge import merge_shards
+from search import SEARCH_DIR, SearchIndex
+from shard import SHARD_NAME, parse_shard, shard_of
+from test_build import BuildTestCase, read, write
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def tree(directory):
+    # Relative path → contents of every output file, build state excluded
+    files = {}
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [name for name in dirs if name != SEARCH_DIR]
+        for name in names:
+            if not name.startswith("."):
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, directory)] = read(path)
+    return files
+
+
+class TestShard(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "1", "a/b", "1/2/3"):
+            self.assertRaises(ValueError, parse_shard, spec)
+
+    def test_shard_of_is_stable_and_spread(self):
+        self.assertEqual(shard_of(os.path.join("blog", "post.md"), 4), 1)
+        counts = [0] * 4
+        for n in range(1000):
+            counts[shard_of(f"page{n}.md", 4) - 1] += 1
+        self.assertTrue(all(200 < count < 300 for count in counts), counts)
+
+
+class TestShardedBuild(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        for n in range(12):
+            write(
+                os.path.join(self.content, "docs", f"page{n}.md"),
+                f"# Page {n}\n\nSee [home](/index.html) and [next](page{n + 1}.html)\n",
+            )
+        self.shards = [os.path.join(self.tmp.name, f"shard{i}") for i in (1, 2, 3)]
+
+    def build_shards(self):
+        # One process per shard, standing in for one CI machine each
+        processes = [
+            subprocess.Popen(
+                [sys.executable, MAIN, "build", self.content, output]
+                + ["--shard", f"{i}/3", "--search-index", "-j", "1"],
+                stdout=subprocess.DEVNULL,
+            )
+            for i, output in enumerate(self.shards, 1)
+        ]
+        self.assertListEqual([process.wait() for process in processes], [0] * 3)
+
+    def test_merge_matches_single_build(self):
+        self.build_shards()
+        per_shard = [
+            len(LinkGraph.load(os.path.join(s, LINKGRAPH_NAME)).pages)
+            for s in self.shards
+        ]
+        self.assertEqual(sum(per_shard), len(find_pages(self.content)))
+        self.assertNotIn(0, per_shard)
+
+        merged = os.path.join(self.tmp.name, "merged")
+        report = merge_shards(self.shards, merged, check_links=True)
+        self.assertEqual(report.pages, 14)
+        self.assertEqual([link.url for link in report.broken_links], ["page12.html"])
+
+        build_site(self.content, self.output, 2, search_index=True)
+        self.assertDictEqual(tree(merged), tree(self.output))
+        for name in (MANIFEST_NAME, LINKGRAPH_NAME):
+            self.assertEqual(
+                read(os.path.join(merged, name)), read(os.path.join(self.output, name))
+            )
+        self.assertFalse(os.path.exists(os.path.join(merged, SHARD_NAME)))
+        self.assertListEqual(
+            SearchIndex.load(merged).search("page 3"),
+            SearchIndex.load(self.output).search("page 3"),
+        )
+
+        # The merged output is an ordinary build: nothing left to render
+        report = build_site(self.content, merged, 1, search_index=True)
+        self.assertEqual((report.rebuilt, report.skipped), (0, 14))
+
+    def test_remerge_prunes_and_skips(self):
+        self.build_shards()
+        merged = os.path.join(self.tmp.name, "merged")
+        merge_shards(self.shards, merged)
+        os.remove(os.path.join(self.content, "docs", "page0.md"))
+        self.build_shards()
+
+        report = merge_shards(self.shards, merged, fsync=False)
+        self.assertEqual((report.pruned, report.writes.written), (1, 0))
+        self.assertFalse(os.path.exists(os.path.join(merged, "docs", "page0.html")))
+        self.assertListEqual(SearchIndex.load(merged).search("page 0"), [])
+
+    def test_merge_drops_outdated_index_entries(self):
+        for i, output in enumerate(self.shards, 1):
+            build_site(self.content, output, 1, search_index=True, shard=(i, 3))
+        merged = os.path.join(self.tmp.name, "merged")
+        merge_shards(self.shards, merged)
+        self.assertListEqual(SearchIndex.load(merged).search("hello"), ["index.html"])
+
+        # The shards are rebuilt without an index after an edit
+        write(os.path.join(self.content, "index.md"), "# Home\n\nGoodbye\n")
+        for i, output in enumerate(self.shards, 1):
+            shutil.rmtree(os.path.join(output, SEARCH_DIR))
+            build_site(self.content, output, 1, shard=(i, 3))
+        report = merge_shards(self.shards, merged)
+        self.assertEqual(report.unindexed, 1)
+        self.assertListEqual(SearchIndex.load(merged).search("hello"), [])
+        report = build_site(self.content, merged, 1, search_index=True)
+        self.assertEqual(report.rebuilt, 1)
+        self.assertListEqual(SearchIndex.load(merged).search("goodbye"), ["index.html"])
+
+    def test_merge_places_assets(self):
+        static = os.path.join(self.tmp.name, "static")
+        write(os.path.join(static, "css", "site.css"), "body { margin: 0 }\n")
+        for i, output in enumerate(self.shards, 1):
+            build_site(self.content, output, 1, static_dir=static, shard=(i, 3))
+        merged = os.path.join(self.tmp.name, "merged")
+        report = merge_shards(self.shards, merged, fsync=False)
+        self.assertEqual(report.assets.files, 1)
+        self.assertNotIn("chunked", report.assets.methods)
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(merged, "css", "site.css"),
+                os.path.join(self.shards[0], "css", "site.css"),
+            )
+        )
+        self.assertEqual(report.writes.written, 14)
+
+        # Re-merging leaves everything in place
+        report = merge_shards(self.shards, merged, fsync=False)
+        self.assertEqual((report.assets.skipped, report.writes.written), (1, 0))
+
+        copied = os.path.join(self.tmp.name, "copied")
+        report = merge_shards(self.shards, copied, fsync=False, asset_mode="copy")
+        self.assertNotIn("link", report.assets.methods)
+        self.assertEqual(
+            read(os.path.join(copied, "css", "site.css")), "body { margin: 0 }\n"
+        )
+        self.assertFalse(
+            os.path.samefile(
+                os.path.join(copied, "css", "site.css"),
+                os.path.join(static, "css", "site.css"),
+            )
+        )
+
+    def test_merge_needs_every_shard_once(self):
+        for i, output in enumerate(self.shards, 1):
+            build_site(self.content, output, 1, shard=(i, 3))
+        merged = os.path.join(self.tmp.name, "merged")
+        for shards in (self.shards[:2], self.shards + self.shards[:1], [self.output]):
+            self.assertRaises(ValueError, merge_shards, shards, merged)
+        self.assertFalse(os.path.exists(merged))
+
+    def test_links_are_checked_after_merging(self):
+        self.assertRaises(
+            ValueError,
+            build_site,
+            self.content,
+            self.output,
+            1,
+            check_links=True,
+            shard=(1, 2),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
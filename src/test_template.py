@@ -0,0 +1,102 @@
+import io
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import Template, load_template
+from test_build import BuildTestCase, read, write
+
+LAYOUT = "<html><title>{{ title }}</title><body>{{content}}</body></html>\n"
+
+
+class TestTemplate(unittest.TestCase):
+    def test_parses_chunks_and_slots(self):
+        template = Template(LAYOUT)
+        self.assertEqual(template.slots, ("title", "content"))
+        self.assertEqual(
+            template.parts,
+            ["<html><title>", "title", "</title><body>", "content", "</body></html>\n"],
+        )
+
+    def test_render(self):
+        content = ParentNode("p", [LeafNode("b", "hi")])
+        self.assertEqual(
+            Template(LAYOUT).render({"title": "Home", "content": content}),
+            "<html><title>Home</title><body><p><b>hi</b></p></body></html>\n",
+        )
+
+    def test_render_to_streams_nodes(self):
+        sink = io.StringIO()
+        content = ParentNode("p", [LeafNode(None, "hi")])
+        Template(LAYOUT).render_to(sink, {"title": "Home", "content": content})
+        self.assertEqual(
+            sink.getvalue(), "<html><title>Home</title><body><p>hi</p></body></html>\n"
+        )
+
+    def test_repeated_slot_and_no_slots(self):
+        self.assertEqual(Template("{{ a }}-{{ a }}").render({"a": "x"}), "x-x")
+        self.assertEqual(Template("static").render({}), "static")
+
+    def test_missing_value(self):
+        with self.assertRaises(ValueError) as raises_cm:
+            Template("{{ title }}").render({})
+        self.assertEqual(str(raises_cm.exception), "Template slot 'title' has no value")
+
+    def test_load_template_is_cached_by_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "layout.html")
+            write(path, "<p>{{ content }}</p>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            write(path, "<div>{{ content }}</div>")
+            os.utime(path, ns=(0, 0))
+            self.assertIsNot(load_template(path), first)
+            self.assertEqual(load_template(path).parts[0], "<div>")
+
+
+class TestTemplatedBuild(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.layout = os.path.join(self.tmp.name, "layout.html")
+        write(self.layout, LAYOUT)
+
+    def test_wraps_pages(self):
+        build_site(self.content, self.output, 1, template=self.layout)
+        self.assertEqual(
+            read(os.path.join(self.output, "index.html")),
+            "<html><title>Home</title><body>"
+            '<div><h1 id="home">Home</h1><p>Hello <b>world</b></p></div></body></html>\n',
+        )
+        # No h1: the file name stands in for the title
+        self.assertTrue(
+            read(os.path.join(self.output, "blog", "post.html")).startswith(
+                "<html><title>post</title>"
+            )
+        )
+
+    def test_toc_slot(self):
+        write(self.layout, "<nav>{{ toc }}</nav>{{ content }}")
+        write(os.path.join(self.content, "index.md"), "# Home\n\n## Usage\n")
+        build_site(self.content, self.output, 1, template=self.layout)
+        self.assertTrue(
+            read(os.path.join(self.output, "index.html")).startswith(
+                '<nav><ul><li><a href="#home">Home</a><ul>'
+                '<li><a href="#usage">Usage</a></li></ul></li></ul></nav>'
+            )
+        )
+
+    def test_layout_change_rebuilds_everything(self):
+        build_site(self.content, self.output, 1, template=self.layout)
+        self.assertEqual(
+            build_site(self.content, self.output, 1, template=self.layout).rebuilt, 0
+        )
+        write(self.layout, "<main>{{ content }}</main>")
+        report = build_site(self.content, self.output, 1, template=self.layout)
+        self.assertEqual(report.rebuilt, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 
+from nodes import scan_inline
+from parentnode import ParentNode
 from textnode import TextNode, TextType
 
 
@@ -14,6 +16,13 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a different text node", TextType.BOLD)
         self.assertNotEqual(node, node2)
 
+    def test_hash_matches_eq(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        node2 = TextNode("This is a text node", TextType.BOLD)
+        self.assertEqual(hash(node), hash(node2))
+        self.assertEqual(len({node, node2}), 1)
+        self.assertNotEqual(node, "This is a text node")
+
     def test_link_type(self):
         node = TextNode("This is a link node", TextType.LINK, "www.haplolabs.io")
         self.assertEqual(node.text_type, TextType.LINK)
@@ -67,5 +76,54 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.props, {"src": "https://example.com", "alt": ""})
 
 
+class TestFusedRendering(unittest.TestCase):
+    NODES = [
+        TextNode("a < b & c", TextType.NORMAL),
+        TextNode("bold", TextType.BOLD),
+        TextNode("<i>", TextType.ITALIC),
+        TextNode("x & y", TextType.CODE),
+        TextNode("a <link>", TextType.LINK, 'https://example.com/?a=1&b="2"'),
+        TextNode('alt "text"', TextType.IMAGE, "/img/a.png"),
+        TextNode(None, TextType.IMAGE, "/img/b.png"),
+        TextNode("", TextType.NORMAL),
+    ]
+
+    def test_matches_leaf_rendering(self):
+        for node in self.NODES:
+            leaf = node.to_leaf()
+            self.assertEqual(node.to_html(), leaf.to_html())
+            self.assertEqual(
+                (node.tag, node.value, node.props), (leaf.tag, leaf.value, leaf.props)
+            )
+
+    def test_renders_inside_a_tree(self):
+        tree = ParentNode("p", self.NODES)
+        leaves = ParentNode("p", [node.to_leaf() for node in self.NODES])
+        self.assertEqual(tree.to_html(), leaves.to_html())
+
+    def test_parsed_nodes_are_escaped_once_per_paragraph(self):
+        clean = scan_inline("Plain **bold** and [a link](/a.html)")
+        self.assertTrue(all(node.escaped for node in clean))
+        dirty = scan_inline('A <tag> and [a "link"](/a.html?x=1&y=2)')
+        self.assertFalse(any(node.escaped for node in dirty))
+        self.assertEqual(
+            ParentNode("p", dirty).to_html(),
+            "<p>A &lt;tag&gt; and " '<a href="/a.html?x=1&amp;y=2">a "link"</a></p>',
+        )
+        for node in clean + dirty:
+            self.assertEqual(node.to_html(), node.to_leaf().to_html())
+
+    def test_errors_match_to_leaf(self):
+        for node in (
+            TextNode("link", TextType.LINK),
+            TextNode(None, TextType.BOLD),
+            TextNode("x", "not a type"),
+        ):
+            with self.assertRaises(ValueError):
+                node.to_html()
+            with self.assertRaises(ValueError):
+                node.to_leaf().to_html()
+
+
 if __name__ == "__main__":
     unittest.main()
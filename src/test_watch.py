@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+import unittest
+
+from build import build_site
+from search import SearchIndex
+from test_build import BuildTestCase, read, write
+from watch import Watcher, diff_scans, scan, watch
+
+
+class TestScan(unittest.TestCase):
+    def test_diff_scans(self):
+        old = {"a.md": (1, 10), "b.md": (1, 10), "c.md": (1, 10)}
+        new = {"a.md": (1, 10), "b.md": (2, 11), "d.md": (1, 10)}
+        self.assertEqual(diff_scans(old, new), (["b.md", "d.md"], ["c.md"]))
+
+
+class TestWatcher(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = os.path.join(self.content, "index.md")
+        self.watcher = Watcher(self.content, self.output, interval=0.01, debounce=0)
+
+    def test_scan_finds_pages(self):
+        self.assertListEqual(
+            sorted(scan(self.content)), [os.path.join("blog", "post.md"), "index.md"]
+        )
+
+    def test_rebuilds_changed_page(self):
+        write(self.index, "# Home\n\nEdited in the editor\n")
+        changed, deleted = self.watcher.settle(*self.watcher.poll())
+        self.assertEqual((changed, deleted), (["index.md"], []))
+        report = self.watcher.rebuild(changed, deleted)
+        self.assertListEqual(report.rebuilt, ["index.md"])
+        self.assertEqual(
+            read(os.path.join(self.output, "index.html")),
+            '<div><h1 id="home">Home</h1><p>Edited in the editor</p></div>',
+        )
+
+    def test_flush_saves_manifest(self):
+        self.watcher.rebuild(["index.md"], [])
+        self.watcher.flush()
+        report = Watcher(self.content, self.output).rebuild(["index.md"], [])
+        self.assertListEqual(report.rebuilt, [])
+
+    def test_skips_touched_but_unchanged_page(self):
+        self.watcher.rebuild(["index.md"], [])
+        report = self.watcher.rebuild(["index.md"], [])
+        self.assertListEqual(report.rebuilt, [])
+
+    def test_prunes_deleted_page(self):
+        self.watcher.rebuild(["index.md"], [])
+        os.remove(self.index)
+        report = self.watcher.rebuild(*self.watcher.settle(*self.watcher.poll()))
+        self.assertListEqual(report.pruned, ["index.md"])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+
+    def test_failed_page_does_not_stop_the_rebuild(self):
+        bad = os.path.join(self.content, "bad.md")
+        write(bad, "# Bad\n\nAn **unclosed bold\n")
+        write(self.index, "# Home\n\nStill rebuilt\n")
+        report = self.watcher.rebuild(*self.watcher.settle(*self.watcher.poll()))
+        self.assertListEqual(report.rebuilt, ["index.md"])
+        self.assertListEqual(list(report.failed), ["bad.md"])
+        self.assertIn("ValueError", report.failed["bad.md"])
+        self.assertNotIn("bad.md", self.watcher.manifest.pages)
+
+        write(bad, "# Bad\n\nA **closed** bold\n")
+        report = self.watcher.rebuild(*self.watcher.settle(*self.watcher.poll()))
+        self.assertEqual((report.rebuilt, report.failed), (["bad.md"], {}))
+
+    def test_updates_existing_search_index(self):
+        build_site(self.content, self.output, 1, search_index=True)
+        watcher = Watcher(self.content, self.output)
+        write(self.index, "# Home\n\nEdited in the editor\n")
+        watcher.rebuild(["index.md"], [])
+        watcher.flush()
+        index = SearchIndex.load(self.output)
+        self.assertListEqual(index.search("editor"), ["index.html"])
+        self.assertListEqual(index.search("world"), [])
+
+    def test_watch_loop(self):
+        stop = threading.Event()
+        logs = []
+        thread = threading.Thread(
+            target=watch,
+            args=(self.content, self.output),
+            kwargs=dict(
+                workers=1, interval=0.01, debounce=0.01, stop=stop, log=logs.append
+            ),
+        )
+        thread.start()
+        try:
+            while not logs:  # initial build done
+                time.sleep(0.01)
+            write(self.index, "# Home\n\nSaved again\n")
+            deadline = time.monotonic() + 5
+            while len(logs) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertIn("Rebuilt 1, pruned 0 page(s)", logs[1])
+        self.assertIn("after the save", logs[1])
+        self.assertEqual(
+            read(os.path.join(self.output, "index.html")),
+            '<div><h1 id="home">Home</h1><p>Saved again</p></div>',
+        )
+
+    def test_watch_loop_survives_a_failed_page(self):
+        stop = threading.Event()
+        logs = []
+        watcher = Watcher(self.content, self.output, interval=0.01, debounce=0.01)
+        thread = threading.Thread(target=watcher.run, args=(stop, logs.append))
+        thread.start()
+
+        def wait_for(count):
+            deadline = time.monotonic() + 5
+            while len(logs) < count and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        try:
+            write(self.index, "# Home\n\nAn `unclosed span\n")
+            wait_for(1)
+            write(self.index, "# Home\n\nFixed\n")
+            wait_for(2)
+        finally:
+            stop.set()
+            thread.join()
+        self.assertIn("Failed to render index.md", logs[0])
+        self.assertIn("Rebuilt 1", logs[1])
+        self.assertIn("Fixed", read(os.path.join(self.output, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
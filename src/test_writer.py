@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from build import build_site
+from test_build import BuildTestCase, read
+from writer import OutputWriter
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "a", "b", "page.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_writes_on_commit(self):
+        writer = OutputWriter()
+        self.assertTrue(writer.write(self.path, b"<p>hi</p>"))
+        self.assertFalse(os.path.exists(self.path))
+        writer.commit()
+        self.assertEqual(read(self.path), "<p>hi</p>")
+        self.assertListEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+        self.assertEqual((writer.report.written, writer.report.bytes_written), (1, 9))
+
+    def test_skips_identical_bytes(self):
+        with OutputWriter() as writer:
+            writer.write(self.path, b"<p>hi</p>")
+        os.utime(self.path, ns=(0, 0))
+        with OutputWriter(fsync=False) as writer:
+            self.assertFalse(writer.write(self.path, b"<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual((writer.report.skipped, writer.report.bytes_skipped), (1, 9))
+
+    def test_same_size_different_bytes_are_written(self):
+        with OutputWriter() as writer:
+            writer.write(self.path, b"<p>hi</p>")
+        with OutputWriter() as writer:
+            self.assertTrue(writer.write(self.path, b"<p>ho</p>"))
+        self.assertEqual(read(self.path), "<p>ho</p>")
+
+    def test_error_keeps_old_files(self):
+        with OutputWriter() as writer:
+            writer.write(self.path, b"old")
+        with self.assertRaises(RuntimeError):
+            with OutputWriter() as writer:
+                writer.write(self.path, b"new")
+                raise RuntimeError
+        self.assertEqual(read(self.path), "old")
+        self.assertListEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def stream(self, writer, *pieces):
+        staged = writer.open(self.path)
+        for piece in pieces:
+            staged.write(piece)
+        return writer.finish(staged)
+
+    def test_streamed_output_is_hashed_and_compared(self):
+        with OutputWriter() as writer:
+            self.assertTrue(self.stream(writer, "<p>", "hi</p>"))
+        self.assertEqual(read(self.path), "<p>hi</p>")
+        os.utime(self.path, ns=(0, 0))
+        with OutputWriter(fsync=False) as writer:
+            self.assertFalse(self.stream(writer, "<p>hi", "</p>"))
+            self.assertTrue(self.stream(writer, "<p>ho</p>"))
+            self.assertEqual((writer.report.written, writer.report.skipped), (1, 1))
+        self.assertEqual(read(self.path), "<p>ho</p>")
+        self.assertListEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_error_mid_stream_removes_temp_file(self):
+        with self.assertRaises(RuntimeError):
+            with OutputWriter() as writer:
+                writer.open(self.path).write("<p>half")
+                raise RuntimeError
+        self.assertListEqual(os.listdir(os.path.dirname(self.path)), [])
+
+
+class TestBuildWrites(BuildTestCase):
+    def test_forced_rebuild_rewrites_nothing(self):
+        first = build_site(self.content, self.output, 1)
+        self.assertEqual(first.writes.written, 2)
+        index = os.path.join(self.output, "index.html")
+        os.utime(index, ns=(0, 0))
+
+        report = build_site(self.content, self.output, 1, force=True, fsync=False)
+        self.assertEqual(report.rebuilt, 2)
+        self.assertEqual(report.writes.written, 0)
+        self.assertEqual(report.writes.bytes_skipped, report.bytes_out)
+        self.assertEqual(os.stat(index).st_mtime_ns, 0)
+        self.assertBuilt()
+
+    def test_only_changed_output_is_written(self):
+        build_site(self.content, self.output, 1)
+        with open(os.path.join(self.content, "index.md"), "a") as f:
+            f.write("\nMore text\n")
+        report = build_site(self.content, self.output, 2, force=True)
+        self.assertEqual((report.writes.written, report.writes.skipped), (1, 1))
+        self.assertIn("More text", read(os.path.join(self.output, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
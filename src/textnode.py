@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import Dict, Optional
 
+from htmlnode import NO_CHILDREN, escape_attr, escape_text
 from leafnode import LeafNode
 
 
@@ -13,7 +14,25 @@ class TextType(Enum):
     IMAGE = "TextType.IMAGE"
 
 
+_NORMAL = TextType.NORMAL
+
+
 class TextNode:
+    """
+    A run of inline text.  Besides converting to a LeafNode it can sit in an
+    HTML tree as a leaf itself: it renders straight from _HTML_MAP, with
+    output identical to ``to_leaf().to_html()``, and exposes the tag, value
+    and props the LeafNode would have.
+
+    *escaped* promises that text and url hold nothing to escape, as the
+    inline parser finds out once per paragraph; rendering then writes them
+    as they are instead of escaping every node on every render.
+    """
+
+    __slots__ = ("text", "text_type", "url", "escaped")
+
+    children = NO_CHILDREN
+
     # --- mapping table lives on the class ---------------------------------
     # text_type          tag     needs_url  self_closing
     _HTML_MAP: Dict[TextType, tuple[Optional[str], bool, bool]] = {
@@ -26,12 +45,17 @@ class TextNode:
     }
     # ----------------------------------------------------------------------
 
-    def __init__(self, text: str, text_type: TextType, url: str = None):
+    def __init__(
+        self, text: str, text_type: TextType, url: str = None, escaped: bool = False
+    ):
         self.text = text
         self.text_type = text_type
         self.url = url
+        self.escaped = escaped
 
     def __eq__(self, other):
+        if not isinstance(other, TextNode):
+            return NotImplemented
         if (
             self.text == other.text
             and self.text_type == other.text_type
@@ -40,6 +64,9 @@ class TextNode:
             return True
         return False
 
+    def __hash__(self):
+        return hash((self.text, self.text_type, self.url))
+
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
@@ -58,10 +85,57 @@ class TextNode:
                 raise ValueError(f"{self.text_type.name} node requires a non-empty URL")
             attr_key = "src" if self_closing else "href"
             attrs = {attr_key: self.url}
-            if self_closing:  # IMAGE: ensure alt attribute exists
-                attrs.setdefault("alt", "")
+            if self_closing:  # IMAGE: the text becomes the alt attribute
+                attrs["alt"] = self.text or ""
 
         else:
             attrs = None
 
-        return LeafNode(tag, None if self_closing else self.text, attrs)
+        return LeafNode(tag, "" if self_closing else self.text, attrs)
+
+    @property
+    def tag(self) -> Optional[str]:
+        return self._HTML_MAP[self.text_type][0]
+
+    @property
+    def value(self) -> Optional[str]:
+        return "" if self._HTML_MAP[self.text_type][2] else self.text
+
+    @property
+    def props(self) -> Optional[dict]:
+        return self.to_leaf().props
+
+    def to_html(self) -> str:
+        """
+        Render *this* TextNode as HTML without building a LeafNode.
+        """
+        try:
+            tag, needs_url, self_closing = self._HTML_MAP[self.text_type]
+        except KeyError as exc:
+            raise ValueError(f"Unsupported TextType: {self.text_type}") from exc
+        text = self.text
+        escaped = self.escaped
+        if needs_url:
+            if not self.url:
+                raise ValueError(f"{self.text_type.name} node requires a non-empty URL")
+            url = self.url if escaped else escape_attr(self.url)
+            if self_closing:  # IMAGE: the text becomes the alt attribute
+                alt = (text or "") if escaped else escape_attr(text or "")
+                return f'<{tag} src="{url}" alt="{alt}">'
+        if text is None:
+            raise ValueError("LeafNode must have a value.")
+        if not escaped:
+            text = escape_text(text)
+        if tag is None:
+            return text
+        if needs_url:
+            return f'<{tag} href="{url}">{text}</{tag}>'
+        return f"<{tag}>{text}</{tag}>"
+
+    def _emit(self, write, stack):
+        # Plain text is most of a page; hashing an Enum member for the
+        # table lookup would cost more than escaping it.
+        if self.text_type is _NORMAL and self.text is not None:
+            write(self.text if self.escaped else escape_text(self.text))
+        else:
+            write(self.to_html())
@@ -0,0 +1,292 @@
+import os
+import threading
+import time
+
+from build import (
+    MARKDOWN_SUFFIX,
+    build_site,
+    output_path_for,
+    prune_page,
+    render_page,
+    url_path_for,
+)
+from linkgraph import LINKGRAPH_NAME, LinkGraph
+from manifest import MANIFEST_NAME, Manifest, file_hash, generator_version
+from search import INDEX_NAME, SEARCH_DIR, SearchIndex
+
+# Seconds between scans of the content tree
+POLL_INTERVAL = 0.1
+# Quiet period a burst of saves must settle for before rebuilding
+DEBOUNCE = 0.05
+
+
+def scan(content_dir: str) -> dict:
+    """
+    Map every markdown page under *content_dir* (relative path) to its
+    (mtime_ns, size), using scandir so each entry costs one stat at most.
+    """
+    found = {}
+    pending = [content_dir]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith(MARKDOWN_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:  # deleted mid-scan
+                        continue
+                    page = os.path.relpath(entry.path, content_dir)
+                    found[page] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def _stat(path: str) -> tuple:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def diff_scans(old: dict, new: dict) -> tuple:
+    """
+    Return (changed, deleted) page lists between two scan() results.
+    """
+    changed = sorted(page for page, stat in new.items() if old.get(page) != stat)
+    deleted = sorted(page for page in old if page not in new)
+    return changed, deleted
+
+
+class RebuildReport:
+    def __init__(
+        self, rebuilt: list, pruned: list, seconds: float, failed: dict = None
+    ):
+        self.rebuilt = rebuilt
+        self.pruned = pruned
+        self.seconds = seconds
+        self.failed = failed or {}  # page → error message
+
+    def __repr__(self):
+        return (
+            f"RebuildReport(rebuilt={self.rebuilt}, pruned={self.pruned}, "
+            f"failed={sorted(self.failed)}, seconds={self.seconds:.4f})"
+        )
+
+
+class Watcher:
+    """
+    Keeps the manifest and the last scan in memory and re-renders only the
+    pages that changed between polls, in-process.  A search index already
+    present in *output_dir* is kept up to date as well.
+    """
+
+    def __init__(
+        self,
+        content_dir: str,
+        output_dir: str,
+        interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+        template: str = None,
+    ):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self.debounce = debounce
+        self.template = os.path.abspath(template) if template is not None else None
+        layout_hash = file_hash(self.template) if template is not None else ""
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.manifest = Manifest.load(
+            self.manifest_path, generator_version(layout_hash)
+        )
+        self.manifest_stat = _stat(self.manifest_path)
+        self.graph_path = os.path.join(output_dir, LINKGRAPH_NAME)
+        self.graph = LinkGraph.load(self.graph_path)
+        self.index = None
+        if os.path.exists(os.path.join(output_dir, SEARCH_DIR, INDEX_NAME)):
+            self.index = SearchIndex.load(output_dir)
+        self.manifest_dirty = False
+        self.last_scan = scan(content_dir)
+
+    def outdated(self) -> bool:
+        """
+        Whether the in-memory state no longer describes the site: the
+        layout or the generator changed since the manifest was loaded, or
+        another build rewrote or removed the manifest.
+        """
+        layout_hash = file_hash(self.template) if self.template is not None else ""
+        if generator_version(layout_hash) != self.manifest.generator:
+            return True
+        return _stat(self.manifest_path) != self.manifest_stat
+
+    def poll(self) -> tuple:
+        """
+        Scan once; return (changed, deleted) since the previous poll.
+        """
+        current = scan(self.content_dir)
+        changes = diff_scans(self.last_scan, current)
+        self.last_scan = current
+        return changes
+
+    def settle(self, changed: list, deleted: list) -> tuple:
+        """
+        Keep polling every *debounce* seconds until a poll sees no new
+        changes, folding each burst into one (changed, deleted) set.
+        """
+        changed, deleted = set(changed), set(deleted)
+        while True:
+            time.sleep(self.debounce)
+            more_changed, more_deleted = self.poll()
+            if not more_changed and not more_deleted:
+                break
+            changed.update(more_changed)
+            deleted.update(more_deleted)
+        deleted.difference_update(self.last_scan)  # deleted, then re-created
+        changed.difference_update(deleted)
+        return sorted(changed), sorted(deleted)
+
+    def rebuild(self, changed: list, deleted: list) -> RebuildReport:
+        """
+        Re-render *changed* and prune *deleted* pages.  A page that fails to
+        render keeps its old output and manifest entry and is reported in
+        ``failed``; the others are still rendered.  Pages an escaping error
+        kept from being reached are dropped from the last scan, so the next
+        poll sees them as changed.
+        """
+        started = time.perf_counter()
+        rebuilt, pruned, failed = [], [], {}
+        done = 0
+        try:
+            for page in changed:
+                try:
+                    if self._rebuild_page(page):
+                        rebuilt.append(page)
+                except Exception as exc:
+                    failed[page] = f"{type(exc).__name__}: {exc}"
+                done += 1
+        finally:
+            for page in changed[done:]:
+                self.last_scan.pop(page, None)
+        for page in deleted:
+            if page in self.manifest.pages:
+                prune_page(self.output_dir, page)
+                self.manifest.forget(page)
+                self.graph.remove_page(url_path_for(page))
+                if self.index is not None:
+                    self.index.remove_page(url_path_for(page))
+                pruned.append(page)
+        self.manifest_dirty |= bool(rebuilt or pruned)
+        return RebuildReport(rebuilt, pruned, time.perf_counter() - started, failed)
+
+    def _rebuild_page(self, page: str) -> bool:
+        # Returns whether the page was rendered
+        source = os.path.join(self.content_dir, page)
+        output = os.path.join(self.output_dir, output_path_for(page))
+        try:
+            source_hash = file_hash(source)
+        except FileNotFoundError:
+            return False
+        if self.manifest.is_fresh(page, source_hash, output):
+            return False  # touched but not modified
+        output_hash, _, facts = render_page(
+            source, output, self.template, index_terms=self.index is not None
+        )
+        self.manifest.record(page, source_hash, output_hash)
+        self.graph.set_page(
+            url_path_for(page),
+            facts.links,
+            facts.images,
+            [heading.slug for heading in facts.outline],
+        )
+        if self.index is not None:
+            self.index.set_page(
+                url_path_for(page), facts.title, facts.terms, source_hash
+            )
+        return True
+
+    def flush(self) -> None:
+        """
+        Persist the manifest, link graph and search index if a rebuild
+        changed them.
+        """
+        if self.manifest_dirty:
+            self.manifest.save(self.manifest_path)
+            self.manifest_stat = _stat(self.manifest_path)
+            self.graph.save(self.graph_path)
+            if self.index is not None:
+                self.index.save()
+            self.manifest_dirty = False
+
+    def run(self, stop: threading.Event = None, log=print) -> None:
+        """
+        Poll until *stop* is set (or forever), logging each rebuild.  The
+        manifest and link graph are written on the first idle poll after a
+        rebuild, off the save-to-HTML path.
+        """
+        stop = stop or threading.Event()
+        try:
+            self._loop(stop, log)
+        finally:
+            self.flush()
+
+    def _loop(self, stop: threading.Event, log) -> None:
+        while not stop.wait(self.interval):
+            changed, deleted = self.poll()
+            if not changed and not deleted:
+                self.flush()
+                continue
+            report = self.rebuild(*self.settle(changed, deleted))
+            if report.rebuilt or report.pruned:
+                log(
+                    f"Rebuilt {len(report.rebuilt)}, pruned {len(report.pruned)} "
+                    f"page(s) in {report.seconds * 1e3:.1f} ms"
+                    + self._since_save(report.rebuilt)
+                    + ": "
+                    + ", ".join(report.rebuilt + report.pruned)
+                )
+            for page, error in report.failed.items():
+                log(f"Failed to render {page}, retrying on its next save: {error}")
+
+    def _since_save(self, pages: list) -> str:
+        # Save-to-HTML latency, timed from the newest mtime among *pages*
+        # so it includes detection and the debounce
+        mtimes = [self.last_scan[page][0] for page in pages if page in self.last_scan]
+        if not mtimes:
+            return ""
+        return f", {(time.time_ns() - max(mtimes)) / 1e6:.1f} ms after the save"
+
+
+def watch(
+    content_dir: str,
+    output_dir: str,
+    workers: int = None,
+    interval: float = POLL_INTERVAL,
+    debounce: float = DEBOUNCE,
+    template: str = None,
+    stop: threading.Event = None,
+    log=print,
+    search_index: bool = False,
+) -> None:
+    """
+    Bring *output_dir* up to date with an incremental build, then watch
+    *content_dir* and re-render changed pages as they are saved.
+    """
+    report = build_site(
+        content_dir,
+        output_dir,
+        workers=workers,
+        template=template,
+        search_index=search_index,
+    )
+    watcher = Watcher(content_dir, output_dir, interval, debounce, template)
+    log(
+        f"Initial build: {report.rebuilt} rebuilt, {report.skipped} skipped "
+        f"in {report.seconds:.2f}s; watching {content_dir}"
+    )
+    watcher.run(stop, log)
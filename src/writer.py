@@ -0,0 +1,234 @@
+import hashlib
+import os
+
+from assets import copy_file
+from manifest import file_hash
+
+
+class WriteReport:
+    def __init__(self):
+        self.written = 0
+        self.skipped = 0
+        self.bytes_written = 0
+        self.bytes_skipped = 0
+
+    def merge(self, other: "WriteReport") -> None:
+        self.written += other.written
+        self.skipped += other.skipped
+        self.bytes_written += other.bytes_written
+        self.bytes_skipped += other.bytes_skipped
+
+    def __repr__(self):
+        return (
+            f"WriteReport(written={self.written}, skipped={self.skipped}, "
+            f"bytes_written={self.bytes_written}, "
+            f"bytes_skipped={self.bytes_skipped})"
+        )
+
+
+class HashingSink:
+    """
+    Text sink that encodes, hashes and writes to the binary file *raw* in
+    one go, so the output hash and size come for free while a page streams.
+    """
+
+    __slots__ = ("raw", "digest", "size")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, piece: str) -> None:
+        data = piece.encode("utf-8")
+        self.digest.update(data)
+        self.size += len(data)
+        self.raw.write(data)
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+
+class StagedOutput(HashingSink):
+    """
+    A HashingSink over the temp file of one output, from OutputWriter.open.
+    """
+
+    __slots__ = ("path", "tmp")
+
+    def __init__(self, path: str, tmp: str):
+        super().__init__(open(tmp, "wb"))
+        self.path = path
+        self.tmp = tmp
+
+
+class OutputWriter:
+    """
+    Batched, atomic writer for output files that leaves unchanged files
+    alone.
+
+    write() compares the new bytes with the file already at the target, by
+    size and then by sha256, and skips identical ones so their mtimes stay
+    put; copy() does the same for a copy of another file.  open() streams a
+    page into a temp file instead, hashing it on the way, and finish() makes
+    the same comparison afterwards, removing the temp file of an unchanged
+    page.  Changed files wait in a temp file next
+    to their target; commit() fsyncs the batch, moves every file into place
+    with os.replace and then fsyncs each touched directory once.  Used as a
+    context manager it commits on success and discards the temp files on
+    error.
+    """
+
+    def __init__(self, fsync: bool = True):
+        self.fsync = fsync
+        self.report = WriteReport()
+        self._pending = []  # (temp path, target path)
+        self._open = []  # StagedOutputs not finished yet
+        self._dirs = set()  # directories known to exist
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write(self, path: str, data: bytes, digest: str = None) -> bool:
+        """
+        Stage *data* for *path* unless the file there already holds it.
+        *digest* is the sha256 hex digest of *data*, if already known.
+
+        Returns whether the file will be written.
+        """
+        report = self.report
+        if digest is None:
+            digest = hashlib.sha256(data).hexdigest()
+        if self._unchanged(path, len(data), digest):
+            report.skipped += 1
+            report.bytes_skipped += len(data)
+            return False
+
+        tmp = self._tmp_for(path)
+        self._pending.append((tmp, path))
+        with open(tmp, "wb") as f:
+            f.write(data)
+        report.written += 1
+        report.bytes_written += len(data)
+        return True
+
+    def copy(self, path: str, src: str, digest: str = None) -> bool:
+        """
+        Stage a copy of the file *src* for *path* unless the file there
+        already holds its bytes, as write() does, without reading *src* into
+        memory.  *digest* is the sha256 hex digest of *src*, if already known.
+
+        Returns whether the file will be written.
+        """
+        report = self.report
+        size = os.stat(src).st_size
+        if digest is None:
+            digest = file_hash(src)
+        if self._unchanged(path, size, digest):
+            report.skipped += 1
+            report.bytes_skipped += size
+            return False
+
+        tmp = self._tmp_for(path)
+        self._pending.append((tmp, path))
+        copy_file(src, tmp)
+        report.written += 1
+        report.bytes_written += size
+        return True
+
+    def open(self, path: str) -> StagedOutput:
+        """
+        Start streaming the new contents of *path* into a temp file; hand
+        the returned sink to finish() once written.
+        """
+        staged = StagedOutput(path, self._tmp_for(path))
+        self._open.append(staged)
+        return staged
+
+    def finish(self, staged: StagedOutput) -> bool:
+        """
+        Close *staged* and stage it for commit, unless the file at its path
+        already holds the same bytes; then its temp file is removed.
+
+        Returns whether the file will be written.
+        """
+        staged.raw.close()
+        self._open.remove(staged)
+        report = self.report
+        if self._unchanged(staged.path, staged.size, staged.hexdigest()):
+            os.remove(staged.tmp)
+            report.skipped += 1
+            report.bytes_skipped += staged.size
+            return False
+        self._pending.append((staged.tmp, staged.path))
+        report.written += 1
+        report.bytes_written += staged.size
+        return True
+
+    def _tmp_for(self, path: str) -> str:
+        directory = os.path.dirname(path) or "."
+        if directory not in self._dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._dirs.add(directory)
+        return f"{path}.{os.getpid()}.tmp"
+
+    def _unchanged(self, path: str, size: int, digest: str) -> bool:
+        try:
+            if os.stat(path).st_size != size:
+                return False
+            return file_hash(path) == digest
+        except FileNotFoundError:
+            return False
+
+    def commit(self) -> None:
+        """
+        Move every staged file into place.
+        """
+        pending, self._pending = self._pending, []
+        if self.fsync:
+            for tmp, _ in pending:
+                fd = os.open(tmp, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        for tmp, path in pending:
+            os.replace(tmp, path)
+        if self.fsync:
+            for directory in {os.path.dirname(path) or "." for _, path in pending}:
+                _fsync_dir(directory)
+
+    def abort(self) -> None:
+        """
+        Discard every staged file, leaving the targets untouched.
+        """
+        pending, self._pending = self._pending, []
+        for staged in self._open:
+            staged.raw.close()
+            pending.append((staged.tmp, staged.path))
+        self._open = []
+        for tmp, _ in pending:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+
+
+def _fsync_dir(directory: str) -> None:
+    # Makes the renames durable; not every platform can open a directory
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)